@@ -0,0 +1,172 @@
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class LocalLRU:
+    """프로세스 메모리 LRU (최대 max_size 개, ttl 초 후 만료)"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class FeedCache:
+    """
+    게시판 피드 페이지 응답 캐시: 로컬 LRU -> Redis -> DB.
+
+    board:feed:{feed}:gen      피드별 세대 번호. 게시글이 생성/수정/삭제되면 INCR
+    board:feed:{feed}:{gen}:{hash}  (필터, 검색어, cursor, page_size) 별 응답 JSON
+    board:feed:stats           HASH local_hits / redis_hits / misses
+
+    키에 세대 번호가 들어가므로 INCR 한 번으로 해당 피드의 모든 페이지가 (모든 프로세스에서) 무효화되고,
+    다른 피드의 캐시는 그대로 남는다. 이전 세대 항목은 TTL로 사라진다.
+    """
+    prefix = 'board:feed'
+    STATS_FLUSH_EVERY = 50
+
+    def __init__(self, ttl, local_size):
+        from pitza.redis_client import get_redis
+        self.redis = get_redis()
+        self.ttl = ttl
+        self.local = LocalLRU(local_size, ttl)
+        self._stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _gen_key(self, feed):
+        return f"{self.prefix}:{feed}:gen"
+
+    def _page_key(self, feed, generation, params):
+        digest = hashlib.sha1(json.dumps(sorted(params.items())).encode()).hexdigest()
+        return f"{self.prefix}:{feed}:{generation}:{digest}"
+
+    def generation(self, feed):
+        return self.redis.get(self._gen_key(feed)) or '0'
+
+    def get(self, feed, generation, params):
+        key = self._page_key(feed, generation, params)
+        data = self.local.get(key)
+        if data is not None:
+            self._count('local_hits')
+            return data
+        raw = self.redis.get(key)
+        if raw is None:
+            self._count('misses')
+            return None
+        data = json.loads(raw)
+        self.local.set(key, data)
+        self._count('redis_hits')
+        return data
+
+    def set(self, feed, generation, params, data):
+        key = self._page_key(feed, generation, params)
+        self.redis.set(key, json.dumps(data, cls=JSONEncoder), ex=self.ttl)
+        self.local.set(key, data)
+
+    def invalidate(self, feed):
+        self.redis.incr(self._gen_key(feed))
+
+    def _count(self, outcome):
+        # 요청마다 Redis에 쓰지 않고 모아서 반영
+        with self._stats_lock:
+            self._stats[outcome] += 1
+            if sum(self._stats.values()) < self.STATS_FLUSH_EVERY:
+                return
+            stats, self._stats = self._stats, Counter()
+        self.flush_stats(stats)
+
+    def flush_stats(self, stats=None):
+        if stats is None:
+            with self._stats_lock:
+                stats, self._stats = self._stats, Counter()
+        if not stats:
+            return
+        pipe = self.redis.pipeline()
+        for outcome, count in stats.items():
+            pipe.hincrby(f"{self.prefix}:stats", outcome, count)
+        pipe.execute()
+
+    def stats(self):
+        return {outcome: int(count) for outcome, count in self.redis.hgetall(f"{self.prefix}:stats").items()}
+
+    def reset_stats(self):
+        self.redis.delete(f"{self.prefix}:stats")
+
+
+_cache = None
+
+
+def get_feed_cache():
+    """설정된 피드 캐시, BOARD_FEED_CACHE 가 비어 있으면 None"""
+    global _cache
+    backend = settings.BOARD_FEED_CACHE
+    if not backend:
+        return None
+    if _cache is None:
+        if backend == 'redis':
+            _cache = FeedCache(settings.BOARD_FEED_CACHE_TTL, settings.BOARD_FEED_LOCAL_CACHE_SIZE)
+        else:
+            raise ValueError(f"Unknown BOARD_FEED_CACHE backend: {backend}")
+    return _cache
+
+
+class CachedFeedMixin:
+    """
+    ListAPIView 응답을 FeedCache에 저장. feed_name 별로 무효화된다.
+    FeedFilterMixin.filter_params() 와 cursor/page_size 만 키로 사용 (그 외 쿼리 파라미터는 무시)
+    """
+    feed_name = None
+
+    def cache_params(self):
+        params = self.filter_params()
+        paginator = self.paginator
+        for param in (paginator.cursor_query_param, paginator.page_size_query_param):
+            if self.request.query_params.get(param):
+                params[param] = self.request.query_params[param]
+        # next 링크가 절대 URL이므로 호스트별로 분리
+        params['host'] = self.request.get_host()
+        return params
+
+    def list(self, request, *args, **kwargs):
+        cache = get_feed_cache()
+        if cache is None:
+            return super().list(request, *args, **kwargs)
+
+        params = self.cache_params()
+        # DB 조회 전에 세대를 읽어야, 조회 중 들어온 쓰기가 이 응답을 새 세대에 남기지 않음
+        generation = cache.generation(self.feed_name)
+        data = cache.get(self.feed_name, generation, params)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(self.feed_name, generation, params, response.data)
+        return response
@@ -0,0 +1,90 @@
+import re
+
+from django.db import NotSupportedError, connection
+from django.db.models import Lookup, TextField
+
+# MySQL ngram 파서 토큰 길이 (ngram_token_size 기본값). 이보다 짧은 검색어는 FULLTEXT로 찾을 수 없음
+NGRAM_TOKEN_SIZE = 2
+# BOOLEAN MODE 연산자 문자는 검색어에서 제거
+BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+
+@TextField.register_lookup
+class NgramMatch(Lookup):
+    """
+    MATCH (col) AGAINST (... IN BOOLEAN MODE).
+    board 0006 마이그레이션의 ngram FULLTEXT 인덱스를 사용 (MySQL 전용).
+    """
+    lookup_name = 'ngram_match'
+
+    def as_mysql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"MATCH ({lhs}) AGAINST ({rhs} IN BOOLEAN MODE)", lhs_params + rhs_params
+
+    def as_sql(self, compiler, connection):
+        raise NotSupportedError('ngram_match is only supported on MySQL.')
+
+
+def fulltext_available():
+    return connection.vendor == 'mysql'
+
+
+def search_queryset(queryset, field, query):
+    """
+    공백으로 나눈 모든 검색어를 포함하는 게시글.
+    MySQL이면 ngram FULLTEXT 인덱스로 찾고(한글 포함), 그 외 DB나 토큰보다 짧은 검색어는 icontains로 대체.
+    """
+    terms = [term for term in BOOLEAN_OPERATORS.sub(' ', query).split() if term]
+    if not terms:
+        return queryset
+
+    if fulltext_available():
+        long_terms = [term for term in terms if len(term) >= NGRAM_TOKEN_SIZE]
+        short_terms = [term for term in terms if len(term) < NGRAM_TOKEN_SIZE]
+        if long_terms:
+            # +"검색어": 각 검색어를 구(phrase)로 필수 매칭
+            boolean_query = ' '.join(f'+"{term}"' for term in long_terms)
+            queryset = queryset.filter(**{f'{field}__ngram_match': boolean_query})
+    else:
+        short_terms = terms
+
+    for term in short_terms:
+        queryset = queryset.filter(**{f'{field}__icontains': term})
+    return queryset
+
+
+def query_filters(request, fields):
+    """쿼리 파라미터 중 fields 에 해당하는 정확히 일치 필터"""
+    filters = {field: request.query_params[field] for field in fields if request.query_params.get(field)}
+    if 'blood_type' in filters:
+        # 인코딩 안 된 ?blood_type=A+ 는 'A ' 로 들어옴
+        filters['blood_type'] = filters['blood_type'].replace(' ', '+')
+    return filters
+
+
+class FeedFilterMixin:
+    """
+    목록 API 쿼리 파라미터 필터.
+    filter_fields: 정확히 일치하는 필터 (?blood_type=A+&region=서울), search_field: ?search= 대상 필드
+    """
+    filter_fields = ()
+    search_field = None
+    search_query_param = 'search'
+
+    def filter_params(self):
+        params = query_filters(self.request, self.filter_fields)
+        search = self.request.query_params.get(self.search_query_param, '').strip()
+        if self.search_field and search:
+            params[self.search_query_param] = search
+        return params
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.filter_params()
+        search = params.pop(self.search_query_param, None)
+        if params:
+            queryset = queryset.filter(**params)
+        if search:
+            queryset = search_queryset(queryset, self.search_field, search)
+        return queryset
@@ -0,0 +1,212 @@
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# 변형 이름 -> 긴 변의 최대 픽셀 (원본이 더 작으면 확대하지 않음)
+VARIANTS = {
+    'thumb': 160,
+    'card': 480,
+    'full': 1280,
+}
+# 형식 -> (PIL 형식, 확장자, 저장 옵션)
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def render_variants(content):
+    """
+    원본 이미지 바이트 -> {variant: {format: bytes}}.
+    EXIF 방향을 적용한 뒤 메타데이터 없이 다시 인코딩한다. Django에 의존하지 않으므로 워커 프로세스에서 실행.
+    """
+    with Image.open(io.BytesIO(content)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+        rendered = {}
+        for variant, max_size in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((max_size, max_size), Image.LANCZOS)
+            rendered[variant] = {}
+            for fmt, (pil_format, _, options) in FORMATS.items():
+                output = resized
+                if pil_format == 'JPEG' and output.mode == 'RGBA':
+                    # JPEG는 알파가 없으므로 흰 배경에 합성
+                    output = Image.new('RGB', resized.size, (255, 255, 255))
+                    output.paste(resized, mask=resized.getchannel('A'))
+                buffer = io.BytesIO()
+                output.save(buffer, format=pil_format, **options)
+                rendered[variant][fmt] = buffer.getvalue()
+        return rendered
+
+
+# 다시 인코딩해 메타데이터를 지울 수 있는 형식 (MPO 는 휴대폰 JPEG)
+STRIP_FORMATS = {'JPEG': 'JPEG', 'MPO': 'JPEG', 'PNG': 'PNG', 'WEBP': 'WEBP'}
+STRIP_OPTIONS = {'JPEG': {'quality': 92}, 'PNG': {'optimize': True}, 'WEBP': {'quality': 90}}
+
+
+def strip_metadata(upload):
+    """
+    업로드 원본에서 EXIF(GPS 포함)/XMP/주석을 지운 파일을 반환. 원본은 image 로 그대로 공개되므로 저장 전에 호출.
+    EXIF 방향은 픽셀에 적용하고, 메타데이터가 없거나 다시 인코딩할 수 없는 형식(GIF 애니메이션 등)이면 그대로 반환.
+    """
+    upload.seek(0)
+    with Image.open(upload) as original:
+        pil_format = STRIP_FORMATS.get(original.format)
+        has_metadata = bool(original.getexif()) or any(key in original.info for key in ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment'))
+        if pil_format is None or not has_metadata or getattr(original, 'n_frames', 1) > 1:
+            upload.seek(0)
+            return upload
+        image = ImageOps.exif_transpose(original)
+        if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        # 저장 시 info 의 comment/xmp 를 다시 쓰지 않도록 비우고, icc_profile 은 색 정보라 유지
+        image.info = {}
+        buffer = io.BytesIO()
+        image.save(buffer, format=pil_format, icc_profile=original.info.get('icc_profile'), **STRIP_OPTIONS[pil_format])
+    return ContentFile(buffer.getvalue(), name=upload.name)
+
+
+def variant_name(source_name, variant, fmt):
+    stem = os.path.splitext(os.path.basename(source_name))[0]
+    return f"variants/{stem}_{variant}.{FORMATS[fmt][1]}"
+
+
+def save_variants(post, rendered):
+    """변형 파일을 원본과 같은 storage에 저장하고 image_variants 를 갱신"""
+    storage = post.image.storage
+    source_name = post.image.name
+    variants = {'source': source_name}
+    for variant, formats in rendered.items():
+        variants[variant] = {
+            fmt: storage.save(variant_name(source_name, variant, fmt), ContentFile(content))
+            for fmt, content in formats.items()
+        }
+
+    # update() 는 post_save/auto_now 를 거치지 않으므로 updated_at 과 피드 캐시를 직접 갱신
+    updated = type(post).objects.filter(pk=post.pk, image=source_name).update(
+        image_variants=variants, updated_at=timezone.now()
+    )
+    if not updated:
+        # 그 사이 글이 삭제됐거나 이미지가 바뀜
+        delete_variants(storage, variants)
+        return
+    from .cache import get_feed_cache
+    from .signals import FEED_NAMES
+    cache = get_feed_cache()
+    if cache is not None:
+        cache.invalidate(FEED_NAMES[type(post)])
+
+
+def variant_files(variants):
+    """image_variants 에 기록된 변형 파일 이름들"""
+    return [name for variant in VARIANTS for name in (variants or {}).get(variant, {}).values()]
+
+
+def delete_variants(storage, variants):
+    for name in variant_files(variants):
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception("Could not delete image variant %s", name)
+
+
+def generate_variants(post):
+    """동기 생성 (BOARD_IMAGE_VARIANTS='sync', 관리 명령 등)"""
+    with post.image.open('rb') as image_file:
+        content = image_file.read()
+    save_variants(post, render_variants(content))
+
+
+class VariantPool:
+    """
+    변형 생성을 요청 밖에서 처리: 이미지 인코딩은 CPU 작업이라 GIL을 피해 프로세스 풀에서,
+    결과 저장과 DB 갱신은 이 프로세스의 콜백 스레드에서 한다.
+    대기/실행 중인 작업(원본 바이트를 들고 있음)은 프로세스당 max_pending 개까지이고,
+    가득 차면 submit() 이 False 를 반환한다 (generate_image_variants 로 나중에 생성).
+    """
+
+    def __init__(self, workers, max_pending):
+        # runserver/gunicorn 스레드가 있는 프로세스에서 fork 하지 않도록 spawn
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, post):
+        if not self._slots.acquire(blocking=False):
+            return False
+        try:
+            with post.image.open('rb') as image_file:
+                content = image_file.read()
+            future = self._executor.submit(render_variants, content)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda done: self._save(post, done))
+        return True
+
+    def _save(self, post, future):
+        try:
+            save_variants(post, future.result())
+        except Exception:
+            logger.exception("Image variants failed for %s %s", type(post).__name__, post.pk)
+        finally:
+            self._slots.release()
+            close_old_connections()
+
+
+_pool = None
+
+
+def schedule_variants(post):
+    """커밋 후 post.image 의 변형 생성을 예약 (BOARD_IMAGE_VARIANTS 가 비어 있으면 생성 안 함)"""
+    global _pool
+    mode = settings.BOARD_IMAGE_VARIANTS
+    if not mode:
+        return
+    if mode == 'sync':
+        transaction.on_commit(lambda: generate_variants(post))
+        return
+    if mode != 'process':
+        raise ValueError(f"Unknown BOARD_IMAGE_VARIANTS mode: {mode}")
+    if _pool is None:
+        _pool = VariantPool(settings.BOARD_IMAGE_VARIANT_WORKERS, settings.BOARD_IMAGE_VARIANT_QUEUE)
+    transaction.on_commit(lambda: _submit(_pool, post))
+
+
+def _submit(pool, post):
+    # 변형은 없어도 image 로 표시되므로 큐가 가득 차면 요청 안에서 만들지 않고 건너뜀
+    if not pool.submit(post):
+        logger.warning("Image variant queue full, skipped %s %s", type(post).__name__, post.pk)
+
+
+def needs_variants(post):
+    """이미지가 있는데 변형이 현재 원본으로 만들어지지 않았으면 True"""
+    return bool(post.image) and (post.image_variants or {}).get('source') != post.image.name
+
+
+def variant_urls(post, request=None):
+    """{variant: {format: url}} (아직 생성 전이면 빈 dict)"""
+    variants = post.image_variants or {}
+    if not post.image or variants.get('source') != post.image.name:
+        return {}
+    storage = post.image.storage
+    urls = {}
+    for variant in VARIANTS:
+        urls[variant] = {}
+        for fmt, name in variants.get(variant, {}).items():
+            url = storage.url(name)
+            urls[variant][fmt] = request.build_absolute_uri(url) if request else url
+    return urls
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from board.cache import get_feed_cache
+
+
+class Command(BaseCommand):
+    help = '게시판 피드 캐시 적중률 (모든 프로세스 합계, 프로세스별로 50회마다 반영)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='출력 후 카운터 초기화')
+
+    def handle(self, *args, **options):
+        cache = get_feed_cache()
+        if cache is None:
+            self.stdout.write(self.style.WARNING("BOARD_FEED_CACHE is disabled."))
+            return
+
+        stats = cache.stats()
+        local_hits = stats.get('local_hits', 0)
+        redis_hits = stats.get('redis_hits', 0)
+        misses = stats.get('misses', 0)
+        total = local_hits + redis_hits + misses
+        hit_rate = (local_hits + redis_hits) / total * 100 if total else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"lookups {total}: local hits {local_hits}, redis hits {redis_hits}, misses {misses} "
+            f"(hit rate {hit_rate:.1f}%)"
+        ))
+        if options['reset']:
+            cache.reset_stats()
@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from board.popularity import get_view_counter
+
+
+class Command(BaseCommand):
+    help = 'Redis에 쌓인 게시글 조회수를 DB와 인기글 점수에 반영합니다. (--loop: N초마다 반복)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='종료할 때까지 반복')
+        parser.add_argument('--interval', type=int, default=settings.BOARD_VIEW_FLUSH_INTERVAL,
+                            help='반복 간격 (초, 기본값: BOARD_VIEW_FLUSH_INTERVAL)')
+
+    def handle(self, *args, **options):
+        counter = get_view_counter()
+        if counter is None:
+            self.stdout.write(self.style.WARNING("BOARD_VIEW_COUNTER is disabled."))
+            return
+
+        while True:
+            flushed = counter.flush()
+            self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} views."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from board.images import generate_variants, needs_variants
+from board.models import DonationPost, RequestPost
+
+
+class Command(BaseCommand):
+    help = '변형(thumb/card/full)이 없는 게시글 이미지의 변형을 만듭니다. (큐가 가득 차 건너뛴 글, 기능을 켜기 전 글)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='게시판별 최대 처리 수')
+
+    def handle(self, *args, **options):
+        for model in (DonationPost, RequestPost):
+            posts = model.objects.exclude(image='').exclude(image__isnull=True).only('id', 'image', 'image_variants')
+            generated = failed = 0
+            for post in posts.iterator():
+                if options['limit'] is not None and generated + failed >= options['limit']:
+                    break
+                if not needs_variants(post):
+                    continue
+                try:
+                    generate_variants(post)
+                    generated += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {post.pk}: {e}")
+            self.stdout.write(self.style.SUCCESS(f"{model.__name__}: generated {generated}, failed {failed}."))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.1 on 2026-10-18 08:50
+
+import django.core.files.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationpost',
+            name='donor_name',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='requestpost',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=django.core.files.storage.FileSystemStorage(base_url='/media/donation_images/', location='media/donation_images'), upload_to=''),
+        ),
+        migrations.AlterField(
+            model_name='donationpost',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=django.core.files.storage.FileSystemStorage(base_url='/media/donation_images/', location='media/donation_images'), upload_to=''),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0002_donationpost_donor_name_requestpost_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationpost',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='requestpost',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
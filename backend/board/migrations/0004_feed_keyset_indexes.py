@@ -0,0 +1,21 @@
+# Generated by Django 4.2.1 on 2026-10-18 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0003_donationpost_updated_at_requestpost_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donationpost',
+            index=models.Index(fields=['created_at', 'id'], name='donationpost_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestpost',
+            index=models.Index(fields=['created_at', 'id'], name='requestpost_feed_idx'),
+        ),
+    ]
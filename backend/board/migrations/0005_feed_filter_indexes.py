@@ -0,0 +1,33 @@
+# Generated by Django 4.2.1 on 2026-10-18 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0004_feed_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donationpost',
+            index=models.Index(fields=['blood_type', 'created_at', 'id'], name='donationpost_bt_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donationpost',
+            index=models.Index(fields=['region', 'created_at', 'id'], name='donationpost_region_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donationpost',
+            index=models.Index(fields=['gender', 'created_at', 'id'], name='donationpost_gender_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestpost',
+            index=models.Index(fields=['blood_type', 'created_at', 'id'], name='requestpost_bt_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='requestpost',
+            index=models.Index(fields=['region', 'created_at', 'id'], name='requestpost_region_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:20
+
+from django.db import migrations
+
+# (table, index, column): 한글 검색용 ngram 파서 FULLTEXT 인덱스 (MySQL 전용)
+FULLTEXT_INDEXES = [
+    ('board_donationpost', 'donationpost_intro_ft', 'introduction'),
+    ('board_requestpost', 'requestpost_reason_ft', 'reason'),
+]
+
+
+def add_fulltext_indexes(apps, schema_editor):
+    # 다른 DB에서는 board.filters.search_queryset 이 icontains 로 대체
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    for table, index, column in FULLTEXT_INDEXES:
+        schema_editor.execute(
+            f"ALTER TABLE `{table}` ADD FULLTEXT INDEX `{index}` (`{column}`) WITH PARSER ngram"
+        )
+
+
+def remove_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    for table, index, _ in FULLTEXT_INDEXES:
+        schema_editor.execute(f"ALTER TABLE `{table}` DROP INDEX `{index}`")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0005_feed_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext_indexes, remove_fulltext_indexes),
+    ]
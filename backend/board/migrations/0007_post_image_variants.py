@@ -0,0 +1,23 @@
+# Generated by Django 4.2.1 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0006_ngram_fulltext_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationpost',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='requestpost',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
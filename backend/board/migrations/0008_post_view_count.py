@@ -0,0 +1,23 @@
+# Generated by Django 4.2.1 on 2026-10-18 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0007_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationpost',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='requestpost',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
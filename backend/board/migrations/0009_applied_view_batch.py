@@ -0,0 +1,21 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('board', '0008_post_view_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppliedViewBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_key', models.CharField(max_length=64, unique=True)),
+                ('applied_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -16,21 +16,55 @@ class DonationPost(models.Model):  # 기부하기 탭
     donor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
     donor_name = models.CharField(max_length=100, null=True, blank=True)
     image = models.ImageField(upload_to='', storage=local_storage, blank=True, null=True)
+    # board.images 가 만든 리사이즈 변형 파일 {'source': 원본, 'thumb': {'webp': ..., 'jpeg': ...}, ...}
+    image_variants = models.JSONField(default=dict, blank=True)
     blood_type = models.CharField(max_length=3, choices=BLOOD_TYPES)
     age = models.PositiveIntegerField()
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES)
     region = models.CharField(max_length=100)
     introduction = models.TextField()
+    view_count = models.PositiveIntegerField(default=0)  # board.popularity 가 배치로 반영
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # ETag/Last-Modified 기준
+
+    class Meta:
+        indexes = [
+            # 피드 keyset 페이지네이션 (created_at, id) 내림차순
+            models.Index(fields=['created_at', 'id'], name='donationpost_feed_idx'),
+            # 필터된 피드: 필터 값이 같은 행들 안에서 (created_at, id) 순서로 바로 읽음
+            models.Index(fields=['blood_type', 'created_at', 'id'], name='donationpost_bt_feed_idx'),
+            models.Index(fields=['region', 'created_at', 'id'], name='donationpost_region_feed_idx'),
+            models.Index(fields=['gender', 'created_at', 'id'], name='donationpost_gender_feed_idx'),
+        ]
+
     def __str__(self):
         return f"[기부] {self.donor.email}"
 
 class RequestPost(models.Model):  # 요청하기 탭
     requester = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     image = models.ImageField(upload_to='', storage=local_storage, blank=True, null=True)
+    # board.images 가 만든 리사이즈 변형 파일 {'source': 원본, 'thumb': {'webp': ..., 'jpeg': ...}, ...}
+    image_variants = models.JSONField(default=dict, blank=True)
     blood_type = models.CharField(max_length=3, choices=DonationPost.BLOOD_TYPES)
     region = models.CharField(max_length=100)
     reason = models.TextField()
+    view_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # ETag/Last-Modified 기준
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='requestpost_feed_idx'),
+            models.Index(fields=['blood_type', 'created_at', 'id'], name='requestpost_bt_feed_idx'),
+            models.Index(fields=['region', 'created_at', 'id'], name='requestpost_region_feed_idx'),
+        ]
+
     def __str__(self):
         return f"[요청] {self.requester.username}"
+
+
+class AppliedViewBatch(models.Model):
+    # board.popularity 가 DB에 반영한 조회수 배치 (board:views:flushing:{uuid}): 조회수 UPDATE 와 같은
+    # 트랜잭션에서 기록해서, Redis 배치 삭제 전에 죽은 flush 를 다시 돌려도 두 번 더하지 않음
+    batch_key = models.CharField(max_length=64, unique=True)
+    applied_at = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -0,0 +1,105 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from rest_framework import serializers
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_SALT = 'board.feed.cursor'
+
+
+def dump_position(post):
+    return {'created_at': post.created_at.isoformat(), 'id': post.id}
+
+
+def load_position(position):
+    return datetime.fromisoformat(position['created_at']), position['id']
+
+
+def after_position(queryset, position):
+    """(created_at, id) 내림차순에서 position 다음 행들 (created_at, id 인덱스 범위 조회)"""
+    created_at, post_id = load_position(position)
+    return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id))
+
+
+class FeedCursorPagination(BasePagination):
+    """
+    게시판 피드 keyset 페이지네이션.
+    (created_at, id) 내림차순으로 정렬하고, 마지막 행의 위치를 서명된 cursor로 넘겨
+    다음 페이지는 OFFSET 없이 인덱스 범위로만 읽는다. 테이블 크기와 무관하게 페이지당 비용이 같다.
+
+    항상 한 페이지(BOARD_FEED_PAGE_SIZE)만 읽는다. ?page_size= 나 ?cursor= 가 있으면 {next, results} 로,
+    둘 다 없는 기존 클라이언트에는 예전 모양대로 배열로 응답하되 최신 한 페이지까지만 준다
+    (전체 목록은 더 이상 반환하지 않음). 다음 페이지가 필요하면 ?page_size=20 으로 받고 next 를 따라가면 된다.
+    """
+    cursor_query_param = 'cursor'
+    cursor_salt = CURSOR_SALT
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+    bare_list = False
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.BOARD_FEED_PAGE_SIZE
+        return min(max(page_size, 1), settings.BOARD_FEED_MAX_PAGE_SIZE)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            return signing.loads(cursor, salt=self.cursor_salt)
+        except (signing.BadSignature, KeyError):
+            raise serializers.ValidationError({'cursor': ['Invalid cursor.']})
+
+    def is_requested(self, request):
+        return any(request.query_params.get(param) for param in (self.cursor_query_param, self.page_size_query_param))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.bare_list = not self.is_requested(request)
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            try:
+                queryset = after_position(queryset, position)
+            except (KeyError, TypeError, ValueError):
+                raise serializers.ValidationError({'cursor': ['Invalid cursor.']})
+
+        # 한 행 더 읽어서 다음 페이지 존재 여부 확인
+        results = list(queryset[:page_size + 1])
+        self.next_position = dump_position(results[page_size - 1]) if len(results) > page_size else None
+        return results[:page_size]
+
+    def encode_cursor(self, position):
+        return signing.dumps(position, salt=self.cursor_salt, compress=True)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        if self.bare_list:
+            return Response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,168 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import AppliedViewBatch, DonationPost, RequestPost
+
+KINDS = {'donation': DonationPost, 'request': RequestPost}
+
+
+class RedisViewCounter:
+    """
+    조회수 write-behind + 인기글 랭킹.
+
+    board:views:pending             HASH "{kind}:{id}" -> 아직 DB에 반영 안 된 조회수 (상세 GET마다 HINCRBY 한 번)
+    board:views:flushing:{uuid}     flush 중인 배치 (pending 을 RENAME 해서 가져옴, DB 반영은 AppliedViewBatch 에 기록)
+    board:trending:{kind}           ZSET id -> 시간 감쇠 조회 점수
+    board:trending:landmark         점수 기준 시각 (epoch 초)
+
+    flush() 가 N초마다 배치를 DB에 UPDATE 한 번(청크당)으로 더하고, 같은 배치로 인기 점수도 올린다.
+    인기 점수는 forward decay: 조회 하나의 가중치가 2 ** ((t - landmark) / half_life) 라서
+    점수 순서가 곧 감쇠된 조회수 순서이고, 요청 시에는 ZREVRANGE 만 하면 된다.
+    가중치가 커지면 flush 에서 전체를 줄이고 landmark 를 옮긴다.
+    """
+    prefix = 'board'
+    TRENDING_SIZE = 1000
+    # 2 ** RESCALE_AFTER 를 넘기 전에 점수를 재조정 (float 정밀도 유지)
+    RESCALE_AFTER = 32
+    MIN_SCORE = 0.001
+    UPDATE_CHUNK = 500
+    APPLIED_BATCH_RETENTION = timedelta(days=1)
+
+    def __init__(self, half_life):
+        from pitza.redis_client import get_redis
+        self.redis = get_redis()
+        self.half_life = half_life
+
+    @property
+    def pending_key(self):
+        return f"{self.prefix}:views:pending"
+
+    @property
+    def landmark_key(self):
+        return f"{self.prefix}:trending:landmark"
+
+    def _trending_key(self, kind):
+        return f"{self.prefix}:trending:{kind}"
+
+    def record(self, kind, post_id):
+        self.redis.hincrby(self.pending_key, f"{kind}:{post_id}", 1)
+
+    def trending_ids(self, kind, limit):
+        return [int(member) for member in self.redis.zrevrange(self._trending_key(kind), 0, limit - 1)]
+
+    def flush(self):
+        """대기 중인 조회수를 DB와 인기 점수에 반영하고 반영한 조회 수를 반환"""
+        lock = self.redis.lock(f"{self.prefix}:views:flush-lock", timeout=300, blocking_timeout=0)
+        if not lock.acquire():
+            return 0
+        try:
+            # 이전 flush 가 DB 반영 전에 중단됐다면 그 배치부터
+            batches = list(self.redis.scan_iter(f"{self.prefix}:views:flushing:*"))
+            if self.redis.exists(self.pending_key):
+                # RENAME 이후의 조회는 새 pending 에 쌓임
+                batch_key = f"{self.prefix}:views:flushing:{uuid.uuid4().hex}"
+                self.redis.rename(self.pending_key, batch_key)
+                batches.append(batch_key)
+
+            total = 0
+            for key in batches:
+                total += self._flush_batch(key)
+            self._maybe_rescale()
+            # 배치 키는 다음 flush 까지만 남으므로 오래된 기록은 필요 없음
+            AppliedViewBatch.objects.filter(applied_at__lt=timezone.now() - self.APPLIED_BATCH_RETENTION).delete()
+            return total
+        finally:
+            lock.release()
+
+    def _flush_batch(self, key):
+        counts = {kind: {} for kind in KINDS}
+        for member, count in self.redis.hgetall(key).items():
+            kind, _, post_id = member.partition(':')
+            if kind in counts:
+                counts[kind][int(post_id)] = int(count)
+
+        with transaction.atomic():
+            # 배치 기록과 조회수 UPDATE 를 한 트랜잭션으로: 이미 반영된 배치(삭제 전에 중단)는 DB는 건너뜀
+            _, created = AppliedViewBatch.objects.get_or_create(batch_key=key)
+            if created:
+                for kind, per_post in counts.items():
+                    ids = list(per_post)
+                    for start in range(0, len(ids), self.UPDATE_CHUNK):
+                        chunk = ids[start:start + self.UPDATE_CHUNK]
+                        # update() 라서 updated_at(ETag)은 바뀌지 않음: 조회수는 근사값
+                        KINDS[kind].objects.filter(id__in=chunk).update(
+                            view_count=F('view_count') + Case(*[When(id=post_id, then=Value(per_post[post_id])) for post_id in chunk])
+                        )
+
+        # 인기 점수 반영과 배치 삭제는 MULTI 한 번: 둘 다 되거나 둘 다 안 됨
+        weight = self._weight(time.time())
+        pipe = self.redis.pipeline()
+        for kind, per_post in counts.items():
+            trending_key = self._trending_key(kind)
+            for post_id, count in per_post.items():
+                pipe.zincrby(trending_key, count * weight, post_id)
+            pipe.zremrangebyrank(trending_key, 0, -self.TRENDING_SIZE - 1)
+        pipe.delete(key)
+        pipe.execute()
+        return sum(sum(per_post.values()) for per_post in counts.values())
+
+    def _landmark(self):
+        landmark = self.redis.get(self.landmark_key)
+        if landmark is None:
+            landmark = time.time()
+            self.redis.set(self.landmark_key, landmark)
+        return float(landmark)
+
+    def _weight(self, now):
+        return 2 ** ((now - self._landmark()) / self.half_life)
+
+    def _maybe_rescale(self):
+        now = time.time()
+        elapsed = (now - self._landmark()) / self.half_life
+        if elapsed < self.RESCALE_AFTER:
+            return
+        factor = 2 ** -elapsed
+        pipe = self.redis.pipeline()
+        for kind in KINDS:
+            trending_key = self._trending_key(kind)
+            for member, score in self.redis.zrange(trending_key, 0, -1, withscores=True):
+                pipe.zadd(trending_key, {member: score * factor})
+            # 지금 조회 1회의 1/1000 미만으로 감쇠된 글은 제거
+            pipe.zremrangebyscore(trending_key, '-inf', self.MIN_SCORE)
+        pipe.set(self.landmark_key, now)
+        pipe.execute()
+
+
+_counter = None
+
+
+def get_view_counter():
+    """설정된 조회수 카운터, BOARD_VIEW_COUNTER 가 비어 있으면 None"""
+    global _counter
+    backend = settings.BOARD_VIEW_COUNTER
+    if not backend:
+        return None
+    if _counter is None:
+        if backend == 'redis':
+            _counter = RedisViewCounter(settings.BOARD_TRENDING_HALF_LIFE)
+        else:
+            raise ValueError(f"Unknown BOARD_VIEW_COUNTER backend: {backend}")
+    return _counter
+
+
+class CountViewMixin:
+    """상세 GET(200/304) 마다 조회수 +1 (DB 쓰기 없이 Redis에만)"""
+    view_kind = None
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        counter = get_view_counter()
+        if counter is not None and response.status_code in (200, 304):
+            counter.record(self.view_kind, kwargs[self.lookup_url_kwarg or self.lookup_field])
+        return response
@@ -1,11 +1,14 @@
 from rest_framework import serializers
 from .models import DonationPost, RequestPost
+from .images import strip_metadata, variant_urls
 
 class DonationPostSerializer(serializers.ModelSerializer):
     receiver_id = serializers.IntegerField(source='donor.id', read_only=True)
     donor_username = serializers.SerializerMethodField()
     donor_profile_image = serializers.SerializerMethodField()
     image = serializers.ImageField(required=False) 
+    image_variants = serializers.SerializerMethodField()
+    view_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = DonationPost
@@ -15,14 +18,24 @@ class DonationPostSerializer(serializers.ModelSerializer):
             'donor_username',
             'donor_profile_image',
             'image',
+            'image_variants',
             'blood_type',
             'age',
             'gender',
             'region',
             'introduction',
+            'view_count',
             'created_at'
         ]
 
+    def validate_image(self, value):
+        # 원본은 image 로 그대로 공개되므로 EXIF(GPS) 를 지우고 저장
+        return strip_metadata(value)
+
+    def get_image_variants(self, obj):
+        # 피드/목록은 thumb·card 를 쓰고 원본(image)은 상세에서만
+        return variant_urls(obj, self.context.get('request'))
+
     def get_donor_username(self, obj):
         if obj.donor:
             return obj.donor.nickname or obj.donor.email or f"Kakao:{obj.donor.kakao_id}"
@@ -40,6 +53,8 @@ class RequestPostSerializer(serializers.ModelSerializer):
     requester_username = serializers.CharField(source='requester.nickname', read_only=True)
     requester_profile_image = serializers.SerializerMethodField()
     image = serializers.ImageField(required=False) 
+    image_variants = serializers.SerializerMethodField()
+    view_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = RequestPost
@@ -49,11 +64,19 @@ class RequestPostSerializer(serializers.ModelSerializer):
             'requester_username',
             'requester_profile_image',
             'image', 
+            'image_variants',
             'blood_type',
             'region', 
             'reason', 
+            'view_count',
             'created_at']
         
+    def validate_image(self, value):
+        return strip_metadata(value)
+
+    def get_image_variants(self, obj):
+        return variant_urls(obj, self.context.get('request'))
+
     def get_requester_username(self, obj):
             if obj.requester:
                 return obj.requester.nickname or obj.requester.email or f"Kakao:{obj.requester.kakao_id}"
@@ -64,4 +87,9 @@ class RequestPostSerializer(serializers.ModelSerializer):
                 request = self.context.get('request')
                 image_url = obj.requester.profile_picture_key
                 return request.build_absolute_uri(image_url) if request else image_url
-            return None
\ No newline at end of file
+            return None
+
+class TimelineEntrySerializer(serializers.Serializer):
+    # 타임라인 항목: type 에 따라 post 가 DonationPostSerializer / RequestPostSerializer 모양
+    type = serializers.ChoiceField(choices=['donation', 'request'])
+    post = serializers.DictField(help_text='type 이 donation 이면 기부 글, request 면 요청 글 (각 목록 API 의 항목과 같은 필드)')
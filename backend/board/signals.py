@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import get_feed_cache
+from .images import delete_variants, needs_variants, schedule_variants
+from .models import DonationPost, RequestPost
+
+FEED_NAMES = {DonationPost: 'donation', RequestPost: 'request'}
+
+
+@receiver(post_save, sender=DonationPost)
+@receiver(post_save, sender=RequestPost)
+@receiver(post_delete, sender=DonationPost)
+@receiver(post_delete, sender=RequestPost)
+def invalidate_feed(sender, instance, **kwargs):
+    # 생성(perform_create)/수정/삭제 모두 커밋 후 해당 피드 캐시만 무효화
+    cache = get_feed_cache()
+    if cache is not None:
+        feed = FEED_NAMES[sender]
+        transaction.on_commit(lambda: cache.invalidate(feed))
+
+
+@receiver(pre_save, sender=DonationPost)
+@receiver(pre_save, sender=RequestPost)
+def remember_image_variants(sender, instance, **kwargs):
+    # 변형은 save_variants 가 update() 로 기록하므로 메모리의 instance 가 아니라 DB 값을 기준으로
+    instance._stored_variants = None
+    if instance.pk is not None:
+        instance._stored_variants = sender.objects.filter(pk=instance.pk).values_list('image_variants', flat=True).first()
+
+
+@receiver(post_save, sender=DonationPost)
+@receiver(post_save, sender=RequestPost)
+def create_image_variants(sender, instance, **kwargs):
+    # 이미지가 바뀌었거나 지워졌으면 예전 원본의 변형 파일을 커밋 후 삭제
+    stored = getattr(instance, '_stored_variants', None) or {}
+    if stored.get('source') and stored['source'] != (instance.image.name if instance.image else None):
+        storage = sender._meta.get_field('image').storage
+        transaction.on_commit(lambda: delete_variants(storage, stored))
+        # 지운 변형을 가리키지 않도록 (다음 저장에서 다시 삭제하지 않음)
+        sender.objects.filter(pk=instance.pk).update(image_variants={})
+        instance.image_variants = {}
+    # 새 이미지일 때만 (변형이 이미 이 원본으로 만들어졌으면 건너뜀)
+    if needs_variants(instance):
+        schedule_variants(instance)
+
+
+@receiver(post_delete, sender=DonationPost)
+@receiver(post_delete, sender=RequestPost)
+def delete_image_variants(sender, instance, **kwargs):
+    if instance.image_variants:
+        storage = sender._meta.get_field('image').storage
+        variants = instance.image_variants
+        transaction.on_commit(lambda: delete_variants(storage, variants))
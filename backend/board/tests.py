@@ -1,3 +1,293 @@
-from django.test import TestCase
+import io
+import unittest
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import NotSupportedError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from PIL import Image
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from login.models import User
+from . import cache as feed_cache
+from .filters import query_filters, search_queryset
+from .images import VariantPool, strip_metadata
+from .models import DonationPost, RequestPost
+from .popularity import RedisViewCounter
+
+try:
+    import fakeredis
+except ImportError:  # 개발 환경에만 있음
+    fakeredis = None
+
+
+@unittest.skipIf(fakeredis is None, 'fakeredis 가 필요합니다')
+class ViewCounterFlushTests(TestCase):
+
+    def setUp(self):
+        self.post = DonationPost.objects.create(
+            donor_name='d', blood_type='A+', age=30, gender='M', region='서울', introduction='i',
+        )
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        with mock.patch('pitza.redis_client.get_redis', return_value=self.redis):
+            self.counter = RedisViewCounter(half_life=3600)
+
+    def test_flush_adds_views_once(self):
+        for _ in range(3):
+            self.counter.record('donation', self.post.id)
+        self.assertEqual(self.counter.flush(), 3)
+        self.assertEqual(self.counter.flush(), 0)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 3)
+        self.assertEqual(self.counter.trending_ids('donation', 10), [self.post.id])
+
+    def test_flushed_views_change_the_detail_etag(self):
+        url = f'/donation-cards/donate/{self.post.id}/'
+        response = self.client.get(url)
+        etag = response['ETag']
+        # If-Modified-Since 로는 flush 된 조회수를 알 수 없으므로 Last-Modified 를 보내지 않음
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        for _ in range(2):
+            self.counter.record('donation', self.post.id)
+        self.counter.flush()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['view_count'], 2)
+
+    def test_crash_after_commit_does_not_double_count(self):
+        for _ in range(2):
+            self.counter.record('donation', self.post.id)
+        # DB 커밋 후 Redis 배치 삭제 전에 중단
+        with mock.patch.object(self.redis, 'pipeline', side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                self.counter.flush()
+        self.assertEqual(len(list(self.redis.scan_iter('board:views:flushing:*'))), 1)
+
+        self.counter.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 2)
+        self.assertEqual(list(self.redis.scan_iter('board:views:flushing:*')), [])
+        self.assertEqual(self.counter.trending_ids('donation', 10), [self.post.id])
+
+
+class PostImageTests(TestCase):
+
+    def test_strip_metadata_removes_gps(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # 90도 회전
+        exif[0x8825] = {1: 'N', 2: (37.0, 30.0, 0.0)}
+        buffer = io.BytesIO()
+        Image.new('RGB', (40, 20), 'red').save(buffer, 'JPEG', exif=exif.tobytes(), comment=b'home')
+
+        stripped = strip_metadata(SimpleUploadedFile('photo.jpg', buffer.getvalue())).read()
+        with Image.open(io.BytesIO(stripped)) as image:
+            self.assertEqual(dict(image.getexif()), {})
+            self.assertEqual(image.size, (20, 40))
+        self.assertNotIn(b'home', stripped)
+
+    @override_settings(BOARD_IMAGE_VARIANTS='')
+    def test_replacing_image_deletes_old_variants(self):
+        variants = {'source': 'old.jpg', 'thumb': {'webp': 'variants/old_thumb.webp'}}
+        post = DonationPost.objects.create(
+            donor_name='d', blood_type='A+', age=30, gender='M', region='서울', introduction='i',
+            image='old.jpg', image_variants=variants,
+        )
+        post.image = 'new.jpg'
+        with mock.patch('board.signals.delete_variants') as delete_variants:
+            with self.captureOnCommitCallbacks(execute=True):
+                post.save()
+            delete_variants.assert_called_once_with(DonationPost._meta.get_field('image').storage, variants)
+
+            delete_variants.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                post.introduction = 'edited'
+                post.save()
+            delete_variants.assert_not_called()
+
+
+class VariantPoolTests(SimpleTestCase):
+
+    @mock.patch('board.images.ProcessPoolExecutor')
+    def test_submissions_are_bounded(self, executor):
+        pool = VariantPool(workers=1, max_pending=1)
+        post = mock.Mock()
+        post.image.open.side_effect = lambda mode: io.BytesIO(b'image')
+
+        self.assertTrue(pool.submit(post))
+        self.assertFalse(pool.submit(post))
+
+        # 작업이 끝나면 자리가 다시 생김
+        future = executor.return_value.submit.return_value
+        callback = future.add_done_callback.call_args[0][0]
+        future.result.side_effect = RuntimeError('render failed')
+        with self.assertLogs('board.images', 'ERROR'):
+            callback(future)
+        self.assertTrue(pool.submit(post))
+
+
+class FeedPaginationTests(TestCase):
+
+    def setUp(self):
+        self.posts = [
+            DonationPost.objects.create(
+                donor_name='d', blood_type='A+', age=30, gender='M', region='서울', introduction=f'post {i}',
+            )
+            for i in range(3)
+        ]
+
+    def test_without_page_params_returns_first_page_as_list(self):
+        # page_size/cursor 를 보내지 않는 기존 클라이언트는 배열, 단 최신 한 페이지까지만
+        with override_settings(BOARD_FEED_PAGE_SIZE=2):
+            response = self.client.get('/donation-cards/donate/')
+        self.assertEqual([post['id'] for post in response.json()], [post.id for post in reversed(self.posts)][:2])
+
+    def test_cursor_pages_cover_feed_once(self):
+        response = self.client.get('/donation-cards/donate/', {'page_size': 2}).json()
+        ids = [post['id'] for post in response['results']]
+        self.assertEqual(len(ids), 2)
+        response = self.client.get(response['next']).json()
+        ids += [post['id'] for post in response['results']]
+        self.assertIsNone(response['next'])
+        self.assertEqual(ids, [post.id for post in reversed(self.posts)])
+
+        self.assertEqual(self.client.get('/donation-cards/donate/', {'cursor': 'bogus'}).status_code, 400)
+
+
+class FeedFilterTests(TestCase):
+
+    def setUp(self):
+        self.posts = [
+            DonationPost.objects.create(
+                donor_name='d', blood_type=blood_type, age=30, gender='M', region=region, introduction=introduction,
+            )
+            for blood_type, region, introduction in [
+                ('A+', '서울', '주말 헌혈 가능합니다'),
+                ('A+', '부산', '평일 저녁 헌혈 가능'),
+                ('B+', '서울', '주말 오전만 가능'),
+            ]
+        ]
+
+    def ids(self, params):
+        response = self.client.get('/donation-cards/donate/', {'page_size': 10, **params})
+        return sorted(post['id'] for post in response.json()['results'])
+
+    def test_query_filters(self):
+        # 인코딩 안 된 + 는 공백으로 들어옴, 빈 값과 목록에 없는 파라미터는 무시
+        request = Request(APIRequestFactory().get('/', {'blood_type': 'A ', 'region': '', 'gender': 'M'}))
+        self.assertEqual(query_filters(request, ('blood_type', 'region')), {'blood_type': 'A+'})
+
+    def test_filters_and_search(self):
+        self.assertEqual(self.ids({'blood_type': 'A+', 'region': '서울'}), [self.posts[0].id])
+        self.assertEqual(self.ids({'region': '서울', 'search': '주말'}), [self.posts[0].id, self.posts[2].id])
+        # 모든 검색어를 포함해야 함
+        self.assertEqual(self.ids({'search': '주말 헌혈'}), [self.posts[0].id])
+        self.assertEqual(self.ids({'search': '  '}), [post.id for post in self.posts])
+
+    def test_search_falls_back_to_icontains(self):
+        queryset = DonationPost.objects.all()
+        # MySQL이 아니면 긴 검색어도 icontains
+        self.assertEqual(list(search_queryset(queryset, 'introduction', '저녁')), [self.posts[1]])
+        with mock.patch('board.filters.fulltext_available', return_value=True):
+            # ngram 토큰보다 짧은 검색어는 FULLTEXT 없이 icontains
+            self.assertEqual(list(search_queryset(queryset, 'introduction', '말 저')), [])
+            self.assertEqual(list(search_queryset(queryset, 'introduction', '오')), [self.posts[2]])
+            # 긴 검색어는 MATCH ... AGAINST (SQLite에서는 지원하지 않음)
+            with self.assertRaises(NotSupportedError):
+                list(search_queryset(queryset, 'introduction', '저녁'))
+
+
+@unittest.skipIf(fakeredis is None, 'fakeredis 가 필요합니다')
+@override_settings(BOARD_FEED_CACHE='redis')
+class FeedCacheTests(TestCase):
+
+    def setUp(self):
+        with mock.patch('pitza.redis_client.get_redis', return_value=fakeredis.FakeRedis(decode_responses=True)):
+            self.cache = feed_cache._cache = feed_cache.FeedCache(ttl=60, local_size=16)
+        self.post = self.create_post('first')
+
+    def tearDown(self):
+        feed_cache._cache = None
+
+    def create_post(self, introduction):
+        # 무효화는 커밋 후 (signals.invalidate_feed)
+        with self.captureOnCommitCallbacks(execute=True):
+            return DonationPost.objects.create(
+                donor_name='d', blood_type='A+', age=30, gender='M', region='서울', introduction=introduction,
+            )
+
+    def feed(self):
+        response = self.client.get('/donation-cards/donate/', {'page_size': 10})
+        return [post['introduction'] for post in response.json()['results']]
+
+    def test_save_and_delete_invalidate_the_feed(self):
+        self.assertEqual(self.feed(), ['first'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.feed(), ['first'])
+
+        self.create_post('second')
+        self.assertEqual(self.feed(), ['second', 'first'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.introduction = 'edited'
+            self.post.save()
+        self.assertEqual(self.feed(), ['second', 'edited'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertEqual(self.feed(), ['second'])
+        self.cache.flush_stats()
+        self.assertEqual(self.cache.stats(), {'local_hits': 1, 'misses': 4})
+
+    def test_other_feed_stays_cached(self):
+        self.feed()
+        generation = self.cache.generation('donation')
+        self.cache.invalidate('request')
+        self.assertEqual(self.cache.generation('donation'), generation)
+
+
+class TimelinePaginationTests(TestCase):
+
+    def setUp(self):
+        requester = User.objects.create(email='r@example.com', nickname='r')
+        now = timezone.now().replace(microsecond=0)
+        # 두 종류가 같은 created_at 을 갖는 경우 포함
+        for minutes in (0, 0, 1, 2, 2):
+            post = DonationPost.objects.create(
+                donor_name='d', blood_type='A+', age=30, gender='M', region='서울', introduction='i',
+            )
+            DonationPost.objects.filter(pk=post.pk).update(created_at=now - timedelta(minutes=minutes))
+        for minutes in (0, 1, 1, 3):
+            post = RequestPost.objects.create(requester=requester, blood_type='A+', region='서울', reason='r')
+            RequestPost.objects.filter(pk=post.pk).update(created_at=now - timedelta(minutes=minutes))
+
+    def test_cursor_walk_is_strictly_ordered(self):
+        ranks = {'donation': 1, 'request': 0}
+        page = self.client.get('/donation-cards/timeline/', {'page_size': 2}).json()
+        keys = []
+        while True:
+            keys += [
+                (parse_datetime(entry['post']['created_at']), ranks[entry['type']], entry['post']['id'])
+                for entry in page['results']
+            ]
+            if not page['next']:
+                break
+            page = self.client.get(page['next']).json()
+
+        self.assertEqual(len(keys), 9)
+        # (created_at, rank, id) 내림차순, 중복 없음
+        self.assertTrue(all(a > b for a, b in zip(keys, keys[1:])))
+
+
+class TimelineSchemaTests(TestCase):
+
+    def test_timeline_is_documented(self):
+        schema = self.client.get('/swagger/?format=openapi').json()
+        response = schema['paths']['/donation-cards/timeline/']['get']['responses']['200']['schema']
+        self.assertEqual(response['properties']['results']['items'], {'$ref': '#/definitions/TimelineEntry'})
+        self.assertEqual(schema['definitions']['TimelineEntry']['properties']['type']['enum'], ['donation', 'request'])
@@ -0,0 +1,64 @@
+import heapq
+from itertools import islice
+
+from django.db.models import Q
+from rest_framework import serializers
+
+from .pagination import FeedCursorPagination, load_position
+
+TIMELINE_CURSOR_SALT = 'board.timeline.cursor'
+
+
+class TimelineSource:
+    """
+    타임라인에 합쳐지는 게시글 종류 하나.
+    rank: created_at 이 같은 글끼리의 순서 (큰 쪽이 먼저), 커서에 저장되므로 종류마다 달라야 함
+    """
+
+    def __init__(self, kind, queryset, serializer_class, rank):
+        self.kind = kind
+        self.queryset = queryset
+        self.serializer_class = serializer_class
+        self.rank = rank
+
+    def after(self, position):
+        """전체 순서 (created_at, rank, id) 내림차순에서 position 다음에 오는 이 종류의 글"""
+        created_at, post_id = load_position(position)
+        if self.rank < position['rank']:
+            return self.queryset.filter(created_at__lte=created_at)
+        if self.rank > position['rank']:
+            return self.queryset.filter(created_at__lt=created_at)
+        return self.queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id))
+
+    def head(self, position, size):
+        """이 종류에서 다음 size 개 (한 번의 인덱스 범위 쿼리)를 병합 키와 함께"""
+        queryset = self.queryset if position is None else self.after(position)
+        for post in queryset.order_by('-created_at', '-id')[:size]:
+            yield (post.created_at, self.rank, post.id), self, post
+
+
+class TimelinePagination(FeedCursorPagination):
+    """
+    여러 종류의 게시글을 created_at 순으로 합친 타임라인 페이지.
+    종류마다 한 페이지(+1)만 읽어 heapq.merge 로 k-way 병합하고, 하나의 cursor가 모든 종류의 위치를 나타낸다.
+    """
+    cursor_salt = TIMELINE_CURSOR_SALT
+
+    def paginate_sources(self, sources, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        if position is not None and not all(key in position for key in ('created_at', 'rank', 'id')):
+            raise serializers.ValidationError({'cursor': ['Invalid cursor.']})
+
+        try:
+            heads = [source.head(position, page_size + 1) for source in sources]
+            entries = list(islice(heapq.merge(*heads, key=lambda entry: entry[0], reverse=True), page_size + 1))
+        except (TypeError, ValueError):
+            raise serializers.ValidationError({'cursor': ['Invalid cursor.']})
+
+        self.next_position = None
+        if len(entries) > page_size:
+            (created_at, rank, post_id), _, _ = entries[page_size - 1]
+            self.next_position = {'created_at': created_at.isoformat(), 'rank': rank, 'id': post_id}
+        return [(source, post) for _, source, post in entries[:page_size]]
@@ -8,11 +8,16 @@ urlpatterns = [
     path('donation-cards/donate/', views.DonationPostList.as_view(), name='donation-list'),
     path('donation-cards/donate/create/', views.DonationPostCreate.as_view(), name='donation-create'),
     path('donation-cards/donate/<int:pk>/', views.DonationPostDetail.as_view(), name='donation-detail'),
+    path('donation-cards/donate/trending/', views.DonationPostTrending.as_view(), name='donation-trending'),
 
     # 요청
     path('donation-cards/request/', views.RequestPostList.as_view(), name='request-list'),
     path('donation-cards/request/create/', views.RequestPostCreate.as_view(), name='request-create'),
     path('donation-cards/request/<int:pk>/', views.RequestPostDetail.as_view(), name='request-detail'),
+    path('donation-cards/request/trending/', views.RequestPostTrending.as_view(), name='request-trending'),
+
+    # 기부 + 요청 타임라인
+    path('donation-cards/timeline/', views.TimelineList.as_view(), name='timeline'),
 ]
 
 if settings.DEBUG:
@@ -1,17 +1,37 @@
 from rest_framework import generics, permissions
 from .models import DonationPost, RequestPost
-from .serializers import DonationPostSerializer, RequestPostSerializer
+from .serializers import DonationPostSerializer, RequestPostSerializer, TimelineEntrySerializer
 from rest_framework.parsers import MultiPartParser, FormParser
+from pitza.conditional import ConditionalRetrieveMixin
+from .pagination import FeedCursorPagination
+from .filters import FeedFilterMixin, query_filters
+from .cache import CachedFeedMixin
+from .timeline import TimelinePagination, TimelineSource
+from .popularity import CountViewMixin, get_view_counter
+from rest_framework.response import Response
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
 
 #로그인
 #from django.contrib.auth import get_user_model
 #User = get_user_model()
 
+# 피드 작성자 정보: 게시글 페이지 조회 후 작성자들을 IN 쿼리 한 번으로 가져옴 (JOIN/N+1 없음)
+AUTHOR_FIELDS = ('id', 'email', 'kakao_id', 'nickname', 'profile_picture_key')
+
+
+def author_prefetch(field):
+    return Prefetch(field, queryset=get_user_model().objects.only(*AUTHOR_FIELDS))
+
 # 기부하기
-class DonationPostList(generics.ListAPIView):
-    queryset = DonationPost.objects.all().order_by('-created_at')
+class DonationPostList(CachedFeedMixin, FeedFilterMixin, generics.ListAPIView):
+    queryset = DonationPost.objects.prefetch_related(author_prefetch('donor'))
     serializer_class = DonationPostSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = FeedCursorPagination
+    filter_fields = ('blood_type', 'region', 'gender')
+    search_field = 'introduction'
+    feed_name = 'donation'
 
 class DonationPostCreate(generics.CreateAPIView):
     queryset = DonationPost.objects.all()
@@ -30,16 +50,24 @@ class DonationPostCreate(generics.CreateAPIView):
         else:
             serializer.save(donor=None)  # 로그인 안 되어 있을 경우 None으로 저장
 
-class DonationPostDetail(generics.RetrieveAPIView):
+class DonationPostDetail(CountViewMixin, ConditionalRetrieveMixin, generics.RetrieveAPIView):
     queryset = DonationPost.objects.all()
     serializer_class = DonationPostSerializer
     permission_classes = [permissions.AllowAny]
+    # 작성자 닉네임/프로필도 응답에 포함되므로 작성자 변경도 ETag에 반영.
+    # view_count 는 updated_at 을 바꾸지 않고 flush_view_counts 가 올리므로 ETag 에 따로 넣는다
+    version_fields = ('updated_at', 'donor__updated_at', 'view_count')
+    view_kind = 'donation'
 
 # 요청하기
-class RequestPostList(generics.ListAPIView):
-    queryset = RequestPost.objects.all().order_by('-created_at')
+class RequestPostList(CachedFeedMixin, FeedFilterMixin, generics.ListAPIView):
+    queryset = RequestPost.objects.prefetch_related(author_prefetch('requester'))
     serializer_class = RequestPostSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = FeedCursorPagination
+    filter_fields = ('blood_type', 'region')
+    search_field = 'reason'
+    feed_name = 'request'
 
 class RequestPostCreate(generics.CreateAPIView):
     queryset = RequestPost.objects.all()
@@ -54,7 +82,69 @@ class RequestPostCreate(generics.CreateAPIView):
         #test_user = User.objects.first()  # 또는 특정 ID로 지정: User.objects.get(id=1)
         #serializer.save(requester=test_user)
 
-class RequestPostDetail(generics.RetrieveAPIView):
+class RequestPostDetail(CountViewMixin, ConditionalRetrieveMixin, generics.RetrieveAPIView):
     queryset = RequestPost.objects.all()
     serializer_class = RequestPostSerializer
-    permission_classes = [permissions.AllowAny]
\ No newline at end of file
+    permission_classes = [permissions.AllowAny]
+    version_fields = ('updated_at', 'requester__updated_at', 'view_count')
+    view_kind = 'request'
+
+
+# 인기글: flush_view_counts 가 미리 계산한 감쇠 조회수 순위를 그대로 읽음
+class TrendingPostList(generics.GenericAPIView):
+    permission_classes = [permissions.AllowAny]
+    view_kind = None
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+
+        counter = get_view_counter()
+        ids = counter.trending_ids(self.view_kind, limit) if counter is not None else []
+        posts = self.get_queryset().in_bulk(ids)
+        # 순위 사이에 삭제된 글은 건너뜀
+        serializer = self.get_serializer([posts[post_id] for post_id in ids if post_id in posts], many=True)
+        return Response({'results': serializer.data})
+
+
+class DonationPostTrending(TrendingPostList):
+    queryset = DonationPost.objects.prefetch_related(author_prefetch('donor'))
+    serializer_class = DonationPostSerializer
+    view_kind = 'donation'
+
+
+class RequestPostTrending(TrendingPostList):
+    queryset = RequestPost.objects.prefetch_related(author_prefetch('requester'))
+    serializer_class = RequestPostSerializer
+    view_kind = 'request'
+
+
+# 홈 타임라인: 기부/요청 글을 created_at 순으로 합친 하나의 피드
+class TimelineList(generics.GenericAPIView):
+    # 응답 항목 모양 (swagger 문서용, 실제 post 는 각 종류의 serializer 로 만든다)
+    serializer_class = TimelineEntrySerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = TimelinePagination
+    filter_fields = ('blood_type', 'region')  # 두 게시판에 공통인 필터만
+
+    def get_sources(self):
+        filters = query_filters(self.request, self.filter_fields)
+        return [
+            TimelineSource('donation', DonationPost.objects.filter(**filters).prefetch_related(author_prefetch('donor')),
+                           DonationPostSerializer, rank=1),
+            TimelineSource('request', RequestPost.objects.filter(**filters).prefetch_related(author_prefetch('requester')),
+                           RequestPostSerializer, rank=0),
+        ]
+
+    def get(self, request, *args, **kwargs):
+        entries = self.paginator.paginate_sources(self.get_sources(), request)
+        context = self.get_serializer_context()
+        data = [
+            {'type': source.kind, 'post': source.serializer_class(post, context=context).data}
+            for source, post in entries
+        ]
+        return self.paginator.get_paginated_response(data)
@@ -0,0 +1,151 @@
+"""
+Channels WebSocket 채팅 (chat-server/server.js 와 같은 이벤트, 같은 테이블).
+
+클라이언트 -> 서버 JSON:
+    {"type": "join", "room_id": 1}
+    {"type": "text", "room_id": 1, "message": "..."}
+    {"type": "image", "room_id": 1, "image_url": "data:image/png;base64,..."}
+서버 -> 클라이언트 JSON: {"event": "chat message" | "error", "data": {...}}
+    (chat message payload 는 server.js 의 sendChatMessage 와 같은 모양)
+
+인증은 ?ticket= (login.tickets, DB 조회 없음) 또는 세션 쿠키(AuthMiddlewareStack).
+"""
+import base64
+import binascii
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from urllib.parse import parse_qs
+
+from login.tickets import InvalidTicket, tickets_enabled, verify_ticket
+from pitza.redis_client import get_async_redis
+
+from .inbox import room_channel
+from .models import ChatRoom, Message
+from .writer import get_writer, new_message_key
+
+
+def room_group(room_id):
+    return f"room_{room_id}"
+
+
+@database_sync_to_async
+def is_user_in_room(user_id, room_id):
+    # server.js isUserInRoom 과 같은 확인 (chat_chatroom_participants)
+    return ChatRoom.participants.through.objects.filter(chatroom_id=room_id, user_id=user_id).exists()
+
+
+def save_chat_image(content, user_id):
+    name = default_storage.save(f"chat-images/{int(time.time() * 1000)}_{user_id}.png", ContentFile(content))
+    return default_storage.url(name)
+
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+
+    async def connect(self):
+        self.user_id = self.authenticate()
+        if self.user_id is None:
+            await self.close(code=4401)
+            return
+        self.rooms = set()
+        await self.accept()
+
+    def authenticate(self):
+        ticket = parse_qs(self.scope.get('query_string', b'').decode()).get('ticket')
+        if ticket and tickets_enabled():
+            try:
+                return verify_ticket(ticket[0])['id']
+            except InvalidTicket:
+                return None
+        user = self.scope.get('user')
+        if user is not None and user.is_authenticated:
+            return user.id
+        return None
+
+    async def disconnect(self, code):
+        for room_id in getattr(self, 'rooms', ()):
+            await self.channel_layer.group_discard(room_group(room_id), self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        handler = {'join': self.join, 'text': self.text, 'image': self.image}.get(content.get('type'))
+        if handler is None:
+            await self.send_error('알 수 없는 이벤트입니다.')
+            return
+        try:
+            room_id = int(content.get('room_id'))
+        except (TypeError, ValueError):
+            await self.send_error('room_id 가 필요합니다.')
+            return
+        await handler(room_id, content)
+
+    async def join(self, room_id, content):
+        if not await is_user_in_room(self.user_id, room_id):
+            await self.send_error('해당 채팅방에 접근 권한이 없습니다.')
+            return
+        self.rooms.add(room_id)
+        await self.channel_layer.group_add(room_group(room_id), self.channel_name)
+
+    async def text(self, room_id, content):
+        message = content.get('message')
+        if not isinstance(message, str) or not message:
+            await self.send_error('메시지가 없습니다.')
+            return
+        await self.send_chat_message(room_id, message, 'text')
+
+    async def image(self, room_id, content):
+        image_url = content.get('image_url') or ''
+        if room_id not in self.rooms:
+            await self.send_error('해당 채팅방에 접근 권한이 없습니다.')
+            return
+        try:
+            data = base64.b64decode(image_url.split(',', 1)[1] if image_url.startswith('data:image') else image_url, validate=True)
+        except (binascii.Error, ValueError):
+            data = b''
+        if not data:
+            await self.send_error('이미지 데이터가 없습니다.')
+            return
+        url = await sync_to_async(save_chat_image)(data, self.user_id)
+        await self.send_chat_message(room_id, '[이미지]', 'image', url)
+
+    async def send_chat_message(self, room_id, message, message_type, image_url=None):
+        # join 으로 참가 확인된 방에만 보낼 수 있음
+        if room_id not in self.rooms:
+            await self.send_error('해당 채팅방에 접근 권한이 없습니다.')
+            return
+        sent_at = timezone.now().replace(microsecond=0)
+        payload = {
+            'room_id': room_id,
+            'user_id': self.user_id,
+            'message': message,
+            'timestamp': sent_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'message_type': message_type,
+            'image_url': image_url,
+            'is_read': False,
+        }
+        await get_async_redis().publish(room_channel(room_id), json.dumps(payload, ensure_ascii=False))
+        await self.channel_layer.group_send(room_group(room_id), {
+            'type': 'chat.message', 'payload': payload, 'sender': self.channel_name,
+        })
+        get_writer().add(Message(
+            stream_id=new_message_key(),
+            chatroom_id=room_id,
+            sender_id=self.user_id,
+            content=message,
+            message_type=message_type,
+            image_url=image_url,
+            timestamp=sent_at,
+        ))
+
+    async def chat_message(self, event):
+        # server.js 의 socket.broadcast.to(room) 처럼 보낸 연결에는 다시 보내지 않음
+        if event['sender'] != self.channel_name:
+            await self.send_json({'event': 'chat message', 'data': event['payload']})
+
+    async def send_error(self, message):
+        await self.send_json({'event': 'error', 'data': {'message': message}})
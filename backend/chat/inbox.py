@@ -0,0 +1,178 @@
+import json
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import ChatParticipant
+
+ROOM_CHANNEL_PATTERN = 'room_*_channel'
+
+
+def room_channel(room_id):
+    # server.js / chat.consumers 가 메시지마다 publish 하는 채널
+    return f"room_{room_id}_channel"
+
+
+def to_score(moment):
+    """datetime -> 정렬 점수 (epoch 밀리초)"""
+    return int(moment.timestamp() * 1000)
+
+
+def parse_event(channel, data):
+    """
+    room_{id}_channel 로 publish 된 server.js 메시지 payload -> (room_id, sender_id, score).
+    timestamp 는 formatTimestampForMySQL 형식 ('YYYY-MM-DD HH:MM:SS', UTC). 형식이 맞지 않으면 None.
+    """
+    try:
+        payload = json.loads(data)
+        room_id = int(payload.get('room_id') or channel.split('_')[1])
+        sender_id = int(payload['user_id'])
+        sent_at = datetime.strptime(payload['timestamp'], '%Y-%m-%d %H:%M:%S').replace(tzinfo=dt_timezone.utc)
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+    return room_id, sender_id, to_score(sent_at)
+
+
+class RedisInbox:
+    """
+    사용자별 채팅방 목록 인덱스.
+
+    chat:inbox:{user_id}    ZSET room_id -> 마지막 메시지 시각 (epoch ms, 메시지 없는 방은 생성 시각)
+
+    순서만 담는다. 안 읽은 수는 MySQL의 ChatParticipant.unread_count 가 기준이고 목록을 읽을 때 같이 조회한다
+    (pub/sub 으로 올리는 수와 읽음 재계산이 엇갈려 두 번 세지 않도록).
+    메시지 이벤트는 run_inbox_indexer 가 room_{id}_channel pub/sub 에서 반영하고,
+    방 생성/나가기는 chat.views 가 커밋 후 직접 반영한다.
+    pub/sub 은 구독자가 없을 때의 메시지를 버리므로 어긋나면 rebuild_chat_inbox 로 MySQL에서 다시 만든다.
+    """
+    prefix = 'chat'
+    REBUILD_CHUNK = 500
+
+    def __init__(self):
+        from pitza.redis_client import get_redis
+        self.redis = get_redis()
+
+    def _inbox_key(self, user_id):
+        return f"{self.prefix}:inbox:{user_id}"
+
+    def _unread_key(self, user_id):
+        # 예전 버전이 쓰던 안 읽은 수 HASH (rebuild 가 지움)
+        return f"{self.prefix}:unread:{user_id}"
+
+    def add_room(self, room_id, user_ids, score):
+        # 이미 있는 방(메시지 점수)은 덮어쓰지 않음
+        pipe = self.redis.pipeline()
+        for user_id in user_ids:
+            pipe.zadd(self._inbox_key(user_id), {room_id: score}, nx=True)
+        pipe.execute()
+
+    def remove_room(self, user_id, room_id):
+        self.redis.zrem(self._inbox_key(user_id), room_id)
+
+    def record_events(self, events, members):
+        """
+        events: [(room_id, sender_id, score)], members: {room_id: [user_id]}.
+        참가자들의 방 점수를 앞으로만 옮긴다 (ZADD GT). 파이프라인 한 번.
+        """
+        latest = {}
+        for room_id, _, score in events:
+            latest[room_id] = max(score, latest.get(room_id, score))
+
+        pipe = self.redis.pipeline(transaction=False)
+        for room_id, score in latest.items():
+            for user_id in members.get(room_id, ()):
+                pipe.zadd(self._inbox_key(user_id), {room_id: score}, gt=True)
+        pipe.execute()
+
+    def page(self, user_id, position, limit):
+        """
+        최근 활동 순 한 페이지 -> ([room_id], 다음 position).
+        position 은 (score, 같은 점수에서 이미 넘긴 개수): ZREVRANGEBYSCORE ... LIMIT 이라 O(log n + limit).
+        """
+        key = self._inbox_key(user_id)
+        if position is None:
+            entries = self.redis.zrevrange(key, 0, limit, withscores=True)
+        else:
+            score, skip = position
+            entries = self.redis.zrevrangebyscore(key, score, '-inf', start=skip, num=limit + 1, withscores=True)
+
+        next_position = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            last_score = entries[-1][1]
+            ties = sum(1 for _, score in entries if score == last_score)
+            if position is not None and position[0] == last_score:
+                ties += position[1]
+            next_position = (last_score, ties)
+
+        return [int(member) for member, _ in entries], next_position
+
+    def rebuild(self, user_ids=None):
+        """MySQL의 ChatParticipant/ChatRoom 에서 인덱스를 다시 만들고 사용자 수를 반환"""
+        participants = ChatParticipant.objects.select_related('chatroom').only(
+            'user_id', 'chatroom__id', 'chatroom__created_at', 'chatroom__last_message_at'
+        ).order_by('user_id')
+        if user_ids is not None:
+            participants = participants.filter(user_id__in=user_ids)
+
+        rebuilt = set()
+        inboxes = defaultdict(dict)
+        for participant in participants.iterator(chunk_size=self.REBUILD_CHUNK):
+            room = participant.chatroom
+            inboxes[participant.user_id][room.id] = to_score(room.last_message_at or room.created_at)
+            if len(inboxes) >= self.REBUILD_CHUNK:
+                rebuilt.update(self._replace(inboxes))
+        rebuilt.update(self._replace(inboxes))
+
+        # 방이 하나도 남지 않은 사용자의 인덱스 삭제
+        stale = []
+        if user_ids is None:
+            for key in self.redis.scan_iter(f"{self.prefix}:inbox:*"):
+                user_id = int(key.rsplit(':', 1)[1])
+                if user_id not in rebuilt:
+                    stale.append(user_id)
+        else:
+            stale = [user_id for user_id in user_ids if user_id not in rebuilt]
+        for start in range(0, len(stale), self.REBUILD_CHUNK):
+            self.redis.delete(*[
+                key for user_id in stale[start:start + self.REBUILD_CHUNK]
+                for key in (self._inbox_key(user_id), self._unread_key(user_id))
+            ])
+        return len(rebuilt)
+
+    def _replace(self, inboxes):
+        # 사용자별로 DEL + 다시 쓰기를 MULTI 로 (읽는 쪽에서 빈 목록이 보이지 않도록)
+        pipe = self.redis.pipeline(transaction=True)
+        for user_id, rooms in inboxes.items():
+            pipe.delete(self._inbox_key(user_id), self._unread_key(user_id))
+            pipe.zadd(self._inbox_key(user_id), rooms)
+        pipe.execute()
+        user_ids = list(inboxes)
+        inboxes.clear()
+        return user_ids
+
+
+_inbox = None
+
+
+def get_inbox():
+    """설정된 채팅방 목록 인덱스, CHAT_INBOX 가 비어 있으면 None"""
+    global _inbox
+    backend = settings.CHAT_INBOX
+    if not backend:
+        return None
+    if _inbox is None:
+        if backend == 'redis':
+            _inbox = RedisInbox()
+        else:
+            raise ValueError(f"Unknown CHAT_INBOX backend: {backend}")
+    return _inbox
+
+
+def on_commit(method, *args):
+    """인덱스가 켜져 있으면 커밋 후 inbox.method(*args) 실행"""
+    inbox = get_inbox()
+    if inbox is not None:
+        transaction.on_commit(lambda: getattr(inbox, method)(*args))
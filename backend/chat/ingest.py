@@ -0,0 +1,167 @@
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import DatabaseError, IntegrityError, close_old_connections
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError, TimeoutError as RedisTimeoutError
+
+from .messaging import save_batch
+from .models import Message
+
+logger = logging.getLogger(__name__)
+
+
+def parse_entry(stream_id, fields):
+    """
+    server.js persistMessage 가 XADD 한 필드 -> 저장할 Message (형식이 맞지 않으면 None).
+    chat.writer 가 저장에 실패해 넘긴 항목은 key(이미 정한 'ws-...' 키)를 stream_id 로 쓴다.
+    """
+    try:
+        return Message(
+            stream_id=fields.get('key') or stream_id,
+            chatroom_id=int(fields['room_id']),
+            sender_id=int(fields['user_id']),
+            content=fields['message'],
+            message_type=fields.get('message_type') or 'text',
+            image_url=fields.get('image_url') or None,
+            timestamp=datetime.strptime(fields['timestamp'], '%Y-%m-%d %H:%M:%S').replace(tzinfo=dt_timezone.utc),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def stream_id_key(stream_id):
+    """'ms-seq' 스트림 id -> 비교용 (ms, seq)"""
+    ms, _, seq = stream_id.partition('-')
+    return int(ms), int(seq or 0)
+
+
+class StreamIngestor:
+    """
+    Redis Stream 의 채팅 메시지를 consumer group 으로 읽어 묶어서 저장.
+
+    - 배치: batch_size 개가 모이거나 첫 항목 이후 max_wait_ms 가 지나면 저장
+    - 저장: chat.messaging.save_batch (이미 저장된 stream_id 는 건너뛰고 bulk_create + 방 비정규화를 한 트랜잭션으로)
+    - 커밋 후 XACK. 그 전에 죽으면 항목이 pending 으로 남아 다시 읽히고(at-least-once),
+      stream_id unique 제약과 건너뛰기로 한 번만 저장된다
+    - claim_idle_ms 넘게 ack 안 된 다른 consumer 의 항목은 XAUTOCLAIM 으로 가져옴
+    - 같은 주기로 ack 된 항목만 XTRIM MINID 로 잘라냄 (server.js 는 자르지 않음). 스트림에는 이 그룹만 있다고 가정
+    - DB/Redis 오류는 로그를 남기고 RETRY_DELAYS 만큼 쉰 뒤 계속: 항목은 pending 으로 남아 다시 읽힌다
+    """
+    RETRY_DELAYS = (1, 2, 5, 10, 30)
+
+    def __init__(self, stream, group, consumer, batch_size=500, max_wait_ms=200, claim_idle_ms=60000):
+        from pitza.redis_client import get_redis
+        self.redis = get_redis()
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.max_wait_ms = max_wait_ms
+        self.claim_idle_ms = claim_idle_ms
+
+    def ensure_group(self):
+        try:
+            self.redis.xgroup_create(self.stream, self.group, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def _read(self, stream_id, count, block=None):
+        response = self.redis.xreadgroup(self.group, self.consumer, {self.stream: stream_id}, count=count, block=block)
+        return response[0][1] if response else []
+
+    def read_batch(self, idle_block_ms=1000):
+        """
+        다음 배치: 먼저 이 consumer 의 pending(저장 실패/재시작 전 항목), 없으면 새 항목을
+        batch_size 개 또는 첫 항목 후 max_wait_ms 까지 모은다.
+        """
+        pending = self._read('0', self.batch_size)
+        # 잘려서(예전 server.js 의 MAXLEN 등) 내용이 없는 pending 항목은 ack 만
+        trimmed = [stream_id for stream_id, fields in pending if not fields]
+        if trimmed:
+            self.redis.xack(self.stream, self.group, *trimmed)
+        pending = [(stream_id, fields) for stream_id, fields in pending if fields]
+        if pending:
+            return pending
+
+        entries = self._read('>', self.batch_size, block=idle_block_ms)
+        if not entries:
+            return []
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(entries) < self.batch_size:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            more = self._read('>', self.batch_size - len(entries), block=remaining_ms)
+            if not more:
+                break
+            entries.extend(more)
+        return entries
+
+    def persist(self, entries):
+        """배치를 저장하고 XACK, 새로 저장한 메시지 수를 반환"""
+        messages = []
+        for stream_id, fields in entries:
+            message = parse_entry(stream_id, fields)
+            if message is None:
+                logger.warning("Dropping malformed chat stream entry %s: %r", stream_id, fields)
+            else:
+                messages.append(message)
+
+        saved = len(save_batch(messages)) if messages else 0
+        self.redis.xack(self.stream, self.group, *[stream_id for stream_id, _ in entries])
+        return saved
+
+    def claim_stale(self):
+        """오래 ack 안 된 다른 consumer 의 항목을 이 consumer 의 pending 으로 가져오고 개수를 반환"""
+        claimed = self.redis.xautoclaim(
+            self.stream, self.group, self.consumer, self.claim_idle_ms, start_id='0-0', count=self.batch_size,
+        )
+        return len(claimed[1])
+
+    def trim(self):
+        """
+        ack 된 항목을 스트림에서 잘라내고 잘린 개수를 반환. 가장 오래된 pending 항목, 없으면 그룹이 마지막으로
+        읽은 항목 앞까지만 자르므로 아직 읽지 않았거나 ack 전인 항목은 남는다.
+        """
+        # last-delivered-id 를 먼저 읽어야 그 사이 새로 읽힌(pending) 항목이 기준보다 뒤에 있음
+        groups = {group['name']: group for group in self.redis.xinfo_groups(self.stream)}
+        min_id = groups[self.group]['last-delivered-id']
+        pending = self.redis.xpending(self.stream, self.group)
+        if pending['pending'] and stream_id_key(pending['min']) < stream_id_key(min_id):
+            min_id = pending['min']
+        return self.redis.xtrim(self.stream, minid=min_id, approximate=True)
+
+    def run(self, stdout=None):
+        self.ensure_group()
+        last_claim = 0
+        failures = 0
+        while True:
+            try:
+                if time.monotonic() - last_claim >= self.claim_idle_ms / 1000:
+                    self.claim_stale()
+                    self.trim()
+                    last_claim = time.monotonic()
+
+                entries = self.read_batch()
+                if not entries:
+                    continue
+                try:
+                    saved = self.persist(entries)
+                except IntegrityError:
+                    # 다른 consumer 가 같은 항목을 동시에 저장: pending 으로 남겨 다음 배치에서 건너뜀
+                    logger.warning("Chat stream batch conflicted, retrying", exc_info=True)
+                    continue
+                finally:
+                    close_old_connections()
+            except (DatabaseError, RedisConnectionError, RedisTimeoutError):
+                # 일시적인 장애: 명령을 죽이지 않고 쉬었다가 pending 부터 다시
+                delay = self.RETRY_DELAYS[min(failures, len(self.RETRY_DELAYS) - 1)]
+                failures += 1
+                logger.exception("Chat stream ingest failed, retrying in %ss", delay)
+                time.sleep(delay)
+                continue
+            failures = 0
+            if stdout is not None:
+                stdout.write(f"Saved {saved} of {len(entries)} messages.")
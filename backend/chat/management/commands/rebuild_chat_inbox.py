@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from chat.inbox import get_inbox
+
+
+class Command(BaseCommand):
+    help = 'MySQL의 채팅방/참가자 정보로 사용자별 채팅방 목록 인덱스(Redis)를 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='이 사용자만 (여러 번 지정 가능)')
+
+    def handle(self, *args, **options):
+        index = get_inbox()
+        if index is None:
+            self.stdout.write(self.style.WARNING("CHAT_INBOX is disabled. Nothing to rebuild."))
+            return
+
+        rebuilt = index.rebuild(options['users'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt chat inbox for {rebuilt} users."))
@@ -0,0 +1,35 @@
+import socket
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chat.ingest import StreamIngestor
+
+
+class Command(BaseCommand):
+    help = (
+        'server.js(CHAT_PERSIST_MODE=stream)가 Redis Stream 에 넣은 채팅 메시지를 consumer group 으로 읽어 '
+        'bulk_create 로 묶어서 저장합니다. 커밋 후 XACK 하므로 최소 한 번 전달되고, stream_id 로 중복 저장을 막습니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='이만큼 모이면 바로 저장')
+        parser.add_argument('--max-wait-ms', type=int, default=200, help='첫 메시지 후 최대 대기 시간 (밀리초)')
+        parser.add_argument('--claim-idle-ms', type=int, default=60000,
+                            help='이보다 오래 ack 안 된 다른 consumer 의 메시지를 가져와 저장 (밀리초)')
+        parser.add_argument('--consumer', default=socket.gethostname(),
+                            help='consumer 이름 (재시작해도 같으면 자기 pending 부터 바로 이어서 처리)')
+
+    def handle(self, *args, **options):
+        ingestor = StreamIngestor(
+            settings.CHAT_INGEST_STREAM,
+            settings.CHAT_INGEST_GROUP,
+            options['consumer'],
+            batch_size=options['batch_size'],
+            max_wait_ms=options['max_wait_ms'],
+            claim_idle_ms=options['claim_idle_ms'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingesting {settings.CHAT_INGEST_STREAM} as {settings.CHAT_INGEST_GROUP}/{options['consumer']}."
+        ))
+        ingestor.run(self.stdout if options['verbosity'] > 1 else None)
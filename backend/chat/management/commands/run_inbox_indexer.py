@@ -0,0 +1,60 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from chat.inbox import ROOM_CHANNEL_PATTERN, get_inbox, parse_event
+from chat.models import ChatParticipant
+
+
+class Command(BaseCommand):
+    help = (
+        'room_{id}_channel 에 publish 되는 채팅 메시지로 사용자별 채팅방 목록 인덱스(Redis)를 갱신합니다. '
+        '메시지를 모아서 참가자 조회 한 번, Redis 파이프라인 한 번으로 반영합니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='이만큼 모이면 바로 반영')
+        parser.add_argument('--max-wait-ms', type=int, default=100, help='첫 메시지 후 최대 대기 시간 (밀리초)')
+
+    def handle(self, *args, **options):
+        index = get_inbox()
+        if index is None:
+            self.stdout.write(self.style.WARNING("CHAT_INBOX is disabled."))
+            return
+
+        pubsub = index.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(ROOM_CHANNEL_PATTERN)
+        self.stdout.write(self.style.SUCCESS(f"Indexing messages from {ROOM_CHANNEL_PATTERN}."))
+
+        self.verbosity = options['verbosity']
+        max_wait = options['max_wait_ms'] / 1000
+        events = []
+        deadline = None
+        try:
+            while True:
+                timeout = max(deadline - time.monotonic(), 0) if deadline is not None else 1.0
+                message = pubsub.get_message(timeout=timeout)
+                if message is not None:
+                    event = parse_event(message['channel'], message['data'])
+                    if event is not None:
+                        events.append(event)
+                        if deadline is None:
+                            deadline = time.monotonic() + max_wait
+                if events and (len(events) >= options['batch_size'] or time.monotonic() >= deadline):
+                    self.flush(index, events)
+                    events = []
+                    deadline = None
+        finally:
+            pubsub.close()
+
+    def flush(self, index, events):
+        members = defaultdict(list)
+        room_ids = {room_id for room_id, _, _ in events}
+        for room_id, user_id in ChatParticipant.objects.filter(chatroom_id__in=room_ids).values_list('chatroom_id', 'user_id'):
+            members[room_id].append(user_id)
+        close_old_connections()
+        index.record_events(events, members)
+        if self.verbosity > 1:
+            self.stdout.write(f"Indexed {len(events)} messages in {len(room_ids)} rooms.")
@@ -0,0 +1,176 @@
+"""
+채팅방 비정규화 상태 관리.
+
+ChatRoom.last_message* 와 ChatParticipant.unread_count 는 메시지를 저장하는 쪽이
+같은 트랜잭션 안에서 갱신한다 (Node 채팅 서버는 server.js 의 saveMessage 가 같은 SQL을 실행).
+"""
+import logging
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import ChatParticipant, ChatRoom, Message
+
+logger = logging.getLogger(__name__)
+
+
+def record_messages(messages):
+    """
+    저장된 메시지들(id 있음)을 방 상태에 반영: 방별 마지막 메시지를 옮기고
+    보낸 사람을 제외한 참가자의 unread_count 를 올린다. 호출하는 쪽의 트랜잭션 안에서 실행해야 한다.
+    """
+    by_room = defaultdict(list)
+    for message in messages:
+        by_room[message.chatroom_id].append(message)
+
+    for room_id, room_messages in by_room.items():
+        latest = max(room_messages, key=lambda message: message.id)
+        # 더 최신 메시지가 이미 반영된 경우(동시 저장)는 건너뜀
+        ChatRoom.objects.filter(
+            Q(last_message_id__isnull=True) | Q(last_message_id__lt=latest.id), id=room_id
+        ).update(
+            last_message_id=latest.id,
+            last_message_content=latest.content,
+            last_message_at=latest.timestamp,
+        )
+
+        sent = Counter(message.sender_id for message in room_messages)
+        total = len(room_messages)
+        participants = ChatParticipant.objects.filter(chatroom_id=room_id)
+        participants.exclude(user_id__in=sent).update(unread_count=F('unread_count') + total)
+        for sender_id, count in sent.items():
+            if count < total:
+                participants.filter(user_id=sender_id).update(unread_count=F('unread_count') + (total - count))
+
+
+def save_batch(messages):
+    """
+    stream_id(중복 제거 키)가 있는 저장 전 Message 들을 bulk_create 하고 방 상태까지 한 트랜잭션으로 반영.
+    이미 저장된 stream_id, 없는 방/보낸 사람의 메시지는 건너뛴다 (배치 전체가 FK 오류로 막히지 않도록).
+    새로 저장한 메시지(id 있음) 리스트를 반환.
+    """
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+
+    room_ids = {message.chatroom_id for message in messages}
+    sender_ids = {message.sender_id for message in messages}
+    with transaction.atomic():
+        done = set(Message.objects.filter(stream_id__in=[m.stream_id for m in messages]).values_list('stream_id', flat=True))
+        rooms = set(ChatRoom.objects.filter(id__in=room_ids).values_list('id', flat=True))
+        senders = set(User.objects.filter(id__in=sender_ids).values_list('id', flat=True))
+        new = []
+        for message in messages:
+            if message.stream_id in done:
+                continue
+            if message.chatroom_id not in rooms or message.sender_id not in senders:
+                logger.warning("Dropping chat message %s for missing room/sender", message.stream_id)
+                continue
+            done.add(message.stream_id)
+            new.append(message)
+        if not new:
+            return []
+        Message.objects.bulk_create(new)
+        # MySQL bulk_create 는 id 를 돌려주지 않으므로 stream_id 로 다시 읽음
+        saved = list(
+            Message.objects.filter(stream_id__in=[message.stream_id for message in new])
+            .only('id', 'chatroom_id', 'sender_id', 'content', 'timestamp')
+        )
+        record_messages(saved)
+    return saved
+
+
+def create_message(**fields):
+    """Message 하나를 저장하고 방 상태까지 한 트랜잭션으로 반영"""
+    with transaction.atomic():
+        message = Message.objects.create(**fields)
+        record_messages([message])
+    return message
+
+
+def advance_read_watermark(chatroom_id, user_id, message_id):
+    """
+    user 의 읽음 watermark 를 message_id 까지 옮기고 unread_count 를 다시 계산.
+    이미 그 이후까지 읽었으면 아무것도 바꾸지 않는다 (늦게 도착한 읽음 이벤트가 되돌리지 않도록). 옮겼으면 True.
+    메시지 행은 건드리지 않으므로 읽은 메시지 수와 관계없이 참가자 행 하나만 쓴다.
+    참가자가 아니면 ChatParticipant.DoesNotExist (읽음 요청으로 참가자 행을 만들지 않는다).
+    """
+    with transaction.atomic():
+        # 행 잠금: 동시에 저장되는 메시지의 unread_count +1 이 이 재계산 뒤에 적용되도록
+        participant = ChatParticipant.objects.select_for_update().get(user_id=user_id, chatroom_id=chatroom_id)
+        if participant.last_read_message_id is not None and participant.last_read_message_id >= message_id:
+            return False
+        participant.last_read_message_id = message_id
+        participant.unread_count = unread_count(chatroom_id, user_id, message_id)
+        participant.save(update_fields=['last_read_message', 'unread_count'])
+    return True
+
+
+def read_watermarks(participants):
+    """ChatParticipant 들 -> {user_id: 읽은 마지막 메시지 id}"""
+    return {participant.user_id: participant.last_read_message_id or 0 for participant in participants}
+
+
+def is_read(message, watermarks):
+    """보낸 사람이 아닌 참가자 중 누군가의 watermark 가 이 메시지에 닿았으면 읽음 (1:1 방에서는 상대방이 읽었는지)"""
+    return any(
+        watermark >= message.id for user_id, watermark in watermarks.items() if user_id != message.sender_id
+    )
+
+
+def unread_count(chatroom_id, user_id, last_read_message_id):
+    """watermark(last_read_message_id) 이후 다른 참가자가 보낸 메시지 수 ((chatroom, id) 범위 조회)"""
+    return Message.objects.filter(
+        chatroom_id=chatroom_id, id__gt=last_read_message_id or 0
+    ).exclude(sender_id=user_id).count()
+
+
+def message_page(chatroom_id, before_id=None, after_id=None, limit=50):
+    """
+    방 메시지 한 페이지를 (id 오름차순 리스트, 더 있는지) 로 반환. (chatroom, id) 인덱스 범위 조회라
+    방 크기와 관계없이 limit + 1 행만 읽는다.
+    - 인자 없음: 최신 limit 개, has_more 는 더 오래된 메시지가 있는지
+    - before_id: 그보다 오래된 limit 개 (위로 스크롤)
+    - after_id: 그보다 새로운 limit 개, has_more 는 더 새로운 메시지가 있는지 (재접속 후 따라잡기)
+    """
+    messages = Message.objects.filter(chatroom_id=chatroom_id).select_related('sender').only(
+        'id', 'chatroom_id', 'content', 'message_type', 'image_url', 'timestamp', 'sender__nickname'
+    )
+    if before_id is not None:
+        messages = messages.filter(id__lt=before_id)
+    if after_id is not None:
+        page = list(messages.filter(id__gt=after_id).order_by('id')[:limit + 1])
+        return page[:limit], len(page) > limit
+
+    page = list(messages.order_by('-id')[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    page.reverse()
+    return page, has_more
+
+
+def refresh_rooms(room_ids):
+    """
+    메시지 테이블에서 방 상태를 다시 계산 (bulk_create 등 record_messages 를 거치지 않은 쓰기 이후).
+    방/참가자마다가 아니라 UPDATE 두 번으로 처리.
+    """
+    latest = Message.objects.filter(chatroom=OuterRef('pk')).order_by('-id')
+    ChatRoom.objects.filter(id__in=room_ids).update(
+        last_message_id=Subquery(latest.values('id')[:1]),
+        last_message_content=Coalesce(Subquery(latest.values('content')[:1]), Value('')),
+        last_message_at=Subquery(latest.values('timestamp')[:1]),
+    )
+
+    unread = (
+        Message.objects
+        .filter(chatroom=OuterRef('chatroom_id'), id__gt=Coalesce(OuterRef('last_read_message_id'), 0))
+        .exclude(sender=OuterRef('user_id'))
+        .order_by()
+        .values('chatroom')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    ChatParticipant.objects.filter(chatroom_id__in=room_ids).update(
+        unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), 0)
+    )
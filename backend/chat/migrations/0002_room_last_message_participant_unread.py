@@ -0,0 +1,69 @@
+# Generated by Django 4.2.1 on 2026-10-18 08:59
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def backfill(apps, schema_editor):
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    ChatParticipant = apps.get_model('chat', 'ChatParticipant')
+    Message = apps.get_model('chat', 'Message')
+
+    # 모든 방 참가자에게 ChatParticipant 행 (지금까지는 읽음 처리할 때만 생성됨)
+    memberships = ChatRoom.participants.through.objects.values_list('chatroom_id', 'user_id')
+    ChatParticipant.objects.bulk_create(
+        [ChatParticipant(chatroom_id=chatroom_id, user_id=user_id) for chatroom_id, user_id in memberships.iterator()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+    latest = Message.objects.filter(chatroom=OuterRef('pk')).order_by('-id')
+    ChatRoom.objects.update(
+        last_message_id=Subquery(latest.values('id')[:1]),
+        last_message_content=Coalesce(Subquery(latest.values('content')[:1]), Value('')),
+        last_message_at=Subquery(latest.values('timestamp')[:1]),
+    )
+
+    unread = (
+        Message.objects
+        .filter(chatroom=OuterRef('chatroom_id'), id__gt=Coalesce(OuterRef('last_read_message_id'), 0))
+        .exclude(sender=OuterRef('user_id'))
+        .order_by()
+        .values('chatroom')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    ChatParticipant.objects.update(unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatparticipant',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.message'),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message_content',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_room_last_message_participant_unread'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chatroom', 'id'], name='message_room_id_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:03
+
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def watermarks_from_is_read(apps, schema_editor):
+    ChatParticipant = apps.get_model('chat', 'ChatParticipant')
+    Message = apps.get_model('chat', 'Message')
+
+    # 읽음 처리한 적 없이 is_read 만 남은 참가자: 상대가 보낸 메시지 중 읽힌 마지막 것을 watermark 로
+    last_read = (
+        Message.objects
+        .filter(chatroom=OuterRef('chatroom_id'), is_read=True)
+        .exclude(sender=OuterRef('user_id'))
+        .order_by('-id')
+        .values('id')[:1]
+    )
+    missing = ChatParticipant.objects.filter(last_read_message__isnull=True)
+    missing.update(last_read_message_id=Subquery(last_read))
+
+    unread = (
+        Message.objects
+        .filter(chatroom=OuterRef('chatroom_id'), id__gt=Coalesce(OuterRef('last_read_message_id'), 0))
+        .exclude(sender=OuterRef('user_id'))
+        .order_by()
+        .values('chatroom')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    ChatParticipant.objects.filter(last_read_message__isnull=False).update(
+        unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_message_room_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(watermarks_from_is_read, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_read_watermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='stream_id',
+            field=models.CharField(blank=True, max_length=32, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+from django.db.models import Exists, OuterRef
+
+
+def remove_non_members(apps, schema_editor):
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    ChatParticipant = apps.get_model('chat', 'ChatParticipant')
+
+    # 읽음 요청(get_or_create)으로 생긴, chat_chatroom_participants 에 없는 사용자의 ChatParticipant 행
+    membership = ChatRoom.participants.through.objects.filter(
+        chatroom_id=OuterRef('chatroom_id'), user_id=OuterRef('user_id')
+    )
+    ChatParticipant.objects.exclude(Exists(membership)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_message_stream_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_non_members, migrations.RunPython.noop),
+    ]
@@ -1,26 +1,42 @@
 from django.db import models
 # from django.contrib.auth.models import User
 from django.conf import settings
+from django.utils import timezone
 
 class ChatRoom(models.Model):
     participants = models.ManyToManyField(settings.AUTH_USER_MODEL)
     post_id = models.CharField(max_length=100)  # 게시글 ID (string으로 저장)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # 채팅방 목록용 비정규화: 마지막 메시지 (chat.messaging 이 메시지 저장과 같은 트랜잭션에서 갱신)
+    last_message = models.ForeignKey('Message', null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    last_message_content = models.TextField(blank=True, default='')
+    last_message_at = models.DateTimeField(null=True, blank=True)
+
 class Message(models.Model):
     chatroom = models.ForeignKey(ChatRoom, on_delete=models.CASCADE, related_name='messages')
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
-    is_read = models.BooleanField(default=False)
+    timestamp = models.DateTimeField(default=timezone.now)  # 스트림으로 늦게 저장돼도 보낸 시각 유지
 
     message_type = models.CharField(max_length=10, default='text')  # 'text' or 'image'
     image_url = models.URLField(blank=True, null=True)  # 이미지 저장용 URL
+    # 묶어서 저장된 메시지의 중복 제거 키: Redis Stream 항목 id (run_chat_ingestor) 또는 'ws-...' (chat.consumers)
+    stream_id = models.CharField(max_length=32, unique=True, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # 방별 메시지 페이지 (before_id/after_id 범위 조회)
+            models.Index(fields=['chatroom', 'id'], name='message_room_id_idx'),
+        ]
 
 class ChatParticipant(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     chatroom = models.ForeignKey(ChatRoom, on_delete=models.CASCADE)
+    # 읽음 watermark: 이 id 까지 읽음 (앞으로만 이동, chat.messaging.advance_read_watermark)
     last_read_message = models.ForeignKey(Message, null=True, blank=True, on_delete=models.SET_NULL)
+    # last_read_message 이후 다른 참가자가 보낸 메시지 수
+    unread_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ('user', 'chatroom')
@@ -1,5 +1,7 @@
 from rest_framework import serializers
+from .messaging import is_read
 from .models import ChatRoom, Message
+from django.conf import settings
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -21,11 +23,15 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'participants', 'created_at']
 
 class ChatRoomListSerializer(serializers.ModelSerializer):
+    """
+    채팅방 목록 한 줄. 방의 비정규화 필드(last_message_*)와 chatroom_list 가 붙인
+    my_unread_count, 미리 가져온 participants 만 읽으므로 방마다 추가 쿼리가 없다.
+    """
     chatroom_id = serializers.SerializerMethodField()
-    last_message = serializers.SerializerMethodField()
+    last_message = serializers.CharField(source='last_message_content')
     last_message_at = serializers.SerializerMethodField()
     partner = serializers.SerializerMethodField()
-    unread_count = serializers.SerializerMethodField()
+    unread_count = serializers.IntegerField(source='my_unread_count')
 
     class Meta:
         model = ChatRoom
@@ -34,18 +40,14 @@ class ChatRoomListSerializer(serializers.ModelSerializer):
     def get_chatroom_id(self, obj):
         return str(obj.id)
 
-    def get_last_message(self, obj):
-        last_msg = obj.messages.order_by('-timestamp').first()
-        return last_msg.content if last_msg else ""
-
     def get_last_message_at(self, obj):
-        last_msg = obj.messages.order_by('-timestamp').first()
-        return last_msg.timestamp.isoformat() if last_msg else None
+        return obj.last_message_at.isoformat() if obj.last_message_at else None
 
     def get_partner(self, obj):
         user = self.context['request'].user  # 현재 요청한 사용자
         # user = self.context.get('user') # 테스트를 위함
-        other = obj.participants.exclude(id=user.id).first()  # 현재 사용자를 제외한 상대방
+        # 현재 사용자를 제외한 상대방 (prefetch 된 participants 에서)
+        other = next((participant for participant in obj.participants.all() if participant.id != user.id), None)
 
         if not other:
             return None
@@ -58,32 +60,59 @@ class ChatRoomListSerializer(serializers.ModelSerializer):
             "profileImage": profile_url
         }
 
-    def get_unread_count(self, obj):
-        user = self.context.get('user')
-        if user is None:
-            return 0
-        return obj.messages.filter(is_read=False).exclude(sender=user).count()
-
 class MessageSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField()
     sender = serializers.CharField(source='sender.nickname')
     message = serializers.CharField(source='content')
     sent_at = serializers.DateTimeField(source='timestamp')
+    is_read = serializers.SerializerMethodField()
 
     class Meta:
         model = Message
         fields = ['id', 'sender', 'message', 'message_type', 'image_url', 'sent_at', 'is_read']
+        # donations.serializers.MessageSerializer 와 swagger 정의 이름이 겹치지 않도록
+        ref_name = 'ChatMessage'
+
+    def get_is_read(self, obj):
+        # 방 참가자들의 읽음 watermark 로 계산 (context['watermarks'])
+        return is_read(obj, self.context.get('watermarks', {}))
+
+class ChatRoomDetailSerializer(serializers.Serializer):
+    """
+    채팅방 정보 + 메시지 한 페이지 (id 오름차순).
+    has_more: after_id 없이 조회했으면 messages[0].id 이전 메시지가, after_id 로 조회했으면 이후 메시지가 더 있음
+    """
+    room_id = serializers.IntegerField()
+    participants = serializers.ListField(child=serializers.CharField())
+    messages = MessageSerializer(many=True)
+    has_more = serializers.BooleanField()
 
-class ChatRoomDetailSerializer(serializers.ModelSerializer):
+class MessagePageQuerySerializer(serializers.Serializer):
+    before_id = serializers.IntegerField(required=False, min_value=1, help_text='이 id 보다 오래된 메시지')
+    after_id = serializers.IntegerField(required=False, min_value=0, help_text='이 id 보다 새로운 메시지')
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_limit(self, value):
+        return min(value, settings.CHAT_MESSAGE_MAX_PAGE_SIZE)
+
+class MessagesSinceSerializer(serializers.Serializer):
+    room_id = serializers.IntegerField()
     messages = MessageSerializer(many=True)
-    participants = serializers.SlugRelatedField(
-        many=True, slug_field='nickname', read_only=True
-    )
-    room_id = serializers.IntegerField(source='id')
+    has_more = serializers.BooleanField()
 
-    class Meta:
-        model = ChatRoom
-        fields = ['room_id', 'messages', 'participants']
+class MessagesSinceQuerySerializer(serializers.Serializer):
+    after_id = serializers.IntegerField(min_value=0, help_text='클라이언트가 받은 마지막 메시지 id')
+    timeout = serializers.IntegerField(required=False, min_value=0, help_text='새 메시지가 없을 때 최대 대기 시간 (초)')
+
+    def validate_timeout(self, value):
+        return min(value, settings.CHAT_LONG_POLL_TIMEOUT)
+
+class InboxQuerySerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False, help_text='이전 응답의 next 에 들어 있는 cursor')
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_limit(self, value):
+        return min(value, settings.CHAT_INBOX_MAX_PAGE_SIZE)
 
 class ReadMessageUpdateRequestSerializer(serializers.Serializer):
     last_read_message_id = serializers.IntegerField()
@@ -1,3 +1,320 @@
-from django.test import TestCase
+import asyncio
+import threading
+import unittest
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.db import OperationalError, connection
+from django.test import AsyncClient, SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from login.models import User
+
+try:
+    import fakeredis
+except ImportError:  # 개발 환경에만 있음
+    fakeredis = None
+
+from .inbox import RedisInbox
+from .ingest import StreamIngestor, parse_entry, stream_id_key
+from .messaging import advance_read_watermark, create_message
+from .models import ChatParticipant, Message
+from .writer import AsyncMessageWriter, new_message_key
+
+
+class ChatMembershipTests(TestCase):
+    """채팅방 참가자만 읽음 처리/조회 가능"""
+
+    def setUp(self):
+        self.a = User.objects.create(email='a@example.com', nickname='a')
+        self.b = User.objects.create(email='b@example.com', nickname='b')
+        self.c = User.objects.create(email='c@example.com', nickname='c')
+        response = self.client_for(self.a).post('/chat/rooms', {'post_id': '1', 'receiver_id': self.b.id})
+        self.room_id = int(response.json()['chatroom_id'])
+        self.message = create_message(chatroom_id=self.room_id, sender=self.a, content='hello')
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_non_member_cannot_mark_read(self):
+        outsider = self.client_for(self.c)
+        response = outsider.post(f'/chat/rooms/{self.room_id}/messages/read', {'last_read_message_id': self.message.id})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ChatParticipant.objects.filter(user=self.c, chatroom_id=self.room_id).exists())
+        # 읽음 요청 후에도 방 조회는 계속 막힘
+        self.assertEqual(outsider.get(f'/chat/rooms/{self.room_id}').status_code, 403)
+
+    def test_member_read_advances_watermark(self):
+        response = self.client_for(self.b).post(
+            f'/chat/rooms/{self.room_id}/messages/read', {'last_read_message_id': self.message.id}
+        )
+        self.assertEqual(response.status_code, 200)
+        participant = ChatParticipant.objects.get(user=self.b, chatroom_id=self.room_id)
+        self.assertEqual((participant.last_read_message_id, participant.unread_count), (self.message.id, 0))
+
+        detail = self.client_for(self.a).get(f'/chat/rooms/{self.room_id}').json()
+        self.assertEqual([m['is_read'] for m in detail['messages']], [True])
+
+    def test_room_list_ignores_participant_row_without_membership(self):
+        # 예전 get_or_create 로 생긴 행: chat_chatroom_participants 에는 없음
+        ChatParticipant.objects.create(user=self.c, chatroom_id=self.room_id)
+        outsider = self.client_for(self.c)
+        self.assertEqual(outsider.get('/chat/rooms/list').json(), [])
+        self.assertEqual(outsider.get('/chat/rooms/inbox').json()['results'], [])
+        self.assertEqual(len(self.client_for(self.b).get('/chat/rooms/list').json()), 1)
+
+
+class ChatPagingTests(TestCase):
+    """메시지 기록/채팅방 목록 cursor, 읽음 watermark"""
+
+    def setUp(self):
+        self.a = User.objects.create(email='a@example.com', nickname='a')
+        self.others = [User.objects.create(email=f'{n}@example.com', nickname=n) for n in ('b', 'c', 'd')]
+        client = self.client_for(self.a)
+        self.room_ids = [
+            int(client.post('/chat/rooms', {'post_id': str(n), 'receiver_id': other.id}).json()['chatroom_id'])
+            for n, other in enumerate(self.others)
+        ]
+        self.messages = [
+            create_message(chatroom_id=self.room_ids[0], sender=self.a, content=f'm{n}') for n in range(5)
+        ]
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_history_pages_backwards(self):
+        client = self.client_for(self.others[0])
+        url = f'/chat/rooms/{self.room_ids[0]}'
+        page = client.get(url, {'limit': 2}).json()
+        ids = [message['id'] for message in page['messages']]
+        self.assertEqual(ids, [m.id for m in self.messages[3:]])
+        while page['has_more']:
+            page = client.get(url, {'limit': 2, 'before_id': ids[0]}).json()
+            ids = [message['id'] for message in page['messages']] + ids
+        self.assertEqual(ids, [m.id for m in self.messages])
+
+        page = client.get(url, {'limit': 2, 'after_id': self.messages[1].id}).json()
+        self.assertEqual(([m['id'] for m in page['messages']], page['has_more']), ([m.id for m in self.messages[2:4]], True))
+
+    def test_watermark_only_moves_forward(self):
+        b = self.others[0]
+        self.assertTrue(advance_read_watermark(self.room_ids[0], b.id, self.messages[3].id))
+        # 늦게 도착한 예전 읽음 이벤트는 무시
+        self.assertFalse(advance_read_watermark(self.room_ids[0], b.id, self.messages[1].id))
+        participant = ChatParticipant.objects.get(user=b, chatroom_id=self.room_ids[0])
+        self.assertEqual((participant.last_read_message_id, participant.unread_count), (self.messages[3].id, 1))
+
+    def test_inbox_cursor_orders_by_last_activity(self):
+        # 가장 최근 메시지가 있는 방이 먼저
+        create_message(
+            chatroom_id=self.room_ids[2], sender=self.others[2], content='late',
+            timestamp=timezone.now() + timedelta(hours=1),
+        )
+        client = self.client_for(self.a)
+        page = client.get('/chat/rooms/inbox', {'limit': 1}).json()
+        ids = [int(room['chatroom_id']) for room in page['results']]
+        while page['next']:
+            page = client.get(page['next']).json()
+            ids += [int(room['chatroom_id']) for room in page['results']]
+        self.assertEqual(ids[0], self.room_ids[2])
+        self.assertEqual(sorted(ids), sorted(self.room_ids))
+
+    @unittest.skipIf(fakeredis is None, 'fakeredis 가 필요합니다')
+    def test_redis_inbox_unread_is_not_counted_twice(self):
+        b = self.others[0]
+        with mock.patch('pitza.redis_client.get_redis', return_value=fakeredis.FakeRedis(decode_responses=True)):
+            index = RedisInbox()
+        index.rebuild()
+        advance_read_watermark(self.room_ids[0], b.id, self.messages[3].id)
+        # 읽음 재계산 뒤에 도착한 pub/sub 이벤트 (이미 센 메시지들)
+        events = [(self.room_ids[0], self.a.id, 1000 + n) for n in range(5)]
+        index.record_events(events, {self.room_ids[0]: [self.a.id, b.id]})
+
+        with mock.patch('chat.inbox.get_inbox', return_value=index):
+            rooms = self.client_for(b).get('/chat/rooms/inbox').json()['results']
+        self.assertEqual([int(room['chatroom_id']) for room in rooms], [self.room_ids[0]])
+        self.assertEqual(rooms[0]['unread_count'], 1)
+
+
+@unittest.skipIf(fakeredis is None, 'fakeredis 가 필요합니다')
+class RedisInboxTests(SimpleTestCase):
+
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        with mock.patch('pitza.redis_client.get_redis', return_value=self.redis):
+            self.inbox = RedisInbox()
+
+    def test_pages_through_tied_scores_once(self):
+        self.inbox.add_room(10, [1], 100)
+        self.inbox.add_room(11, [1], 100)
+        self.inbox.add_room(12, [1], 100)
+        self.inbox.add_room(13, [1], 50)
+        self.inbox.record_events([(13, 2, 200)], {13: [1, 2]})
+
+        rooms, position = self.inbox.page(1, None, 2)
+        seen = rooms
+        while position is not None:
+            rooms, position = self.inbox.page(1, position, 2)
+            seen += rooms
+        self.assertEqual(seen[0], 13)
+        self.assertEqual(sorted(seen), [10, 11, 12, 13])
+
+
+@unittest.skipIf(fakeredis is None, 'fakeredis 가 필요합니다')
+class StreamIngestorTests(TestCase):
+
+    def setUp(self):
+        self.a = User.objects.create(email='a@example.com', nickname='a')
+        self.b = User.objects.create(email='b@example.com', nickname='b')
+        response = APIClient()
+        response.force_authenticate(self.a)
+        self.room_id = int(response.post('/chat/rooms', {'post_id': '1', 'receiver_id': self.b.id}).json()['chatroom_id'])
+        self.redis = fakeredis.FakeRedis(decode_responses=True)
+        with mock.patch('pitza.redis_client.get_redis', return_value=self.redis):
+            self.ingestor = StreamIngestor('chat:test', 'ingest', 'c1', batch_size=10, max_wait_ms=0)
+        self.ingestor.ensure_group()
+
+    def add(self, message, **fields):
+        return self.redis.xadd('chat:test', {
+            'room_id': self.room_id, 'user_id': self.a.id, 'message': message,
+            'timestamp': '2026-01-01 00:00:00', **fields,
+        })
+
+    def test_redelivered_entries_are_saved_once(self):
+        self.add('one')
+        self.add('two')
+        self.redis.xadd('chat:test', {'room_id': 'x'})
+        entries = self.ingestor.read_batch(idle_block_ms=1)
+        self.assertEqual(len(entries), 3)
+
+        # MySQL 처럼 bulk_create 가 id 를 돌려주지 않아도 stream_id 로 다시 읽음
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            self.assertEqual(self.ingestor.persist(entries), 2)
+            # XACK 전에 죽었다가 다시 읽은 경우
+            self.assertEqual(self.ingestor.persist(entries), 0)
+
+        self.assertEqual(list(Message.objects.order_by('id').values_list('content', flat=True)), ['one', 'two'])
+        self.assertEqual(self.redis.xpending('chat:test', 'ingest')['pending'], 0)
+        participant = ChatParticipant.objects.get(user=self.b, chatroom_id=self.room_id)
+        self.assertEqual(participant.unread_count, 2)
+
+
+    def test_trim_keeps_unacked_entries(self):
+        ids = [self.add(str(n)) for n in range(3)]
+        entries = self.ingestor.read_batch(idle_block_ms=1)
+        self.ingestor.persist(entries[:2])
+        unread = self.add('not read yet')
+
+        with mock.patch.object(self.redis, 'xtrim') as xtrim:
+            # 가장 오래된 pending 항목 앞까지만
+            self.ingestor.trim()
+            self.assertEqual(xtrim.call_args.kwargs['minid'], ids[2])
+
+            # pending 이 없으면 그룹이 마지막으로 읽은 항목까지 (아직 읽지 않은 항목은 남음)
+            self.ingestor.persist(entries[2:])
+            self.ingestor.trim()
+            self.assertEqual(xtrim.call_args.kwargs['minid'], ids[2])
+        self.assertLess(stream_id_key(ids[2]), stream_id_key(unread))
+
+    @mock.patch('chat.ingest.time.sleep')
+    def test_run_survives_database_errors(self, sleep):
+        class Stop(Exception):
+            pass
+
+        entries = [('1-0', {})]
+        with mock.patch.object(self.ingestor, 'read_batch', return_value=entries), \
+                mock.patch.object(self.ingestor, 'persist', side_effect=[OperationalError('gone away'), Stop]) as persist:
+            with self.assertLogs('chat.ingest', 'ERROR'), self.assertRaises(Stop):
+                self.ingestor.run()
+        self.assertEqual(persist.call_count, 2)
+        sleep.assert_called_once_with(StreamIngestor.RETRY_DELAYS[0])
+
+
+class MessagesSinceTests(TestCase):
+    """long-poll 은 ASGI 에서만 기다리고, 기다리는 요청 수는 제한"""
+
+    def setUp(self):
+        self.a = User.objects.create(email='a@example.com', nickname='a')
+        self.b = User.objects.create(email='b@example.com', nickname='b')
+        client = APIClient()
+        client.force_authenticate(self.a)
+        self.room_id = int(client.post('/chat/rooms', {'post_id': '1', 'receiver_id': self.b.id}).json()['chatroom_id'])
+        self.url = f'/chat/rooms/{self.room_id}/messages/since'
+
+    @mock.patch('chat.views.get_async_redis')
+    def test_wsgi_returns_without_waiting(self, get_async_redis):
+        message = create_message(chatroom_id=self.room_id, sender=self.a, content='hello')
+        self.client.force_login(self.b)
+
+        response = self.client.get(self.url, {'after_id': message.id, 'timeout': 25})
+        self.assertEqual((response.status_code, response.json()['messages']), (200, []))
+        response = self.client.get(self.url, {'after_id': 0, 'timeout': 25})
+        self.assertEqual([m['message'] for m in response.json()['messages']], ['hello'])
+        get_async_redis.assert_not_called()
+
+    @mock.patch('chat.views._long_poll_slots', threading.BoundedSemaphore(1))
+    async def test_asgi_waiters_are_capped(self):
+        from chat import views
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.b)
+
+        views._long_poll_slots.acquire()
+        try:
+            response = await client.get(self.url, {'after_id': 0, 'timeout': 5})
+        finally:
+            views._long_poll_slots.release()
+        self.assertEqual((response.status_code, response['Retry-After']), (503, '1'))
+
+
+class ChatSchemaTests(TestCase):
+
+    def test_swagger_schema_builds(self):
+        # chat/donations 의 MessageSerializer 이름 충돌 시 SwaggerGenerationError
+        response = self.client.get('/swagger/?format=openapi')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ChatMessage', response.json()['definitions'])
+
+
+class AsyncMessageWriterTests(SimpleTestCase):
+
+    def message(self, content):
+        return Message(
+            stream_id=new_message_key(), chatroom_id=1, sender_id=2, content=content,
+            message_type='text', timestamp=timezone.now(),
+        )
+
+    @mock.patch('chat.writer.save_batch')
+    def test_close_saves_pending_messages(self, save_batch):
+        save_batch.side_effect = lambda batch: batch
+        messages = [self.message('a'), self.message('b')]
+
+        async def run():
+            writer = AsyncMessageWriter(batch_size=100, max_wait_ms=60000)
+            for message in messages:
+                writer.add(message)
+            await writer.close()
+
+        asyncio.run(run())
+        save_batch.assert_called_once_with(messages)
+
+    @mock.patch('chat.writer.get_async_redis')
+    @mock.patch('chat.writer.save_batch', side_effect=RuntimeError('db down'))
+    @mock.patch.object(AsyncMessageWriter, 'RETRY_DELAYS', (0, 0))
+    def test_failed_batch_goes_to_ingest_stream(self, save_batch, get_async_redis):
+        pipe = get_async_redis.return_value.pipeline.return_value
+        pipe.execute = mock.AsyncMock()
+        message = self.message('hello')
+
+        asyncio.run(AsyncMessageWriter(batch_size=1, max_wait_ms=0).flush([message]))
+
+        self.assertEqual(save_batch.call_count, 3)
+        (stream, fields), _ = pipe.xadd.call_args
+        self.assertEqual((fields['key'], fields['message']), (message.stream_id, 'hello'))
+        # ingestor 가 같은 키로 저장 (이미 저장돼 있으면 건너뜀)
+        self.assertEqual(parse_entry('1-0', {k: str(v) for k, v in fields.items()}).stream_id, message.stream_id)
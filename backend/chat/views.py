@@ -6,12 +6,27 @@ from rest_framework import status, serializers
 # from django.contrib.auth.models import User
 from django.contrib.auth import get_user_model
 from .models import ChatRoom, ChatParticipant, Message, Report
-from .serializers import ChatRoomSerializer, ChatRoomListSerializer, ChatRoomDetailSerializer, ChatRoomCreateRequestSerializer, ReadMessageUpdateRequestSerializer, ReportSerializer
+from .serializers import ChatRoomSerializer, ChatRoomListSerializer, ChatRoomDetailSerializer, ChatRoomCreateRequestSerializer, InboxQuerySerializer, MessagePageQuerySerializer, MessagesSinceQuerySerializer, MessagesSinceSerializer, ReadMessageUpdateRequestSerializer, ReportSerializer
 
 from rest_framework.permissions import AllowAny
 from rest_framework.decorators import api_view, permission_classes
 from django.shortcuts import get_object_or_404
-from django.db.models import Prefetch
+from django.db.models import F, Prefetch, Q
+from django.db.models.functions import Coalesce
+from django.db import transaction
+from django.conf import settings
+from django.core import signing
+from rest_framework.utils.urls import replace_query_param
+from datetime import datetime
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from pitza.redis_client import get_async_redis
+from . import inbox
+import asyncio
+import threading
+import time
+from .messaging import advance_read_watermark, message_page, read_watermarks
 
 import re
 
@@ -21,6 +36,10 @@ from drf_yasg.utils import swagger_auto_schema
 
 User = get_user_model()
 
+# 채팅방 목록 정렬 기준: 마지막 메시지 시각 (메시지가 없으면 생성 시각)
+LAST_ACTIVITY = Coalesce('last_message_at', 'created_at')
+INBOX_CURSOR_SALT = 'chat.inbox.cursor'
+
 class ChatRoomCreateView(APIView):
 
     @swagger_auto_schema(request_body=ChatRoomCreateRequestSerializer,responses={201: ChatRoomSerializer})
@@ -43,9 +62,15 @@ class ChatRoomCreateView(APIView):
         if existing_room:
             room = existing_room
         else:
-            room = ChatRoom.objects.create(post_id=post_id)
-            room.participants.set([sender, receiver])
-            room.save()
+            with transaction.atomic():
+                room = ChatRoom.objects.create(post_id=post_id)
+                room.participants.set([sender, receiver])
+                # 참가자별 읽음/안 읽음 상태
+                ChatParticipant.objects.bulk_create(
+                    [ChatParticipant(chatroom=room, user=sender), ChatParticipant(chatroom=room, user=receiver)],
+                    ignore_conflicts=True,
+                )
+                inbox.on_commit('add_room', room.id, [sender.id, receiver.id], inbox.to_score(room.created_at))
 
         response_data = {
             "chatroom_id": str(room.id),
@@ -60,26 +85,123 @@ class ChatRoomCreateView(APIView):
 def chatroom_list(request):
     user = request.user
 
-    chatrooms = ChatRoom.objects.filter(participants=user).order_by('-created_at')
+    # 방 + 내 ChatParticipant(unread_count) 한 쿼리, 상대방 정보 prefetch 한 쿼리
+    # 참가 여부는 chat_chatroom_participants 로 (ChatParticipant 행만으로 목록에 보이지 않도록)
+    chatrooms = (
+        ChatRoom.objects
+        .filter(participants=user, chatparticipant__user=user)
+        .annotate(my_unread_count=F('chatparticipant__unread_count'))
+        .prefetch_related(partner_prefetch())
+        .order_by(LAST_ACTIVITY.desc(), '-id')
+    )
     serializer = ChatRoomListSerializer(chatrooms, many=True, context={'request': request, 'user': user})
     return Response(serializer.data)
 
+@swagger_auto_schema(method='get', query_serializer=InboxQuerySerializer, responses={200: ChatRoomListSerializer(many=True)})
+@api_view(['GET'])
+def chatroom_inbox(request):
+    """
+    최근 활동(마지막 메시지) 순 채팅방 목록을 cursor 로 나눠서 반환: {next, results}.
+    CHAT_INBOX='redis' 면 사용자별 Redis 인덱스에서 방 id 순서를 읽고 그 방들만 id 로 조회한다 (안 읽은 수는 MySQL).
+    """
+    user = request.user
+    query = InboxQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    limit = query.validated_data.get('limit', settings.CHAT_INBOX_PAGE_SIZE)
+
+    position = None
+    if query.validated_data.get('cursor'):
+        try:
+            position = signing.loads(query.validated_data['cursor'], salt=INBOX_CURSOR_SALT)
+        except signing.BadSignature:
+            raise serializers.ValidationError({'cursor': ['Invalid cursor.']})
+
+    index = inbox.get_inbox()
+    try:
+        if index is not None:
+            rooms, next_position = redis_inbox_page(index, user, position, limit)
+        else:
+            rooms, next_position = sql_inbox_page(user, position, limit)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({'cursor': ['Invalid cursor.']})
+
+    next_link = None
+    if next_position is not None:
+        cursor = signing.dumps(next_position, salt=INBOX_CURSOR_SALT, compress=True)
+        next_link = replace_query_param(request.build_absolute_uri(), 'cursor', cursor)
+    serializer = ChatRoomListSerializer(rooms, many=True, context={'request': request, 'user': user})
+    return Response({'next': next_link, 'results': serializer.data})
+
+def redis_inbox_page(index, user, position, limit):
+    room_ids, next_position = index.page(user.id, tuple(position) if position else None, limit)
+    # 안 읽은 수는 참가자 행에서 같은 쿼리로 (읽음 재계산과 메시지 저장이 같은 행 잠금으로 맞춰 둔 값)
+    rooms = (
+        ChatRoom.objects
+        .filter(id__in=room_ids, chatparticipant__user=user)
+        .annotate(my_unread_count=F('chatparticipant__unread_count'))
+        .prefetch_related(partner_prefetch())
+        .in_bulk()
+    )
+    # 인덱스가 MySQL보다 늦은 경우(삭제된 방, 나간 방)는 건너뜀
+    page = [rooms[room_id] for room_id in room_ids if room_id in rooms]
+    return page, next_position and list(next_position)
+
+def sql_inbox_page(user, position, limit):
+    # (마지막 활동 시각, id) 내림차순 keyset
+    chatrooms = (
+        ChatRoom.objects
+        .filter(participants=user, chatparticipant__user=user)
+        .annotate(my_unread_count=F('chatparticipant__unread_count'), last_activity=LAST_ACTIVITY)
+        .prefetch_related(partner_prefetch())
+        .order_by('-last_activity', '-id')
+    )
+    if position is not None:
+        last_activity, room_id = datetime.fromisoformat(position[0]), int(position[1])
+        chatrooms = chatrooms.filter(Q(last_activity__lt=last_activity) | Q(last_activity=last_activity, id__lt=room_id))
+    rooms = list(chatrooms[:limit + 1])
+    next_position = None
+    if len(rooms) > limit:
+        rooms = rooms[:limit]
+        next_position = [rooms[-1].last_activity.isoformat(), rooms[-1].id]
+    return rooms, next_position
+
+def partner_prefetch():
+    return Prefetch('participants', queryset=User.objects.only('id', 'nickname', 'profile_picture_key'))
+
+@swagger_auto_schema(method='get', query_serializer=MessagePageQuerySerializer, responses={200: ChatRoomDetailSerializer})
 @api_view(['GET'])
-@swagger_auto_schema(responses={200: ChatRoomDetailSerializer})
 def chat_room_detail(request, room_id):
     user = request.user
 
+    query = MessagePageQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+
     try:
-        room = ChatRoom.objects.prefetch_related(
-            'participants',
-            Prefetch('messages', queryset=Message.objects.select_related('sender').order_by('timestamp'))
-        ).get(id=room_id)
-        
+        room = ChatRoom.objects.only('id').get(id=room_id)
+        # 참가자(닉네임 + 읽음 watermark)는 메시지 페이지와 별도로 한 쿼리
+        participants = list(
+            ChatParticipant.objects.filter(chatroom=room).select_related('user')
+            .only('user__id', 'user__nickname', 'last_read_message_id').order_by('id')
+        )
+        watermarks = read_watermarks(participants)
+
         # 요청 유저가 이 방의 참가자인지 확인
-        if user not in room.participants.all():
+        if user.id not in watermarks:
             return Response({"error": "not a participant"}, status=403)
 
-        serializer = ChatRoomDetailSerializer(room)
+        messages, has_more = message_page(
+            room.id,
+            before_id=params.get('before_id'),
+            after_id=params.get('after_id'),
+            limit=params.get('limit', settings.CHAT_MESSAGE_PAGE_SIZE),
+        )
+        serializer = ChatRoomDetailSerializer({
+            'room_id': room.id,
+            'participants': [participant.user.nickname for participant in participants],
+            'messages': messages,
+            'has_more': has_more,
+        }, context={'watermarks': watermarks})
         return Response(serializer.data)
     except ChatRoom.DoesNotExist:
         return Response({'error': 'ChatRoom not found'}, status=404)
@@ -88,6 +210,96 @@ def chat_room_detail(request, room_id):
         traceback.print_exc()
         return Response({'error': str(e)}, status=500)
 
+async def messages_since(request, room_id):
+    """
+    after_id 이후 메시지를 long-poll 로 반환 (WebSocket 이 끊긴 클라이언트용).
+    새 메시지가 있으면 바로, 없으면 room_{id}_channel publish 로 깨어나거나 timeout 까지 기다린 뒤 응답한다.
+
+    ASGI(uvicorn pitza.asgi, compose 의 web-asgi 서비스)에서만 기다린다: 기다리는 동안 스레드를 잡지 않고 이벤트 루프별
+    Redis 클라이언트를 재사용한다. 기다리는 요청은 프로세스당 CHAT_LONG_POLL_MAX_WAITERS 개까지이고
+    (pub/sub 마다 Redis 연결 하나), 넘으면 503 + Retry-After.
+    WSGI(gunicorn, manage.py runserver 등)에서는 요청마다 워커 스레드와 새 이벤트 루프를 쓰므로
+    기다리지 않고 바로 현재 페이지를 반환한다 (timeout 무시, 일반 polling).
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    user_id = await sync_to_async(lambda: request.user.id if request.user.is_authenticated else None)()
+    if user_id is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=403)
+
+    query = MessagesSinceQuerySerializer(data=request.GET)
+    if not query.is_valid():
+        return JsonResponse(query.errors, status=400)
+    after_id = query.validated_data['after_id']
+    timeout = query.validated_data.get('timeout', settings.CHAT_LONG_POLL_TIMEOUT)
+
+    watermarks = await sync_to_async(room_watermarks)(room_id)
+    if watermarks is None:
+        return JsonResponse({'error': 'ChatRoom not found'}, status=404)
+    if user_id not in watermarks:
+        return JsonResponse({'error': 'not a participant'}, status=403)
+
+    limit = settings.CHAT_MESSAGE_PAGE_SIZE
+    page = sync_to_async(message_page)
+    if not timeout or not isinstance(request, ASGIRequest):
+        messages, has_more = await page(room_id, after_id=after_id, limit=limit)
+    else:
+        slots = long_poll_slots()
+        if not slots.acquire(blocking=False):
+            response = JsonResponse({'error': 'too many waiting requests'}, status=503)
+            response['Retry-After'] = '1'
+            return response
+        try:
+            messages, has_more = await wait_for_messages(room_id, after_id, limit, timeout)
+        finally:
+            slots.release()
+
+    serializer = MessagesSinceSerializer(
+        {'room_id': room_id, 'messages': messages, 'has_more': has_more}, context={'watermarks': watermarks}
+    )
+    return JsonResponse(serializer.data)
+
+_long_poll_slots = None
+
+
+def long_poll_slots():
+    # WSGI 스레드/ASGI 루프 어디서든 쓸 수 있도록 asyncio 가 아닌 threading 세마포어
+    global _long_poll_slots
+    if _long_poll_slots is None:
+        _long_poll_slots = threading.BoundedSemaphore(settings.CHAT_LONG_POLL_MAX_WAITERS)
+    return _long_poll_slots
+
+async def wait_for_messages(room_id, after_id, limit, timeout):
+    page = sync_to_async(message_page)
+    # 조회 전에 구독해야 조회와 대기 사이에 온 메시지를 놓치지 않음
+    pubsub = get_async_redis().pubsub()
+    await pubsub.subscribe(inbox.room_channel(room_id))
+    try:
+        messages, has_more = await page(room_id, after_id=after_id, limit=limit)
+        deadline = time.monotonic() + timeout
+        while not messages and time.monotonic() < deadline:
+            remaining = deadline - time.monotonic()
+            if await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining) is None:
+                continue
+            # publish 는 저장보다 먼저 일어나므로(server.js, 묶음 저장) 행이 보일 때까지 잠깐씩 다시 조회
+            delay = 0.05
+            while not messages and time.monotonic() < deadline:
+                messages, has_more = await page(room_id, after_id=after_id, limit=limit)
+                if not messages:
+                    await asyncio.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+                    delay = min(delay * 2, 1)
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+    return messages, has_more
+
+def room_watermarks(room_id):
+    """{user_id: 읽음 watermark}, 방이 없으면 None"""
+    watermarks = read_watermarks(ChatParticipant.objects.filter(chatroom_id=room_id).only('user_id', 'last_read_message_id'))
+    if not watermarks and not ChatRoom.objects.filter(id=room_id).exists():
+        return None
+    return watermarks
+
 class ReadMessageUpdateView(APIView):
     @swagger_auto_schema(request_body=ReadMessageUpdateRequestSerializer, responses={200: 'Success'})
     def post(self, request, room_id):
@@ -99,21 +311,20 @@ class ReadMessageUpdateView(APIView):
                 return Response({"error": "last_read_message_id is required"}, status=400)
 
             chatroom = ChatRoom.objects.get(id=room_id)
-            message = Message.objects.get(id=last_read_message_id, chatroom=chatroom)
-
-            participant, created = ChatParticipant.objects.get_or_create(user=user, chatroom=chatroom)
-            participant.last_read_message = message
-            participant.save()
+            # 참가자만 읽음 처리 가능 (server.js isUserInRoom 과 같은 chat_chatroom_participants 확인)
+            if not chatroom.participants.filter(id=user.id).exists():
+                return Response({"error": "not a participant"}, status=403)
+            message = Message.objects.only('id').get(id=last_read_message_id, chatroom=chatroom)
 
-            Message.objects.filter(
-                chatroom=chatroom,
-                id__lte=last_read_message_id
-            ).exclude(sender=user).update(is_read=True)
+            # 메시지별 is_read 대신 참가자의 watermark 만 앞으로 이동 (이미 더 읽었으면 그대로)
+            advance_read_watermark(chatroom.id, user.id, message.id)
 
             return Response({"success": True})
 
         except ChatRoom.DoesNotExist:
             return Response({"error": "ChatRoom not found"}, status=404)
+        except ChatParticipant.DoesNotExist:
+            return Response({"error": "not a participant"}, status=403)
         except Message.DoesNotExist:
             return Response({"error": "Message not found in room"}, status=404)
         except Exception as e:
@@ -127,7 +338,10 @@ def leave_chat_room(request, room_id):
         room = ChatRoom.objects.get(id=room_id)
         
         if user in room.participants.all():
-            room.participants.remove(user)
+            with transaction.atomic():
+                room.participants.remove(user)
+                ChatParticipant.objects.filter(chatroom=room, user=user).delete()
+                inbox.on_commit('remove_room', user.id, room.id)
             return Response({'message': '채팅방에서 나갔습니다.'}, status=200)
         else:
             return Response({'error': '채팅방에 없는 사용자입니다.'}, status=400)
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import uuid
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from pitza.redis_client import get_async_redis
+
+from .messaging import save_batch
+
+logger = logging.getLogger(__name__)
+
+
+def new_message_key():
+    # Message.stream_id 최대 32자
+    return f"ws-{uuid.uuid4().hex[:29]}"
+
+
+class AsyncMessageWriter:
+    """
+    WebSocket 메시지 저장을 이벤트 루프 밖에서 묶어서 처리.
+    add() 는 큐에 넣고 바로 돌아오고, batch_size 개가 모이거나 첫 메시지 후 max_wait_ms 가 지나면
+    save_batch(bulk_create + 방 비정규화, 한 트랜잭션)를 스레드에서 실행한다.
+    이미 방에 전달된 메시지라 저장 실패는 RETRY_DELAYS 간격으로 다시 시도하고, 그래도 안 되면
+    CHAT_INGEST_STREAM 에 넣어 run_chat_ingestor 가 저장하게 한다. 종료 시 close() 로 남은 메시지를 저장.
+    """
+    RETRY_DELAYS = (0.2, 1, 3)
+
+    def __init__(self, batch_size, max_wait_ms):
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending = []
+        self._timer = None
+        # 배치는 하나씩 순서대로 저장 (메시지 id 순서 = 처리 순서)
+        self._lock = asyncio.Lock()
+        self._tasks = set()
+
+    def add(self, message):
+        self._pending.append(message)
+        if len(self._pending) >= self.batch_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._start_flush)
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self.flush(batch))
+            # 완료 전에 task 가 GC 되지 않도록 참조 유지
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, batch):
+        async with self._lock:
+            for delay in (0,) + self.RETRY_DELAYS:
+                await asyncio.sleep(delay)
+                try:
+                    saved = await sync_to_async(self._save, thread_sensitive=False)(batch)
+                    logger.debug("Saved %d of %d chat messages", len(saved), len(batch))
+                    return
+                except Exception:
+                    logger.warning("Saving %d chat messages failed", len(batch), exc_info=True)
+            try:
+                await self._to_stream(batch)
+                logger.warning("Handed %d chat messages to %s for run_chat_ingestor", len(batch), settings.CHAT_INGEST_STREAM)
+            except Exception:
+                logger.exception("Chat messages lost: %s", [message.stream_id for message in batch])
+
+    @staticmethod
+    async def _to_stream(batch):
+        # server.js persistMessage 와 같은 필드 + key (ingestor 가 stream_id 로 써서 중복 저장 방지)
+        pipe = get_async_redis().pipeline(transaction=False)
+        for message in batch:
+            pipe.xadd(settings.CHAT_INGEST_STREAM, {
+                'room_id': message.chatroom_id,
+                'user_id': message.sender_id,
+                'message': message.content,
+                'message_type': message.message_type,
+                'timestamp': message.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                'image_url': message.image_url or '',
+                'key': message.stream_id,
+            })
+        await pipe.execute()
+
+    async def close(self):
+        """남은 메시지를 바로 저장하고 진행 중인 저장이 끝날 때까지 기다림 (프로세스 종료 전)"""
+        self._start_flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    @staticmethod
+    def _save(batch):
+        try:
+            return save_batch(batch)
+        finally:
+            close_old_connections()
+
+
+_writers = weakref.WeakKeyDictionary()
+
+
+def get_writer():
+    """실행 중인 이벤트 루프의 writer (daphne/uvicorn 은 프로세스당 루프 하나)"""
+    loop = asyncio.get_running_loop()
+    if loop not in _writers:
+        _writers[loop] = AsyncMessageWriter(settings.CHAT_WRITE_BATCH_SIZE, settings.CHAT_WRITE_MAX_WAIT_MS)
+    return _writers[loop]
+
+
+async def close_writer():
+    """실행 중인 이벤트 루프의 writer 를 비움 (pitza.asgi 의 lifespan shutdown)"""
+    writer = _writers.get(asyncio.get_running_loop())
+    if writer is not None:
+        await writer.close()
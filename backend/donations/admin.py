@@ -1,7 +1,10 @@
 from django.contrib import admin
-from .models import DonationRequest, SelectedMatchRequest, RejectedMatchRequest
+from .models import DonationRequest, SelectedMatchRequest, RejectedMatchRequest, ArchivedDonationRequest, ArchivedSelectedMatchRequest, ArchivedRejectedMatchRequest
 # Register your models here.
 
 admin.site.register(DonationRequest)
 admin.site.register(SelectedMatchRequest)
 admin.site.register(RejectedMatchRequest)
+admin.site.register(ArchivedDonationRequest)
+admin.site.register(ArchivedSelectedMatchRequest)
+admin.site.register(ArchivedRejectedMatchRequest)
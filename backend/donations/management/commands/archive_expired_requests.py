@@ -0,0 +1,113 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from donations.models import (
+    ArchivedDonationRequest, ArchivedRejectedMatchRequest, ArchivedSelectedMatchRequest,
+    DonationRequest, RejectedMatchRequest, SelectedMatchRequest,
+)
+
+# every DonationRequest column (checked in donations.tests so new columns are not dropped silently)
+REQUEST_FIELDS = [
+    'id', 'requester_id', 'name', 'age', 'sex', 'blood_type', 'content', 'image', 'image_status',
+    'location', 'donation_due_date', 'donator_registered_id', 'created_at', 'updated_at',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves donation requests whose due date has passed, together with their '
+        'rejected/selected match rows, into the archive tables in small chunks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', type=date.fromisoformat, default=None,
+                            help='Archive requests due before this date (YYYY-MM-DD, default: today).')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Requests moved per transaction.')
+        parser.add_argument('--sleep', type=float, default=0.1, help='Seconds to pause between chunks.')
+        parser.add_argument('--max-chunks', type=int, default=None, help='Stop after this many chunks.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be moved.')
+
+    def handle(self, *args, **options):
+        cutoff = options['before'] or date.today()
+        chunk_size = options['chunk_size']
+        dry_run = options['dry_run']
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'[dry run] ' if dry_run else ''}Archiving donation requests due before {cutoff}..."
+        ))
+
+        started = time.perf_counter()
+        totals = {'requests': 0, 'rejected': 0, 'selected': 0}
+        last = None
+        chunks = 0
+        while options['max_chunks'] is None or chunks < options['max_chunks']:
+            # walk donation_due_idx in (donation_due_date, id) order so every chunk is a short range read
+            queryset = DonationRequest.objects.filter(donation_due_date__lt=cutoff)
+            if last is not None:
+                queryset = queryset.filter(
+                    Q(donation_due_date__gt=last[0]) | Q(donation_due_date=last[0], id__gt=last[1])
+                )
+            keys = list(queryset.order_by('donation_due_date', 'id').values_list('donation_due_date', 'id')[:chunk_size])
+            if not keys:
+                break
+            last = keys[-1]
+            ids = [request_id for _, request_id in keys]
+
+            chunk_started = time.perf_counter()
+            if dry_run:
+                moved = {
+                    'requests': len(ids),
+                    'rejected': RejectedMatchRequest.objects.filter(donation_request_id__in=ids).count(),
+                    'selected': SelectedMatchRequest.objects.filter(donation_request_id__in=ids).count(),
+                }
+            else:
+                moved = self.archive_chunk(ids)
+            elapsed = time.perf_counter() - chunk_started
+
+            chunks += 1
+            for key, count in moved.items():
+                totals[key] += count
+            rows = sum(moved.values())
+            self.stdout.write(
+                f"chunk {chunks}: {moved['requests']} requests, {moved['rejected']} rejected, "
+                f"{moved['selected']} selected ({rows / elapsed if elapsed else rows:.0f} rows/s)"
+            )
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would move' if dry_run else 'Moved'} {totals['requests']} requests, {totals['rejected']} rejected "
+            f"and {totals['selected']} selected rows in {elapsed:.1f}s ({rows / elapsed if elapsed else rows:.0f} rows/s)."
+        ))
+
+    @transaction.atomic
+    def archive_chunk(self, ids):
+        requests = list(DonationRequest.objects.filter(id__in=ids).values(*REQUEST_FIELDS))
+        rejected = list(RejectedMatchRequest.objects.filter(donation_request_id__in=ids).values(
+            'id', 'user_id', 'donation_request_id'
+        ))
+        selected = list(SelectedMatchRequest.objects.filter(donation_request_id__in=ids).values(
+            'id', 'user_id', 'donation_request_id', 'selected_at'
+        ))
+
+        # ignore_conflicts: rows an overlapping run already archived are skipped
+        ArchivedDonationRequest.objects.bulk_create(
+            [ArchivedDonationRequest(**row) for row in requests], ignore_conflicts=True
+        )
+        ArchivedRejectedMatchRequest.objects.bulk_create(
+            [ArchivedRejectedMatchRequest(**row) for row in rejected], ignore_conflicts=True
+        )
+        ArchivedSelectedMatchRequest.objects.bulk_create(
+            [ArchivedSelectedMatchRequest(**row) for row in selected], ignore_conflicts=True
+        )
+
+        RejectedMatchRequest.objects.filter(donation_request_id__in=ids).delete()
+        SelectedMatchRequest.objects.filter(donation_request_id__in=ids).delete()
+        DonationRequest.objects.filter(id__in=ids).delete()
+        return {'requests': len(requests), 'rejected': len(rejected), 'selected': len(selected)}
@@ -0,0 +1,93 @@
+import io
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import InMemoryStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from donations.models import DonationRequest
+from donations.serializers import CreateDonationRequestSerializer, DonationRequestSerializer
+
+User = get_user_model()
+
+
+def legacy_create(data):
+    """The create path before single-pass create: two validations, two saves."""
+    serializer = CreateDonationRequestSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    validated_data = serializer.validated_data
+    image_file = validated_data.get('image')
+
+    donation_request_serializer = DonationRequestSerializer(data=validated_data)
+    donation_request_serializer.is_valid(raise_exception=True)
+    donation_request = donation_request_serializer.save()
+    if image_file:
+        donation_request.image = File(image_file, name=image_file.name)
+        donation_request.save()
+    return donation_request
+
+
+def single_pass_create(data):
+    serializer = DonationRequestSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    return serializer.save()
+
+
+class Command(BaseCommand):
+    help = 'Compares p50/p99 latency of the legacy and single-pass DonationRequest create paths.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='Creates per path.')
+        parser.add_argument('--image-size', type=int, default=1024, help='Width/height of the uploaded PNG.')
+        parser.add_argument('--real-storage', action='store_true',
+                            help='Upload to the configured storage (MinIO) instead of memory.')
+
+    def handle(self, *args, **options):
+        requester = User(email=f"create-{uuid.uuid4().hex[:8]}@bench.pitza", nickname='bench')
+        requester.set_unusable_password()
+        requester.save()
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (options['image_size'],) * 2, (200, 30, 30)).save(buffer, format='PNG')
+        image_bytes = buffer.getvalue()
+
+        image_field = DonationRequest._meta.get_field('image')
+        original_storage = image_field.storage
+        if not options['real_storage']:
+            image_field.storage = InMemoryStorage()
+
+        try:
+            for name, create in [('legacy', legacy_create), ('single-pass', single_pass_create)]:
+                timings = []
+                for i in range(options['iterations']):
+                    data = {
+                        'requester': requester.id,
+                        'name': f"bench{i}",
+                        'age': 30,
+                        'sex': 'M',
+                        'blood_type': 'O+',
+                        'content': 'benchmark',
+                        'location': '서울',
+                        'donation_due_date': (date.today() + timedelta(days=7)).isoformat(),
+                        'donator_registered_id': '000000-0000',
+                        'image': SimpleUploadedFile('bench.png', image_bytes, content_type='image/png'),
+                    }
+                    started = time.perf_counter()
+                    create(data)
+                    timings.append((time.perf_counter() - started) * 1000)
+
+                percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+                self.stdout.write(self.style.SUCCESS(
+                    f"{name:>11} x{len(timings)}: p50 {percentiles[49]:.2f}ms  p99 {percentiles[98]:.2f}ms"
+                ))
+        finally:
+            for donation_request in DonationRequest.objects.filter(requester=requester):
+                donation_request.image.delete(save=False)
+            image_field.storage = original_storage
+            requester.delete()
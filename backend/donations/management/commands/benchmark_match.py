@@ -0,0 +1,170 @@
+import random
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from donations.matching import candidate_queryset, get_candidate_index, rank_candidates, top_matches
+from donations.models import DonationRequest, RejectedMatchRequest, SelectedMatchRequest
+
+User = get_user_model()
+
+BENCH_EMAIL_DOMAIN = 'bench.pitza'
+LOCATIONS = ["서울", "부산", "대구", "광주", "인천", "울산", "경기도", "강원도", "전라도", "충청도", "제주도"]
+
+
+def find_full_scans(plan):
+    """Lines of an EXPLAIN plan that read a whole table (MySQL, PostgreSQL or SQLite)."""
+    scans = []
+    for line in plan.splitlines():
+        stripped = line.strip()
+        if (
+            '"access_type": "ALL"' in stripped          # MySQL FORMAT=JSON
+            or 'Seq Scan' in stripped                  # PostgreSQL
+            or ('SCAN ' in stripped and 'USING' not in stripped)  # SQLite
+        ):
+            scans.append(stripped)
+    return scans
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds N donation requests and M users with match history, times the match query '
+        'and prints its EXPLAIN plan. Seeded rows are removed afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10000, help='Number of donation requests to seed.')
+        parser.add_argument('--users', type=int, default=100, help='Number of donors to seed.')
+        parser.add_argument('--history', type=int, default=200, help='Rejected/selected rows per donor.')
+        parser.add_argument('--iterations', type=int, default=200, help='Number of timed match calls.')
+        parser.add_argument('--limit', type=int, default=10, help='Candidates returned per match call.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed.')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded rows.')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit with an error if EXPLAIN shows a full table scan.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        run_id = uuid.uuid4().hex[:8]
+
+        self.stdout.write(f"Seeding {options['requests']} requests and {options['users']} users (run {run_id})...")
+        users = self.seed(rng, run_id, options)
+        index = get_candidate_index()
+        if index is not None:
+            index.rebuild()
+
+        try:
+            donors = [self.donor_criteria(rng, user) for user in users]
+            self.explain(donors[0], options)
+            self.time_match(rng, donors, options)
+        finally:
+            if not options['keep']:
+                self.stdout.write("Removing seeded rows...")
+                User.objects.filter(email__endswith=f"@{run_id}.{BENCH_EMAIL_DOMAIN}").delete()
+                if index is not None:
+                    index.rebuild()
+
+    def seed(self, rng, run_id, options):
+        blood_types = [choice[0] for choice in DonationRequest.BLOOD_TYPE_CHOICES]
+        sexes = [choice[0] for choice in DonationRequest.SEX_CHOICES]
+        today = date.today()
+
+        users = []
+        for i in range(options['users']):
+            user = User(
+                email=f"donor{i}@{run_id}.{BENCH_EMAIL_DOMAIN}",
+                nickname=f"bench{i}",
+                blood_type=rng.choice(blood_types),
+                sex=rng.choice(sexes),
+                birthdate=today - timedelta(days=365 * rng.randint(18, 65)),
+            )
+            user.set_unusable_password()
+            users.append(user)
+        User.objects.bulk_create(users, batch_size=1000)
+        # MySQL bulk_create does not set primary keys: read the seeded rows back
+        users = list(User.objects.filter(email__endswith=f"@{run_id}.{BENCH_EMAIL_DOMAIN}").order_by('id'))
+
+        requests = [
+            DonationRequest(
+                requester=rng.choice(users),
+                name=f"bench{i}",
+                age=rng.randint(16, 70),
+                sex=rng.choice(sexes),
+                blood_type=rng.choice(blood_types),
+                content='benchmark',
+                image='donation_images/benchmark.png',
+                location=rng.choice(LOCATIONS),
+                donation_due_date=today + timedelta(days=rng.randint(0, 60)),
+                donator_registered_id='000000-0000',
+            )
+            for i in range(options['requests'])
+        ]
+        DonationRequest.objects.bulk_create(requests, batch_size=1000)
+        request_ids = list(
+            DonationRequest.objects.filter(requester__in=users).order_by('id').values_list('id', flat=True)
+        )
+
+        history = min(options['history'], len(request_ids))
+        rejected, selected = [], []
+        for user in users:
+            for n, request_id in enumerate(rng.sample(request_ids, history)):
+                if n % 10 == 0:
+                    selected.append(SelectedMatchRequest(user=user, donation_request_id=request_id))
+                else:
+                    rejected.append(RejectedMatchRequest(user=user, donation_request_id=request_id))
+        RejectedMatchRequest.objects.bulk_create(rejected, batch_size=1000)
+        SelectedMatchRequest.objects.bulk_create(selected, batch_size=1000)
+        return users
+
+    def donor_criteria(self, rng, user):
+        return {
+            'user': user,
+            'blood_type': user.blood_type,
+            'sex': user.sex,
+            'age': user.age,
+            'location': rng.choice(LOCATIONS),
+            'next_donation_date': date.today() + timedelta(days=rng.randint(0, 60)),
+        }
+
+    def match_queryset(self, donor):
+        queryset = candidate_queryset(donor['user'], donor['blood_type'], donor['next_donation_date'])
+        return rank_candidates(queryset, donor['blood_type'], donor['sex'], donor['location'], donor['age'])
+
+    def explain(self, donor, options):
+        queryset = self.match_queryset(donor)[:options['limit'] + 1]
+        if connection.vendor == 'mysql':
+            plan = queryset.explain(format='json')
+        else:
+            plan = queryset.explain()
+
+        self.stdout.write(self.style.MIGRATE_HEADING("EXPLAIN match query:"))
+        self.stdout.write(plan)
+
+        scans = find_full_scans(plan)
+        if scans:
+            message = "Full table scan in match query plan:\n" + "\n".join(scans)
+            if options['fail_on_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("No full table scans."))
+
+    def time_match(self, rng, donors, options):
+        timings = []
+        for _ in range(options['iterations']):
+            donor = rng.choice(donors)
+            started = time.perf_counter()
+            top_matches(self.match_queryset(donor), options['limit'])
+            timings.append((time.perf_counter() - started) * 1000)
+
+        percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+        index = get_candidate_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"match x{len(timings)} (index: {type(index).__name__ if index else 'off'}): "
+            f"p50 {percentiles[49]:.2f}ms  p95 {percentiles[94]:.2f}ms  p99 {percentiles[98]:.2f}ms  "
+            f"max {max(timings):.2f}ms"
+        ))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from donations.uploads import purge_unclaimed_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes presigned donation image uploads that no request claimed. Run it '
+        'periodically (e.g. hourly from cron) next to archive_expired_requests.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=float, default=24,
+                            help='Only touch uploads issued more than this many hours ago.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['older_than'])
+        removed, claimed = purge_unclaimed_uploads(cutoff)
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {removed} unclaimed uploads and {claimed} claimed upload records issued before {cutoff:%Y-%m-%d %H:%M}."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from donations.matching import get_candidate_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the donation match candidate index from the database.'
+
+    def handle(self, *args, **options):
+        index = get_candidate_index()
+        if index is None:
+            self.stdout.write(self.style.WARNING("DONATION_MATCH_INDEX (or DONATION_SEEN_SET) is disabled. Nothing to rebuild."))
+            return
+
+        index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {type(index).__name__}."))
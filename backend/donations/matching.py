@@ -0,0 +1,409 @@
+import threading
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Case, When, IntegerField, Exists, OuterRef, F, Q
+
+from .models import DonationRequest, RejectedMatchRequest, SelectedMatchRequest
+
+# donor blood type -> recipient blood types it can serve (ABO/Rh red cell compatibility)
+BLOOD_COMPATIBILITY = {
+    'O-': ('O-', 'O+', 'A-', 'A+', 'B-', 'B+', 'AB-', 'AB+'),
+    'O+': ('O+', 'A+', 'B+', 'AB+'),
+    'A-': ('A-', 'A+', 'AB-', 'AB+'),
+    'A+': ('A+', 'AB+'),
+    'B-': ('B-', 'B+', 'AB-', 'AB+'),
+    'B+': ('B+', 'AB+'),
+    'AB-': ('AB-', 'AB+'),
+    'AB+': ('AB+',),
+}
+
+# how far around the donor's next donation date we look for requests
+MATCH_WINDOW = timedelta(days=7)
+AGE_RANGE = 5
+
+
+def compatible_recipient_types(donor_blood_type):
+    return BLOOD_COMPATIBILITY.get(donor_blood_type, ())
+
+
+def week_bucket(day):
+    iso_year, iso_week, _ = day.isocalendar()
+    return f"{iso_year}-{iso_week:02d}"
+
+
+def week_buckets(date_min, date_max):
+    """ISO week buckets overlapping [date_min, date_max]."""
+    buckets = []
+    day = date_min - timedelta(days=date_min.weekday())
+    while day <= date_max:
+        buckets.append(week_bucket(day))
+        day += timedelta(days=7)
+    return buckets
+
+
+def _matchable_rows():
+    return DonationRequest.objects.filter(
+        donation_due_date__gte=date.today()
+    ).values_list('id', 'blood_type', 'donation_due_date')
+
+
+class LocalCandidateIndex:
+    """
+    In-process index of matchable request ids bucketed by (blood type, due-date week).
+    Each worker keeps its own copy and rebuilds it from the DB every
+    DONATION_MATCH_INDEX_TTL seconds so writes made by other workers show up.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._locations = {}
+        self._built_at = None
+
+    def _ensure_built(self):
+        if self._built_at is not None and time.monotonic() - self._built_at < self.ttl:
+            return
+        buckets = {}
+        locations = {}
+        for request_id, blood_type, due_date in _matchable_rows().iterator():
+            key = (blood_type, week_bucket(due_date))
+            buckets.setdefault(key, set()).add(request_id)
+            locations[request_id] = key
+        with self._lock:
+            self._buckets = buckets
+            self._locations = locations
+            self._built_at = time.monotonic()
+
+    def add(self, donation_request):
+        key = (donation_request.blood_type, week_bucket(donation_request.donation_due_date))
+        with self._lock:
+            self._discard(donation_request.id)
+            self._buckets.setdefault(key, set()).add(donation_request.id)
+            self._locations[donation_request.id] = key
+
+    def remove(self, request_id):
+        with self._lock:
+            self._discard(request_id)
+
+    def _discard(self, request_id):
+        key = self._locations.pop(request_id, None)
+        if key is not None:
+            self._buckets.get(key, set()).discard(request_id)
+
+    def candidate_ids(self, blood_types, date_min, date_max):
+        self._ensure_built()
+        ids = set()
+        with self._lock:
+            for week in week_buckets(date_min, date_max):
+                for blood_type in blood_types:
+                    ids |= self._buckets.get((blood_type, week), set())
+        return ids
+
+    def rebuild(self):
+        self._built_at = None
+        self._ensure_built()
+
+
+class RedisCandidateIndex:
+    """
+    Same buckets as LocalCandidateIndex, shared by all workers as Redis sets:
+    donations:match:{blood_type}:{week}. Bucket keys expire a week after the
+    week is over, so past-due buckets clean themselves up. The built marker
+    expires after REBUILD_INTERVAL, and the next lookup rebuilds the index. That
+    prunes request ids that stopped being matchable from the locations hash.
+    """
+    prefix = 'donations:match'
+    REBUILD_INTERVAL = 24 * 60 * 60
+
+    def __init__(self):
+        from pitza.redis_client import get_redis
+        self.redis = get_redis()
+
+    @property
+    def _built_key(self):
+        return f"{self.prefix}:built"
+
+    @property
+    def _locations_key(self):
+        return f"{self.prefix}:locations"
+
+    def _bucket_key(self, blood_type, week):
+        return f"{self.prefix}:{blood_type}:{week}"
+
+    def _add_to_pipeline(self, pipe, request_id, blood_type, due_date):
+        key = self._bucket_key(blood_type, week_bucket(due_date))
+        week_end = due_date + timedelta(days=6 - due_date.weekday())
+        pipe.sadd(key, request_id)
+        pipe.expireat(key, int(time.mktime((week_end + timedelta(days=8)).timetuple())))
+        pipe.hset(self._locations_key, request_id, key)
+
+    def _ensure_built(self):
+        if not self.redis.exists(self._built_key):
+            self.rebuild()
+
+    def rebuild(self):
+        rows = list(_matchable_rows().iterator())
+        matchable = {request_id for request_id, _, _ in rows}
+        # one MULTI: readers never see a half-built index
+        pipe = self.redis.pipeline()
+        # past-due or deleted (e.g. archived in bulk) requests leave their bucket
+        for request_id, key in self.redis.hscan_iter(self._locations_key):
+            if int(request_id) not in matchable:
+                pipe.srem(key, request_id)
+        pipe.delete(self._locations_key)
+        for request_id, blood_type, due_date in rows:
+            self._add_to_pipeline(pipe, request_id, blood_type, due_date)
+        pipe.set(self._built_key, 1, ex=self.REBUILD_INTERVAL)
+        pipe.execute()
+
+    def add(self, donation_request):
+        self.remove(donation_request.id)
+        pipe = self.redis.pipeline()
+        self._add_to_pipeline(
+            pipe, donation_request.id, donation_request.blood_type, donation_request.donation_due_date
+        )
+        pipe.execute()
+
+    def remove(self, request_id):
+        key = self.redis.hget(self._locations_key, request_id)
+        if key:
+            pipe = self.redis.pipeline()
+            pipe.srem(key, request_id)
+            pipe.hdel(self._locations_key, request_id)
+            pipe.execute()
+
+    def candidate_ids(self, blood_types, date_min, date_max):
+        self._ensure_built()
+        keys = [
+            self._bucket_key(blood_type, week)
+            for week in week_buckets(date_min, date_max)
+            for blood_type in blood_types
+        ]
+        if not keys:
+            return set()
+        return {int(request_id) for request_id in self.redis.sunion(keys)}
+
+
+_index = None
+
+
+def get_candidate_index():
+    """
+    Configured candidate index, or None when DONATION_MATCH_INDEX is off.
+    The index only pays off together with a seen-set (see candidate_queryset),
+    so it also stays off while DONATION_SEEN_SET is not configured.
+    """
+    global _index
+    backend = settings.DONATION_MATCH_INDEX
+    if not backend or not settings.DONATION_SEEN_SET:
+        return None
+    if _index is None:
+        if backend == 'redis':
+            _index = RedisCandidateIndex()
+        elif backend == 'local':
+            _index = LocalCandidateIndex(settings.DONATION_MATCH_INDEX_TTL)
+        else:
+            raise ValueError(f"Unknown DONATION_MATCH_INDEX backend: {backend}")
+    return _index
+
+
+class RedisSeenSet:
+    """
+    Per-user bitmap of request ids the user already selected or rejected:
+    donations:seen:{user_id}, bit N set = request N seen. Built from the DB the
+    first time it is needed (bit 0 marks a built bitmap, ids start at 1) and
+    dropped after SEEN_TTL of inactivity, so the DB stays the source of truth.
+    """
+    prefix = 'donations:seen'
+    SEEN_TTL = 7 * 24 * 60 * 60
+
+    def __init__(self):
+        from pitza.redis_client import get_redis
+        self.redis = get_redis()
+
+    def _key(self, user_id):
+        return f"{self.prefix}:{user_id}"
+
+    def _ensure_built(self, user_id):
+        key = self._key(user_id)
+        if self.redis.exists(key):
+            self.redis.expire(key, self.SEEN_TTL)
+            return
+        seen_ids = RejectedMatchRequest.objects.filter(user_id=user_id).values_list(
+            'donation_request_id', flat=True
+        ).union(
+            SelectedMatchRequest.objects.filter(user_id=user_id).values_list('donation_request_id', flat=True)
+        )
+        pipe = self.redis.pipeline()
+        pipe.setbit(key, 0, 1)
+        for request_id in seen_ids:
+            pipe.setbit(key, request_id, 1)
+        pipe.expire(key, self.SEEN_TTL)
+        pipe.execute()
+
+    def mark_seen(self, user_id, request_id):
+        # an unbuilt bitmap picks the row up from the DB when it is built
+        key = self._key(user_id)
+        if self.redis.exists(key):
+            self.redis.setbit(key, request_id, 1)
+
+    def unseen(self, user_id, request_ids, limit=None):
+        """
+        The ids in `request_ids` the user has not seen, in the given order. With
+        `limit` the bits are read in chunks and the lookup stops once `limit`
+        unseen ids are found.
+        """
+        self._ensure_built(user_id)
+        request_ids = list(request_ids)
+        key = self._key(user_id)
+        chunk_size = limit or len(request_ids) or 1
+        unseen = []
+        for start in range(0, len(request_ids), chunk_size):
+            chunk = request_ids[start:start + chunk_size]
+            pipe = self.redis.pipeline()
+            for request_id in chunk:
+                pipe.getbit(key, request_id)
+            unseen += [request_id for request_id, bit in zip(chunk, pipe.execute()) if not bit]
+            if limit is not None and len(unseen) >= limit:
+                return unseen[:limit]
+        return unseen
+
+
+_seen_set = None
+
+
+def get_seen_set():
+    """Configured seen-set, or None when DONATION_SEEN_SET is off."""
+    global _seen_set
+    backend = settings.DONATION_SEEN_SET
+    if not backend:
+        return None
+    if _seen_set is None:
+        if backend == 'redis':
+            _seen_set = RedisSeenSet()
+        else:
+            raise ValueError(f"Unknown DONATION_SEEN_SET backend: {backend}")
+    return _seen_set
+
+
+def exclude_seen(queryset, user):
+    """Drop requests `user` already rejected or selected with NOT EXISTS anti-joins."""
+    return queryset.exclude(
+        Exists(RejectedMatchRequest.objects.filter(user=user, donation_request=OuterRef('pk')))
+    ).exclude(
+        Exists(SelectedMatchRequest.objects.filter(user=user, donation_request=OuterRef('pk')))
+    )
+
+
+def candidate_queryset(user, donor_blood_type, next_donation_date):
+    """
+    Requests `user` has not seen yet that a donor of `donor_blood_type` can serve,
+    due within MATCH_WINDOW of `next_donation_date`.
+
+    With an index configured (it needs a seen-set, see get_candidate_index) the
+    indexed candidate ids are checked against the user's bitmap instead of the
+    NOT EXISTS anti-joins. Only the newest DONATION_MATCH_CANDIDATE_LIMIT unseen
+    candidates are kept, so the id list handed to the DB stays bounded however
+    many requests fall in the window.
+    """
+    blood_types = compatible_recipient_types(donor_blood_type)
+    date_min = next_donation_date - MATCH_WINDOW
+    date_max = next_donation_date + MATCH_WINDOW
+
+    queryset = DonationRequest.objects.filter(
+        blood_type__in=blood_types,
+        donation_due_date__gte=date_min,
+        donation_due_date__lte=date_max,
+    )
+    index = get_candidate_index()
+    if index is None:
+        return exclude_seen(queryset, user)
+
+    candidate_ids = sorted(index.candidate_ids(blood_types, date_min, date_max), reverse=True)
+    unseen_ids = get_seen_set().unseen(user.id, candidate_ids, limit=settings.DONATION_MATCH_CANDIDATE_LIMIT)
+    return queryset.filter(id__in=unseen_ids)
+
+
+def rank_candidates(queryset, donor_blood_type, sex, location, age):
+    queryset = queryset.annotate(
+        matches_sex=Case(
+            When(sex=sex, then=1),
+            default=0,
+            output_field=IntegerField()
+        ),
+        matches_location=Case(
+            When(location=location, then=1),
+            default=0,
+            output_field=IntegerField()
+        ),
+        matches_age_range=Case(
+            When(age__gte=age - AGE_RANGE, age__lte=age + AGE_RANGE, then=1),
+            default=0,
+            output_field=IntegerField()
+        ),
+        matches_blood_type=Case(
+            When(blood_type=donor_blood_type, then=1),
+            default=0,
+            output_field=IntegerField()
+        ),
+    )
+    # one sortable score with the tiers in priority order (location > sex > age >
+    # exact blood type) so results can be paged by keyset on (match_score, id)
+    queryset = queryset.annotate(
+        match_score=F('matches_location') * 8
+        + F('matches_sex') * 4
+        + F('matches_age_range') * 2
+        + F('matches_blood_type')
+    )
+    return queryset.order_by('-match_score', 'id')
+
+
+def score_request(donation_request, donor_blood_type, sex, location, age):
+    """Python mirror of rank_candidates' annotations, set on `donation_request`."""
+    donation_request.matches_location = int(donation_request.location == location)
+    donation_request.matches_sex = int(donation_request.sex == sex)
+    donation_request.matches_age_range = int(age - AGE_RANGE <= donation_request.age <= age + AGE_RANGE)
+    donation_request.matches_blood_type = int(donation_request.blood_type == donor_blood_type)
+    donation_request.match_score = (
+        donation_request.matches_location * 8
+        + donation_request.matches_sex * 4
+        + donation_request.matches_age_range * 2
+        + donation_request.matches_blood_type
+    )
+    return donation_request
+
+
+CURSOR_SALT = 'donations.match.cursor'
+
+
+def encode_cursor(donation_request):
+    return signing.dumps(
+        {'score': donation_request.match_score, 'id': donation_request.id},
+        salt=CURSOR_SALT,
+        compress=True,
+    )
+
+
+def apply_cursor(queryset, cursor):
+    """
+    Continue a ranked queryset after the position stored in `cursor`.
+    Raises signing.BadSignature for a tampered or malformed cursor.
+    """
+    position = signing.loads(cursor, salt=CURSOR_SALT)
+    return queryset.filter(
+        Q(match_score__lt=position['score'])
+        | Q(match_score=position['score'], id__gt=position['id'])
+    )
+
+
+def top_matches(queryset, limit, cursor=None):
+    """Top `limit` ranked candidates (one query) and the cursor for the next batch."""
+    if cursor:
+        queryset = apply_cursor(queryset, cursor)
+    results = list(queryset[:limit + 1])
+    next_cursor = encode_cursor(results[limit - 1]) if len(results) > limit else None
+    return results[:limit], next_cursor
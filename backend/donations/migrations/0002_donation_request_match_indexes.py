@@ -0,0 +1,21 @@
+# Generated by Django 4.2.1 on 2026-10-18 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='donationrequest',
+            index=models.Index(fields=['blood_type', 'donation_due_date'], name='donation_bt_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='donationrequest',
+            index=models.Index(fields=['donation_due_date'], name='donation_due_idx'),
+        ),
+    ]
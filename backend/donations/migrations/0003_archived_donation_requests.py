@@ -0,0 +1,51 @@
+# Generated by Django 4.2.1 on 2026-10-18 08:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('donations', '0002_donation_request_match_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedDonationRequest',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('age', models.IntegerField()),
+                ('sex', models.CharField(choices=[('M', 'Male'), ('F', 'Female')], max_length=1)),
+                ('blood_type', models.CharField(choices=[('A+', 'A Positive'), ('A-', 'A Negative'), ('B+', 'B Positive'), ('B-', 'B Negative'), ('AB+', 'AB Positive'), ('AB-', 'AB Negative'), ('O+', 'O Positive'), ('O-', 'O Negative')], max_length=3)),
+                ('content', models.TextField()),
+                ('image', models.CharField(blank=True, max_length=100)),
+                ('location', models.CharField(max_length=255)),
+                ('donation_due_date', models.DateField()),
+                ('donator_registered_id', models.CharField(max_length=11)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('requester', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_donation_requests', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedSelectedMatchRequest',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('selected_at', models.DateTimeField()),
+                ('donation_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='selected_matches', to='donations.archiveddonationrequest')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_selected_matches', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedRejectedMatchRequest',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('donation_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rejected_matches', to='donations.archiveddonationrequest')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_rejected_matches', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0003_archived_donation_requests'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationrequest',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=10),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0004_donationrequest_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='donationrequest',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:24
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('donations', '0005_donationrequest_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PresignedImageUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='presigned_image_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
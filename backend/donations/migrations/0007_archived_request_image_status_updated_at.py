@@ -0,0 +1,36 @@
+# Generated by Django 4.2.1 on 2026-10-18 11:02
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_created_at(apps, schema_editor):
+    # rows archived before this migration never had their updated_at copied
+    ArchivedDonationRequest = apps.get_model('donations', 'ArchivedDonationRequest')
+    ArchivedDonationRequest.objects.filter(updated_at__isnull=True).update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0006_presignedimageupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archiveddonationrequest',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='archiveddonationrequest',
+            name='updated_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='archiveddonationrequest',
+            name='updated_at',
+            field=models.DateTimeField(),
+        ),
+    ]
@@ -22,6 +22,15 @@ class DonationRequest(models.Model):
         ('O+', 'O Positive'),
         ('O-', 'O Negative'),
     ]
+
+    IMAGE_PENDING = 'pending'
+    IMAGE_READY = 'ready'
+    IMAGE_FAILED = 'failed'
+    IMAGE_STATUS_CHOICES = [
+        (IMAGE_PENDING, 'Pending'),
+        (IMAGE_READY, 'Ready'),
+        (IMAGE_FAILED, 'Failed'),
+    ]
     
     requester = models.ForeignKey(User, on_delete=models.CASCADE, related_name='donation_requests')
     name = models.CharField(max_length=255)
@@ -35,6 +44,8 @@ class DonationRequest(models.Model):
         blank=True,
         null=False
         )
+    # 'pending' while a background upload is still running (see donations.uploads)
+    image_status = models.CharField(max_length=10, choices=IMAGE_STATUS_CHOICES, default=IMAGE_READY)
     location = models.CharField(max_length=255)
     donation_due_date = models.DateField()
     donator_registered_id = models.CharField(
@@ -48,6 +59,15 @@ class DonationRequest(models.Model):
         ],
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # match: blood_type IN (compatible types) AND due date within the window
+            models.Index(fields=['blood_type', 'donation_due_date'], name='donation_bt_due_idx'),
+            # candidate index rebuilds: every request that is not past due yet
+            models.Index(fields=['donation_due_date'], name='donation_due_idx'),
+        ]
     
     def get_public_image_url(self):
         return f"{settings.MINIO_PUBLIC_URL_BASE}/{settings.MINIO_STORAGE_BUCKET_NAME}/{self.image.name}"
@@ -70,3 +90,46 @@ class SelectedMatchRequest(models.Model):
     class Meta:
         unique_together = ('user', 'donation_request')
         
+
+
+class PresignedImageUpload(models.Model):
+    # object keys handed out by donations/image-uploads/: claimed by at most one
+    # request, removed by purge_image_uploads once the upload window is over
+    key = models.CharField(max_length=100, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='presigned_image_uploads')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+
+# Past-due requests and their match history, moved out of the live tables by
+# the archive_expired_requests command. Rows keep their original ids.
+
+class ArchivedDonationRequest(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    requester = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_donation_requests')
+    name = models.CharField(max_length=255)
+    age = models.IntegerField()
+    sex = models.CharField(max_length=1, choices=DonationRequest.SEX_CHOICES)
+    blood_type = models.CharField(max_length=3, choices=DonationRequest.BLOOD_TYPE_CHOICES)
+    content = models.TextField()
+    image = models.CharField(max_length=100, blank=True)
+    image_status = models.CharField(
+        max_length=10, choices=DonationRequest.IMAGE_STATUS_CHOICES, default=DonationRequest.IMAGE_READY
+    )
+    location = models.CharField(max_length=255)
+    donation_due_date = models.DateField()
+    donator_registered_id = models.CharField(max_length=11)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+class ArchivedRejectedMatchRequest(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_rejected_matches')
+    donation_request = models.ForeignKey(ArchivedDonationRequest, on_delete=models.CASCADE, related_name='rejected_matches')
+
+class ArchivedSelectedMatchRequest(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_selected_matches')
+    donation_request = models.ForeignKey(ArchivedDonationRequest, on_delete=models.CASCADE, related_name='selected_matches')
+    selected_at = models.DateTimeField()
@@ -0,0 +1,198 @@
+from datetime import date
+
+from django.conf import settings
+from django.core import signing
+
+from .matching import (
+    CURSOR_SALT, MATCH_WINDOW, BLOOD_COMPATIBILITY,
+    candidate_queryset, compatible_recipient_types, rank_candidates, score_request,
+)
+from .models import DonationRequest
+
+# queue scores keep match_score order and break ties by the lower id, like rank_candidates
+SCORE_ID_SPAN = 10 ** 10
+
+
+def queue_score(match_score, request_id):
+    return match_score * SCORE_ID_SPAN - request_id
+
+
+def in_window(donation_request, next_donation_date):
+    return (
+        donation_request.donation_due_date >= date.today()
+        and abs(donation_request.donation_due_date - next_donation_date) <= MATCH_WINDOW
+    )
+
+
+class RedisMatchQueue:
+    """
+    Precomputed ranked candidates per active donor, as Redis sorted sets.
+
+    donations:queue:{user_id}            ZSET request id -> queue_score
+    donations:queue:{user_id}:criteria   HASH of the criteria the queue was ranked for
+    donations:queue:donors:{blood_type}  SET of donors whose queue can take that recipient type
+
+    A queue is built by the first match call (or when the criteria change),
+    new requests are pushed into matching queues as they are created,
+    select/reject pop from it and rows that expired or were deleted are pruned
+    when they reach the head. Queues expire after QUEUE_TTL without a match call.
+    """
+    prefix = 'donations:queue'
+    QUEUE_TTL = 24 * 60 * 60
+    QUEUE_SIZE = 200
+
+    def __init__(self):
+        from pitza.redis_client import get_redis
+        self.redis = get_redis()
+
+    def _queue_key(self, user_id):
+        return f"{self.prefix}:{user_id}"
+
+    def _criteria_key(self, user_id):
+        return f"{self.prefix}:{user_id}:criteria"
+
+    def _donors_key(self, recipient_blood_type):
+        return f"{self.prefix}:donors:{recipient_blood_type}"
+
+    @staticmethod
+    def _dump_criteria(criteria):
+        return {
+            'blood_type': criteria['blood_type'],
+            'sex': criteria['sex'],
+            'location': criteria['location'],
+            'age': str(criteria['age']),
+            'next_donation_date': criteria['next_donation_date'].isoformat(),
+        }
+
+    @staticmethod
+    def _load_criteria(stored):
+        return {
+            'blood_type': stored['blood_type'],
+            'sex': stored['sex'],
+            'location': stored['location'],
+            'age': int(stored['age']),
+            'next_donation_date': date.fromisoformat(stored['next_donation_date']),
+        }
+
+    def rebuild(self, user, criteria):
+        queryset = rank_candidates(
+            candidate_queryset(user, criteria['blood_type'], criteria['next_donation_date']),
+            criteria['blood_type'], criteria['sex'], criteria['location'], criteria['age'],
+        ).filter(donation_due_date__gte=date.today())
+        ranked = queryset.values_list('id', 'match_score')[:self.QUEUE_SIZE]
+
+        queue_key = self._queue_key(user.id)
+        criteria_key = self._criteria_key(user.id)
+        pipe = self.redis.pipeline()
+        pipe.delete(queue_key)
+        mapping = {request_id: queue_score(match_score, request_id) for request_id, match_score in ranked}
+        if mapping:
+            pipe.zadd(queue_key, mapping)
+        pipe.expire(queue_key, self.QUEUE_TTL)
+        pipe.delete(criteria_key)
+        pipe.hset(criteria_key, mapping=self._dump_criteria(criteria))
+        pipe.expire(criteria_key, self.QUEUE_TTL)
+        for recipient_blood_type in compatible_recipient_types(criteria['blood_type']):
+            pipe.sadd(self._donors_key(recipient_blood_type), user.id)
+        pipe.execute()
+
+    def top_matches(self, user, criteria, limit, cursor=None):
+        """
+        Head of the donor's queue: up to `limit` candidates and the cursor for the
+        next batch, like matching.top_matches. Raises signing.BadSignature for a
+        tampered cursor.
+        """
+        queue_key = self._queue_key(user.id)
+        stored = self.redis.hgetall(self._criteria_key(user.id))
+        if stored != self._dump_criteria(criteria) or not self.redis.exists(queue_key):
+            self.rebuild(user, criteria)
+        else:
+            self.redis.expire(queue_key, self.QUEUE_TTL)
+            self.redis.expire(self._criteria_key(user.id), self.QUEUE_TTL)
+
+        max_score = '+inf'
+        if cursor:
+            max_score = f"({signing.loads(cursor, salt=CURSOR_SALT)['queue_score']}"
+
+        results = []
+        while len(results) <= limit:
+            entries = self.redis.zrevrangebyscore(
+                queue_key, max_score, '-inf', start=0, num=limit + 1 - len(results), withscores=True
+            )
+            if not entries:
+                break
+            rows = DonationRequest.objects.in_bulk([int(member) for member, _ in entries])
+            stale = []
+            for member, score in entries:
+                donation_request = rows.get(int(member))
+                if donation_request is None or not in_window(donation_request, criteria['next_donation_date']):
+                    stale.append(member)
+                    continue
+                score_request(
+                    donation_request,
+                    criteria['blood_type'], criteria['sex'], criteria['location'], criteria['age'],
+                )
+                donation_request.queue_score = int(score)
+                results.append(donation_request)
+            if stale:
+                self.redis.zrem(queue_key, *stale)
+            max_score = f"({int(entries[-1][1])}"
+
+        next_cursor = None
+        if len(results) > limit:
+            next_cursor = signing.dumps(
+                {'queue_score': results[limit - 1].queue_score}, salt=CURSOR_SALT, compress=True
+            )
+        return results[:limit], next_cursor
+
+    def offer(self, donation_request):
+        """Push a new request into the queue of every active donor it matches."""
+        donors_key = self._donors_key(donation_request.blood_type)
+        user_ids = list(self.redis.smembers(donors_key))
+        if not user_ids:
+            return
+
+        pipe = self.redis.pipeline()
+        for user_id in user_ids:
+            pipe.hgetall(self._criteria_key(user_id))
+        stored_criteria = pipe.execute()
+
+        pipe = self.redis.pipeline()
+        for user_id, stored in zip(user_ids, stored_criteria):
+            if not stored:
+                # queue expired: the donor is no longer active
+                pipe.srem(donors_key, user_id)
+                continue
+            criteria = self._load_criteria(stored)
+            if not in_window(donation_request, criteria['next_donation_date']):
+                continue
+            if donation_request.blood_type not in BLOOD_COMPATIBILITY.get(criteria['blood_type'], ()):
+                continue
+            score_request(
+                donation_request,
+                criteria['blood_type'], criteria['sex'], criteria['location'], criteria['age'],
+            )
+            queue_key = self._queue_key(user_id)
+            pipe.zadd(queue_key, {donation_request.id: queue_score(donation_request.match_score, donation_request.id)})
+            pipe.expire(queue_key, self.QUEUE_TTL)
+        pipe.execute()
+
+    def pop(self, user_id, request_id):
+        self.redis.zrem(self._queue_key(user_id), request_id)
+
+
+_queue = None
+
+
+def get_match_queue():
+    """Configured per-donor queue, or None when DONATION_MATCH_QUEUE is off."""
+    global _queue
+    backend = settings.DONATION_MATCH_QUEUE
+    if not backend:
+        return None
+    if _queue is None:
+        if backend == 'redis':
+            _queue = RedisMatchQueue()
+        else:
+            raise ValueError(f"Unknown DONATION_MATCH_QUEUE backend: {backend}")
+    return _queue
@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.conf import settings
-from .models import DonationRequest, RejectedMatchRequest, SelectedMatchRequest
+from django.db import transaction
+from .models import ArchivedDonationRequest, DonationRequest, RejectedMatchRequest, SelectedMatchRequest
+from .uploads import claim_uploaded_image, get_background_uploader, mark_image_claimed, upload_image
 
 
 User = get_user_model()
@@ -11,13 +13,64 @@ class DonationRequestSerializer(serializers.ModelSerializer):
         queryset=User.objects.all(),
     ) 
     
-    image = serializers.ImageField(use_url=True)
+    image = serializers.ImageField(use_url=True, required=False)
+    # key of an image already uploaded with a presigned URL, instead of `image`
+    image_key = serializers.CharField(write_only=True, required=False)
     image_url = serializers.SerializerMethodField()
 
     class Meta:
         model = DonationRequest
-        fields = ['id', 'requester', 'name', 'age', 'sex', 'blood_type', 'content', 'image', 'image_url','location', 'donation_due_date', 'donator_registered_id', 'created_at']
-        read_only_fields = ['image_url']
+        fields = ['id', 'requester', 'name', 'age', 'sex', 'blood_type', 'content', 'image', 'image_key', 'image_url', 'image_status', 'location', 'donation_due_date', 'donator_registered_id', 'created_at']
+        read_only_fields = ['image_url', 'image_status']
+
+    def validate(self, attrs):
+        image_key = attrs.pop('image_key', None)
+        if image_key:
+            request = self.context.get('request')
+            attrs['image'] = claim_uploaded_image(request.user.id if request else None, image_key)
+        elif not attrs.get('image') and not self.partial:
+            raise serializers.ValidationError({'image': ['No file was submitted.']})
+        return attrs
+
+    def create(self, validated_data):
+        uploader = get_background_uploader()
+        # a claimed image_key is only a name: there is nothing left to upload
+        if uploader is not None and not isinstance(validated_data['image'], str):
+            return self._create_with_background_upload(uploader, validated_data)
+
+        # FileField.pre_save uploads the image right before the INSERT, so both
+        # happen in one save() inside the transaction: a failed upload leaves no row,
+        # and an upload whose INSERT fails is removed again
+        donation_request = DonationRequest(**validated_data)
+        try:
+            with transaction.atomic():
+                if isinstance(validated_data['image'], str):
+                    # one request per presigned upload
+                    mark_image_claimed(validated_data['image'])
+                donation_request.save()
+        except Exception:
+            if donation_request.image and donation_request.image._committed:
+                donation_request.image.delete(save=False)
+            raise
+        return donation_request
+
+    def _create_with_background_upload(self, uploader, validated_data):
+        # the row is saved with a pending image and the request returns right away;
+        # the bytes are uploaded once the row is committed
+        image = validated_data.pop('image')
+        name, content = image.name, image.read()
+        donation_request = DonationRequest(**validated_data, image_status=DonationRequest.IMAGE_PENDING)
+
+        def start_upload():
+            if not uploader.submit(donation_request.id, name, content):
+                # uploader queue is full: upload inline rather than queue without bound
+                upload_image(donation_request.id, name, content)
+                donation_request.refresh_from_db(fields=['image', 'image_status'])
+
+        with transaction.atomic():
+            donation_request.save()
+            transaction.on_commit(start_upload)
+        return donation_request
         
     def get_image_url(self, obj):
         if obj.image and obj.image.name: # Check if an image file exists and has a name
@@ -25,6 +78,35 @@ class DonationRequestSerializer(serializers.ModelSerializer):
             return f"{settings.MINIO_PUBLIC_URL_BASE}/{settings.MINIO_STORAGE_MEDIA_BUCKET_NAME}/{obj.image.name}"
         return None
 
+class DonationRequestImageSerializer(serializers.ModelSerializer):
+    image_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DonationRequest
+        fields = ['id', 'image_status', 'image_url']
+
+    get_image_url = DonationRequestSerializer.get_image_url
+
+class ArchivedDonationRequestSerializer(serializers.ModelSerializer):
+    detail = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArchivedDonationRequest
+        fields = ['id', 'detail', 'archived_at']
+
+    def get_detail(self, obj):
+        return 'This donation request is past due and has been archived.'
+
+class PresignedImageUploadRequestSerializer(serializers.Serializer):
+    filename = serializers.CharField()
+
+class PresignedImageUploadSerializer(serializers.Serializer):
+    key = serializers.CharField()
+    upload_url = serializers.CharField()
+    form_fields = serializers.DictField(child=serializers.CharField(), help_text='Form fields to POST along with Content-Type and file')
+    max_size = serializers.IntegerField()
+    expires_in = serializers.IntegerField()
+
 class CreateDonationRequestSerializer(serializers.Serializer):
     requester = serializers.IntegerField()
     name = serializers.CharField()
@@ -35,7 +117,9 @@ class CreateDonationRequestSerializer(serializers.Serializer):
     location = serializers.CharField()
     donation_due_date = serializers.DateField()
     donator_registered_id = serializers.CharField()
-    image = serializers.ImageField(required=True)
+    # either a file, or the key returned by donations/image-uploads/ after uploading to it
+    image = serializers.ImageField(required=False)
+    image_key = serializers.CharField(required=False)
 
 
 class RejectedMatchRequestSerializer(serializers.ModelSerializer):
@@ -78,4 +162,19 @@ class MatchRequestSerializer(serializers.Serializer):
     sex = serializers.CharField()
     location = serializers.CharField()
     next_donation_date = serializers.DateField()
+    # ranked mode: return up to `limit` candidates and a cursor for the next batch
+    limit = serializers.IntegerField(required=False, allow_null=True, min_value=1, max_value=50)
+    cursor = serializers.CharField(required=False, allow_null=True)
+
+class MatchResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    match_score = serializers.IntegerField()
+    matches_location = serializers.IntegerField()
+    matches_sex = serializers.IntegerField()
+    matches_age_range = serializers.IntegerField()
+    matches_blood_type = serializers.IntegerField()
+
+class MatchPageSerializer(serializers.Serializer):
+    results = MatchResultSerializer(many=True)
+    next_cursor = serializers.CharField(allow_null=True)
 
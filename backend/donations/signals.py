@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .matching import get_candidate_index, get_seen_set
+from .models import DonationRequest, RejectedMatchRequest, SelectedMatchRequest
+from .queues import get_match_queue
+
+
+@receiver(post_save, sender=DonationRequest)
+def index_donation_request(sender, instance, **kwargs):
+    index = get_candidate_index()
+    if index is not None:
+        transaction.on_commit(lambda: index.add(instance))
+    queue = get_match_queue()
+    if queue is not None and kwargs['created']:
+        transaction.on_commit(lambda: queue.offer(instance))
+
+
+@receiver(post_delete, sender=DonationRequest)
+def unindex_donation_request(sender, instance, **kwargs):
+    index = get_candidate_index()
+    if index is not None:
+        request_id = instance.id
+        transaction.on_commit(lambda: index.remove(request_id))
+
+
+@receiver(post_save, sender=RejectedMatchRequest)
+@receiver(post_save, sender=SelectedMatchRequest)
+def mark_request_seen(sender, instance, created, **kwargs):
+    if not created:
+        return
+    seen_set = get_seen_set()
+    if seen_set is not None:
+        transaction.on_commit(lambda: seen_set.mark_seen(instance.user_id, instance.donation_request_id))
+    queue = get_match_queue()
+    if queue is not None:
+        transaction.on_commit(lambda: queue.pop(instance.user_id, instance.donation_request_id))
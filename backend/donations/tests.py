@@ -1,12 +1,243 @@
+import unittest
 import uuid
-from django.test import TestCase
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from rest_framework.test import APIClient
-from rest_framework_simplejwt.tokens import RefreshToken
-from user.models import User
-from app.models import MyModel
 from rest_framework.test import APIRequestFactory
-from .models import DonationRequest
+
+from login.models import User
+from . import matching
+from .management.commands.archive_expired_requests import REQUEST_FIELDS
+from .models import ArchivedDonationRequest, ArchivedRejectedMatchRequest, DonationRequest, RejectedMatchRequest
+
+try:
+    import fakeredis
+except ImportError:  # only installed in development
+    fakeredis = None
 
 # Using the standard RequestFactory API to create a form POST request
 factory = APIRequestFactory()
 request = factory.get('/donations/', {'id': 1})
+
+
+def mysql_bulk_insert():
+    """Make bulk_create behave like MySQL: no primary keys on the returned objects."""
+    return mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False)
+
+
+class BenchmarkMatchTests(TestCase):
+
+    def test_seeds_and_cleans_up_without_bulk_insert_ids(self):
+        out = StringIO()
+        with mysql_bulk_insert():
+            call_command(
+                'benchmark_match', requests=50, users=5, history=10, iterations=5, limit=3, stdout=out,
+            )
+        self.assertIn('p50', out.getvalue())
+        self.assertFalse(User.objects.filter(email__endswith='.bench.pitza').exists())
+        self.assertFalse(DonationRequest.objects.exists())
+
+
+class CandidateQuerysetTests(TestCase):
+
+    def setUp(self):
+        self.donor = User.objects.create(email='donor@example.com', nickname='donor', blood_type='O-')
+        requester = User.objects.create(email='requester@example.com', nickname='requester')
+        today = date.today()
+        self.requests = [
+            DonationRequest.objects.create(
+                requester=requester, name=f"r{i}", age=30, sex='M', blood_type=blood_type, content='c',
+                image='donation_images/r.png', location='서울', donation_due_date=today + timedelta(days=days),
+                donator_registered_id='000000-0000',
+            )
+            for i, (blood_type, days) in enumerate([('A+', 1), ('AB-', 3), ('B+', 30), ('O-', -10)])
+        ]
+        RejectedMatchRequest.objects.create(user=self.donor, donation_request=self.requests[1])
+
+    def tearDown(self):
+        matching._index = None
+        matching._seen_set = None
+
+    def candidate_ids(self):
+        queryset = matching.candidate_queryset(self.donor, 'O-', date.today())
+        return sorted(queryset.values_list('id', flat=True))
+
+    def use_fake_seen_set(self):
+        matching._index = None
+        with mock.patch('pitza.redis_client.get_redis', return_value=fakeredis.FakeRedis()):
+            matching._seen_set = matching.RedisSeenSet()
+
+    def test_index_is_off_by_default(self):
+        self.assertIsNone(matching.get_candidate_index())
+
+    @override_settings(DONATION_MATCH_INDEX='local', DONATION_SEEN_SET='')
+    def test_index_needs_a_seen_set(self):
+        # without a seen-set the index would only add an id list to the same range scan
+        self.assertIsNone(matching.get_candidate_index())
+
+    @unittest.skipIf(fakeredis is None, 'fakeredis is required')
+    def test_local_index_matches_db_results(self):
+        # in the window, compatible and not rejected: only the first request
+        expected = [self.requests[0].id]
+        self.assertEqual(self.candidate_ids(), expected)
+        with override_settings(DONATION_MATCH_INDEX='local', DONATION_SEEN_SET='redis'):
+            self.use_fake_seen_set()
+            self.assertEqual(self.candidate_ids(), expected)
+
+    @unittest.skipIf(fakeredis is None, 'fakeredis is required')
+    @override_settings(DONATION_MATCH_INDEX='local', DONATION_SEEN_SET='redis', DONATION_MATCH_CANDIDATE_LIMIT=2)
+    def test_index_candidates_are_bounded(self):
+        requester = self.requests[0].requester
+        newer = [
+            DonationRequest.objects.create(
+                requester=requester, name=f"n{i}", age=30, sex='M', blood_type='A+', content='c',
+                image='donation_images/r.png', location='서울', donation_due_date=date.today(),
+                donator_registered_id='000000-0000',
+            )
+            for i in range(3)
+        ]
+        RejectedMatchRequest.objects.create(user=self.donor, donation_request=newer[2])
+        self.use_fake_seen_set()
+        # the newest unseen candidates only, skipping the rejected one
+        self.assertEqual(self.candidate_ids(), [newer[0].id, newer[1].id])
+
+
+class MatchPageTests(TestCase):
+
+    def setUp(self):
+        self.donor = User.objects.create(email='donor@example.com', nickname='donor', blood_type='O-')
+        requester = User.objects.create(email='requester@example.com', nickname='requester')
+        due = date.today() + timedelta(days=2)
+        self.requests = [
+            DonationRequest.objects.create(
+                requester=requester, name=f"r{i}", age=30, sex=sex, blood_type='A+', content='c',
+                image='donation_images/r.png', location=location, donation_due_date=due,
+                donator_registered_id='000000-0000',
+            )
+            for i, (location, sex) in enumerate([('부산', 'F'), ('서울', 'M'), ('부산', 'M'), ('서울', 'F'), ('대구', 'M')])
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.donor)
+
+    def match(self, **extra):
+        data = {
+            'blood_type': 'O-', 'age': 30, 'sex': 'M', 'location': '서울',
+            'next_donation_date': (date.today() + timedelta(days=1)).isoformat(), **extra,
+        }
+        return self.client.post('/donations/match/', data, format='json')
+
+    def test_cursor_pages_ranked_candidates_once(self):
+        RejectedMatchRequest.objects.create(user=self.donor, donation_request=self.requests[4])
+        page = self.match(limit=2).json()
+        ids = [result['id'] for result in page['results']]
+        # 지역과 성별이 모두 맞는 요청이 먼저
+        self.assertEqual(ids[0], self.requests[1].id)
+        while page['next_cursor']:
+            page = self.match(limit=2, cursor=page['next_cursor']).json()
+            ids += [result['id'] for result in page['results']]
+        self.assertEqual(sorted(ids), sorted(r.id for r in self.requests[:4]))
+
+        # limit 없이 호출하면 예전처럼 최상위 하나
+        self.assertEqual(self.match().json()['id'], self.requests[1].id)
+
+    def test_rejects_tampered_cursor(self):
+        self.assertEqual(self.match(limit=2, cursor='bogus').status_code, 400)
+
+
+class ArchiveExpiredRequestsTests(TestCase):
+
+    def setUp(self):
+        self.donor = User.objects.create(email='donor@example.com', nickname='donor')
+        requester = User.objects.create(email='requester@example.com', nickname='requester')
+        today = date.today()
+        self.expired, self.live = [
+            DonationRequest.objects.create(
+                requester=requester, name=name, age=30, sex='F', blood_type='A+', content='c',
+                image='donation_images/r.png', image_status=DonationRequest.IMAGE_FAILED, location='서울',
+                donation_due_date=today + timedelta(days=days), donator_registered_id='000000-0000',
+            )
+            for name, days in [('expired', -1), ('live', 1)]
+        ]
+        RejectedMatchRequest.objects.create(user=self.donor, donation_request=self.expired)
+
+    def test_request_fields_cover_every_column(self):
+        self.assertEqual(set(REQUEST_FIELDS), {field.attname for field in DonationRequest._meta.concrete_fields})
+
+    def test_moves_past_due_requests_with_all_columns(self):
+        call_command('archive_expired_requests', sleep=0, stdout=StringIO())
+
+        self.assertEqual(list(DonationRequest.objects.values_list('id', flat=True)), [self.live.id])
+        archived = ArchivedDonationRequest.objects.get(id=self.expired.id)
+        self.assertEqual(
+            (archived.image_status, archived.updated_at, archived.image),
+            (DonationRequest.IMAGE_FAILED, self.expired.updated_at, 'donation_images/r.png'),
+        )
+        self.assertTrue(ArchivedRejectedMatchRequest.objects.filter(donation_request=archived, user=self.donor).exists())
+        self.assertFalse(RejectedMatchRequest.objects.exists())
+
+    def test_archived_request_is_gone(self):
+        call_command('archive_expired_requests', sleep=0, stdout=StringIO())
+        client = APIClient()
+        for url in (f'/donations/{self.expired.id}/', f'/donations/{self.expired.id}/image/'):
+            response = client.get(url)
+            self.assertEqual((response.status_code, response.json()['id']), (410, self.expired.id))
+        self.assertEqual(client.get(f'/donations/{self.live.id}/').status_code, 200)
+        self.assertEqual(client.get(f'/donations/{self.live.id + 100}/').status_code, 404)
+
+
+@override_settings(MINIO_STORAGE_ACCESS_KEY='minioadmin', MINIO_STORAGE_SECRET_KEY='minioadmin')
+class PresignedImageUploadTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(email='uploader@example.com', nickname='uploader')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def presign(self):
+        response = self.client.post('/donations/image-uploads/', {'filename': 'photo.png'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def create_request(self, key):
+        return self.client.post('/donations/', {
+            'requester': self.user.id, 'name': 'n', 'age': 30, 'sex': 'M', 'blood_type': 'A+', 'content': 'c',
+            'location': '서울', 'donation_due_date': str(date.today()), 'donator_registered_id': '000000-0000',
+            'image_key': key,
+        }, format='json')
+
+    def test_requires_login(self):
+        response = APIClient().post('/donations/image-uploads/', {'filename': 'photo.png'}, format='json')
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_policy_limits_key_type_and_size(self):
+        upload = self.presign()
+        self.assertEqual(upload['form_fields']['key'], upload['key'])
+        self.assertIn('policy', upload['form_fields'])
+        self.assertTrue(upload['key'].startswith(f"donation_images/uploads/{self.user.id}/"))
+
+    @mock.patch('donations.uploads.default_storage')
+    def test_key_is_claimed_once(self, storage):
+        storage.exists.return_value = True
+        storage.size.return_value = 1024
+        key = self.presign()['key']
+        with mock.patch('django.db.models.fields.files.FieldFile.save'):
+            self.assertEqual(self.create_request(key).status_code, 201)
+            second = self.create_request(key)
+        self.assertEqual(second.status_code, 400)
+        self.assertIn('image_key', second.json())
+
+    @mock.patch('donations.uploads.default_storage')
+    def test_purge_removes_only_stale_unclaimed_uploads(self, storage):
+        from donations.models import PresignedImageUpload
+        from donations.uploads import purge_unclaimed_uploads
+        stale, fresh = self.presign()['key'], self.presign()['key']
+        PresignedImageUpload.objects.filter(key=stale).update(created_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(purge_unclaimed_uploads(timezone.now() - timedelta(days=1)), (1, 0))
+        storage.delete.assert_called_once_with(stale)
+        self.assertEqual(list(PresignedImageUpload.objects.values_list('key', flat=True)), [fresh])
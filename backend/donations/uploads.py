@@ -0,0 +1,188 @@
+import logging
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import DonationRequest, PresignedImageUpload
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundUploader:
+    """
+    Uploads donation request images to storage on a small thread pool after the
+    row is committed. At most `max_pending` uploads are queued or running per
+    process; submit() returns False when the queue is full so the caller can
+    upload inline instead.
+    """
+
+    def __init__(self, workers, max_pending):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='donation-upload')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, request_id, name, content):
+        if not self._slots.acquire(blocking=False):
+            return False
+        self._executor.submit(self._run, request_id, name, content)
+        return True
+
+    def _run(self, request_id, name, content):
+        try:
+            upload_image(request_id, name, content)
+        finally:
+            self._slots.release()
+            close_old_connections()
+
+
+def upload_image(request_id, name, content):
+    """Store `content` for an already saved request and mark its image ready (or failed)."""
+    donation_request = DonationRequest(id=request_id)
+    try:
+        donation_request.image.save(name, ContentFile(content), save=False)
+    except Exception:
+        logger.exception("Image upload failed for DonationRequest %s", request_id)
+        DonationRequest.objects.filter(id=request_id).update(
+            image_status=DonationRequest.IMAGE_FAILED, updated_at=timezone.now()
+        )
+        return
+    # update() skips auto_now, so bump updated_at by hand to change the ETag
+    DonationRequest.objects.filter(id=request_id).update(
+        image=donation_request.image.name,
+        image_status=DonationRequest.IMAGE_READY,
+        updated_at=timezone.now(),
+    )
+
+
+_uploader = None
+
+
+def get_background_uploader():
+    """Per-process uploader, or None when DONATION_IMAGE_UPLOAD is not 'background'."""
+    global _uploader
+    if settings.DONATION_IMAGE_UPLOAD != 'background':
+        return None
+    if _uploader is None:
+        _uploader = BackgroundUploader(
+            settings.DONATION_IMAGE_UPLOAD_WORKERS,
+            settings.DONATION_IMAGE_UPLOAD_QUEUE,
+        )
+    return _uploader
+
+
+# Presigned direct-to-MinIO uploads: the client POSTs the bytes to MinIO itself
+# and sends only the object key to create.
+
+PRESIGNED_UPLOAD_PREFIX = 'donation_images/uploads'
+PRESIGNED_UPLOAD_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic'}
+
+_presign_client = None
+
+
+def _get_presign_client():
+    # URLs are signed for the public MinIO host the client uploads to, not the
+    # internal endpoint Django talks to; presigning itself makes no request
+    global _presign_client
+    if _presign_client is None:
+        import minio
+        public_url = urlparse(settings.MINIO_PUBLIC_URL_BASE)
+        _presign_client = minio.Minio(
+            public_url.netloc,
+            access_key=settings.MINIO_STORAGE_ACCESS_KEY,
+            secret_key=settings.MINIO_STORAGE_SECRET_KEY,
+            secure=public_url.scheme == 'https',
+            region=getattr(settings, 'MINIO_STORAGE_REGION', None) or 'us-east-1',
+        )
+    return _presign_client
+
+
+def _upload_key_prefix(user_id):
+    return f"{PRESIGNED_UPLOAD_PREFIX}/{user_id}/"
+
+
+def presign_image_upload(user_id, filename):
+    """
+    Presigned POST policy for one new object key. MinIO itself rejects uploads
+    that use another key, are not image/*, or are larger than
+    DONATION_IMAGE_MAX_UPLOAD_SIZE. The key is recorded so it can be claimed once.
+    """
+    from minio.datatypes import PostPolicy
+
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in PRESIGNED_UPLOAD_EXTENSIONS:
+        raise serializers.ValidationError({'filename': ['Unsupported image type.']})
+
+    key = f"{_upload_key_prefix(user_id)}{uuid.uuid4().hex}{extension}"
+    bucket = settings.MINIO_STORAGE_MEDIA_BUCKET_NAME
+    policy = PostPolicy(bucket, timezone.now() + timedelta(seconds=settings.PRESIGNED_UPLOAD_EXPIRY))
+    policy.add_equals_condition('key', key)
+    policy.add_starts_with_condition('Content-Type', 'image/')
+    policy.add_content_length_range_condition(1, settings.DONATION_IMAGE_MAX_UPLOAD_SIZE)
+    fields = _get_presign_client().presigned_post_policy(policy)
+
+    PresignedImageUpload.objects.create(key=key, user_id=user_id)
+    return {
+        'key': key,
+        'upload_url': f"{settings.MINIO_PUBLIC_URL_BASE}/{bucket}",
+        # multipart form fields to send along with Content-Type and the file
+        'form_fields': {**fields, 'key': key},
+        'max_size': settings.DONATION_IMAGE_MAX_UPLOAD_SIZE,
+        'expires_in': settings.PRESIGNED_UPLOAD_EXPIRY,
+    }
+
+
+def claim_uploaded_image(user_id, key):
+    """
+    Check an object key handed out by presign_image_upload before it is stored on
+    a row: it must have been issued to `user_id`, not be claimed yet, exist, and
+    fit the size limit (also enforced by the POST policy; oversized objects are
+    deleted here). mark_image_claimed() makes the claim final on save.
+    """
+    prefix = _upload_key_prefix(user_id)
+    if not key.startswith(prefix) or not re.fullmatch(r'[0-9a-f]{32}\.[a-z]+', key[len(prefix):]):
+        raise serializers.ValidationError({'image_key': ['Invalid image key.']})
+    if not PresignedImageUpload.objects.filter(key=key, user_id=user_id, claimed_at__isnull=True).exists():
+        raise serializers.ValidationError({'image_key': ['Invalid or already used image key.']})
+    if not default_storage.exists(key):
+        raise serializers.ValidationError({'image_key': ['Image has not been uploaded.']})
+    if default_storage.size(key) > settings.DONATION_IMAGE_MAX_UPLOAD_SIZE:
+        default_storage.delete(key)
+        raise serializers.ValidationError({'image_key': ['Image is too large.']})
+    return key
+
+
+def mark_image_claimed(key):
+    """
+    Claim a key checked by claim_uploaded_image, inside the transaction that
+    saves the request. The conditional UPDATE lets only one of two concurrent
+    claims through.
+    """
+    if not PresignedImageUpload.objects.filter(key=key, claimed_at__isnull=True).update(claimed_at=timezone.now()):
+        raise serializers.ValidationError({'image_key': ['Invalid or already used image key.']})
+
+
+def purge_unclaimed_uploads(older_than):
+    """
+    Delete uploads issued before `older_than` that were never claimed (record and
+    object), and the records of claimed ones, which are only needed to refuse a
+    second claim. Returns (unclaimed uploads removed, claimed records removed).
+    """
+    stale = PresignedImageUpload.objects.filter(created_at__lt=older_than)
+    removed = 0
+    for pk, key in stale.filter(claimed_at__isnull=True).values_list('pk', 'key').iterator():
+        # record first: a claim racing with the purge then fails instead of pointing at a deleted object
+        if PresignedImageUpload.objects.filter(pk=pk, claimed_at__isnull=True).delete()[0]:
+            default_storage.delete(key)
+            removed += 1
+    claimed, _ = stale.filter(claimed_at__isnull=False).delete()
+    return removed, claimed
@@ -1,6 +1,7 @@
 from drf_yasg.inspectors import SwaggerAutoSchema
 from drf_yasg.utils import swagger_auto_schema
 import datetime
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets
 from rest_framework.response import Response
@@ -8,18 +9,26 @@ from rest_framework import status
 from rest_framework.decorators import action
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
-from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Case, When, IntegerField # Import necessary functions
-from datetime import timedelta
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.permissions import IsAuthenticated
 from django.core.files.storage import storages
-from django.core.files import File
+from django.core import signing
 
-from .serializers import CreateDonationRequestSerializer, DonationRequestIdSerializer, DonationRequestSerializer, DonatorRegisteredIdSerializer, MatchRequestSerializer, MessageSerializer, RejectedMatchRequestSerializer, SelectedMatchRequestSerializer
-from .models import DonationRequest, RejectedMatchRequest, SelectedMatchRequest
+from .serializers import ArchivedDonationRequestSerializer, CreateDonationRequestSerializer, DonationRequestIdSerializer, DonationRequestImageSerializer, DonationRequestSerializer, DonatorRegisteredIdSerializer, MatchPageSerializer, MatchRequestSerializer, MessageSerializer, PresignedImageUploadRequestSerializer, PresignedImageUploadSerializer, RejectedMatchRequestSerializer, SelectedMatchRequestSerializer
+from .models import ArchivedDonationRequest, DonationRequest, RejectedMatchRequest, SelectedMatchRequest
+from .matching import candidate_queryset, rank_candidates, top_matches
+from .queues import get_match_queue
+from .uploads import presign_image_upload
+from pitza.conditional import conditional_retrieve
+
+def archived_or_404(pk):
+    """410 Gone for a request the archive_expired_requests command moved out, else 404."""
+    archived = get_object_or_404(ArchivedDonationRequest.objects.only('id', 'archived_at'), pk=pk)
+    return Response(ArchivedDonationRequestSerializer(archived).data, status=status.HTTP_410_GONE)
 
 class DonationRequestViewSet(viewsets.ViewSet):
     swagger_schema = SwaggerAutoSchema
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
     
     @swagger_auto_schema(method='get',
                          responses={200: MessageSerializer})
@@ -33,51 +42,83 @@ class DonationRequestViewSet(viewsets.ViewSet):
         return Response({"message": "Test successful", "image_url": img}, status=status.HTTP_200_OK)
   
     @swagger_auto_schema(request_body=CreateDonationRequestSerializer,
-    responses={201: DonationRequestIdSerializer})
+    responses={201: DonationRequestImageSerializer})
     def create(self, request):
-        serializer = CreateDonationRequestSerializer(data=request.data)
+        # validated once; the image is uploaded and the row inserted in a single save
+        # (or, with DONATION_IMAGE_UPLOAD=background, uploaded after the response)
+        serializer = DonationRequestSerializer(data=request.data, context={'request': request})
 
         if serializer.is_valid():
-   
-            validated_data = serializer.validated_data
-            image_file = validated_data.get('image')
-            
-            donation_request_serializer = DonationRequestSerializer(data=validated_data)
-
-            if donation_request_serializer.is_valid():
-                donation_request = donation_request_serializer.save()
-
-                if image_file:
-                    django_file = File(image_file, name=image_file.name)
-                    donation_request.image = django_file
-                    donation_request.save()
-
-                response_serializer = DonationRequestIdSerializer(donation_request)
-                return Response(response_serializer.data, status=status.HTTP_201_CREATED)
-            else:
-                print(donation_request_serializer.errors)
-                return Response(donation_request_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            donation_request = serializer.save()
+            response_serializer = DonationRequestImageSerializer(donation_request)
+            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
         else:
             print(serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-    @swagger_auto_schema(responses={200: DonationRequestSerializer})
+    @swagger_auto_schema(method='post', request_body=PresignedImageUploadRequestSerializer,
+    responses={201: PresignedImageUploadSerializer})
+    @action(detail=False, methods=['post'], url_path='image-uploads', parser_classes=[JSONParser, FormParser],
+            permission_classes=[IsAuthenticated])
+    def image_upload(self, request):
+        """
+        Get a presigned POST policy to upload a donation request image straight to
+        MinIO: send `form_fields`, a `Content-Type: image/...` field and `file` as
+        multipart form data to `upload_url`, then pass the returned key as
+        `image_key` when creating the request (once; unclaimed uploads are purged)
+        """
+        serializer = PresignedImageUploadRequestSerializer(data=request.data)
+        if serializer.is_valid():
+            upload = presign_image_upload(request.user.id, serializer.validated_data['filename'])
+            response_serializer = PresignedImageUploadSerializer(upload)
+            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @swagger_auto_schema(responses={200: DonationRequestSerializer, 410: ArchivedDonationRequestSerializer})
     def retrieve(self, request, pk):
-        donation_request = get_object_or_404(DonationRequest, pk=pk)
-        serializer = DonationRequestSerializer(donation_request)
+        """
+        A donation request. Past-due requests moved out by archive_expired_requests
+        answer 410 Gone with their id and archived_at instead of 404.
+        """
+        def render():
+            donation_request = get_object_or_404(DonationRequest, pk=pk)
+            serializer = DonationRequestSerializer(donation_request)
+            return Response(serializer.data)
+
+        # unchanged requests are answered from updated_at alone with a 304
+        try:
+            return conditional_retrieve(request, DonationRequest.objects.all(), pk, ('updated_at',), render)
+        except Http404:
+            return archived_or_404(pk)
+
+    @swagger_auto_schema(method='get', responses={200: DonationRequestImageSerializer, 410: ArchivedDonationRequestSerializer})
+    @action(detail=True, methods=['get'], url_path='image')
+    def image(self, request, pk):
+        """
+        Poll the upload state of a donation request image (410 Gone once archived)
+        """
+        donation_request = DonationRequest.objects.only('id', 'image', 'image_status').filter(pk=pk).first()
+        if donation_request is None:
+            return archived_or_404(pk)
+        serializer = DonationRequestImageSerializer(donation_request)
         return Response(serializer.data)
     
     @swagger_auto_schema(method='post', request_body=MatchRequestSerializer,
     responses={200: DonationRequestIdSerializer})
+    # with `limit` the response is a MatchPageSerializer instead
     @action(detail=False, methods=['post'], url_path='match')
     def match(self, request):
+        # fall back to the donor's profile for fields the client leaves out
+        profile = request.user
         serializer = MatchRequestSerializer(data={
             'id': request.user.id,
-            'blood_type': request.data.get('blood_type'),
-            'age': request.data.get('age'),
-            'sex': request.data.get('sex'),
+            'blood_type': request.data.get('blood_type') or getattr(profile, 'blood_type', None) or None,
+            'age': request.data.get('age') or getattr(profile, 'age', None),
+            'sex': request.data.get('sex') or getattr(profile, 'sex', None) or None,
             'location': request.data.get('location'),
-            'next_donation_date': request.data.get('next_donation_date')
+            'next_donation_date': request.data.get('next_donation_date'),
+            'limit': request.data.get('limit'),
+            'cursor': request.data.get('cursor'),
         })
         
         if serializer.is_valid():
@@ -88,52 +129,51 @@ class DonationRequestViewSet(viewsets.ViewSet):
             requested_sex = serializer.validated_data['sex']
             requested_location = serializer.validated_data['location']
             requested_age = serializer.validated_data['age']
-            
-            # set the ranges for age and date
-            age_min = requested_age - 5
-            age_max = requested_age + 5
-            date_min = next_donation_date - timedelta(days=7)
-            date_max = next_donation_date + timedelta(days=7)
- 
+            limit = serializer.validated_data.get('limit')
+            cursor = serializer.validated_data.get('cursor')
 
-            # get the list of rejected donation request IDs for the current user
-            rejected_ids = RejectedMatchRequest.objects.filter(user=request.user).values_list('donation_request_id', flat=True)
-            print(rejected_ids)
-            selected_ids = SelectedMatchRequest.objects.filter(user=request.user).values_list('donation_request_id', flat=True)
-            print(selected_ids)
-            queryset = DonationRequest.objects.filter(
-                blood_type=requested_blood_type,
-                donation_due_date__gte=date_min,  
-                donation_due_date__lte=date_max
-            ).exclude(id__in=rejected_ids).exclude(id__in=selected_ids)
+            queue = get_match_queue()
+            if queue is not None:
+                # precomputed per-donor queue: the head of the queue is the best match
+                criteria = {
+                    'blood_type': requested_blood_type,
+                    'sex': requested_sex,
+                    'location': requested_location,
+                    'age': requested_age,
+                    'next_donation_date': next_donation_date,
+                }
+                try:
+                    results, next_cursor = queue.top_matches(request.user, criteria, limit or 1, cursor)
+                except (signing.BadSignature, KeyError):
+                    return Response({"cursor": ["Invalid cursor."]}, status=status.HTTP_400_BAD_REQUEST)
+            else:
+                # requests the donor's blood type can serve, due within a week of the next donation date,
+                # that the current user has not rejected or selected yet
+                queryset = candidate_queryset(request.user, requested_blood_type, next_donation_date)
 
-            # filter the queryset based on sex, location, age, and date
-            queryset = queryset.annotate(
-                matches_sex=Case(
-                    When(sex=requested_sex, then=1),
-                    default=0,
-                    output_field=IntegerField()
-                ),
-                matches_location=Case(
-                    When(location=requested_location, then=1),
-                    default=0,
-                    output_field=IntegerField()
-                ),
-                matches_age_range=Case(
-                    When(age__gte=age_min, age__lte=age_max, then=1),
-                    default=0,
-                    output_field=IntegerField()
-                ),
-            )
+                # rank by location, sex and age range (exact blood type breaks ties)
+                queryset = rank_candidates(
+                    queryset,
+                    requested_blood_type,
+                    requested_sex,
+                    requested_location,
+                    requested_age,
+                )
+                if limit:
+                    try:
+                        results, next_cursor = top_matches(queryset, limit, cursor)
+                    except (signing.BadSignature, KeyError):
+                        return Response({"cursor": ["Invalid cursor."]}, status=status.HTTP_400_BAD_REQUEST)
+                else:
+                    best_match = queryset.first()
+                    results = [best_match] if best_match is not None else []
+
+            if limit:
+                response_serializer = MatchPageSerializer({'results': results, 'next_cursor': next_cursor})
+                return Response(response_serializer.data, status=status.HTTP_200_OK)
 
-            queryset = queryset.order_by(
-                '-matches_location',
-                '-matches_sex',       
-                '-matches_age_range',  
-            )
-            
-            if queryset.exists():
-                response_serializer = DonationRequestIdSerializer(queryset.first())
+            if results:
+                response_serializer = DonationRequestIdSerializer(results[0])
                 return Response(response_serializer.data, status=status.HTTP_200_OK)
             else:
                 return Response({"message": "No matching donation requests found"}, status=status.HTTP_404_NOT_FOUND)
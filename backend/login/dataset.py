@@ -0,0 +1,124 @@
+"""
+Row generators for the generate_dataset command.
+
+Every function builds one chunk (rows start..start+count) of plain dicts
+from its own seed, so the output does not depend on how chunks are spread
+over worker processes. The module imports no Django models: spawned
+workers import it without django.setup().
+"""
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from faker import Faker
+
+BLOOD_TYPES = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
+SEXES = ['M', 'F']
+LOCATIONS = ["서울", "부산", "대구", "광주", "인천", "울산", "경기도", "강원도", "전라도", "충청도", "제주도"]
+EMAIL_DOMAIN = 'dataset.pitza'
+
+
+def _faker(seed):
+    fake = Faker('ko_KR')
+    fake.seed_instance(seed)
+    return fake, random.Random(seed)
+
+
+def _timestamp(rng, now, days):
+    return now - timedelta(seconds=rng.randint(0, days * 24 * 60 * 60))
+
+
+def user_rows(seed, start, count, run_id):
+    # email/kakao_id come from the row number, so they are unique without lookups
+    fake, rng = _faker(seed)
+    today = date.today()
+    return [
+        {
+            'email': f"user{i}@{run_id}.{EMAIL_DOMAIN}",
+            'kakao_id': f"{run_id}-{i}",
+            'nickname': fake.user_name(),
+            'birthdate': today - timedelta(days=rng.randint(18 * 365, 65 * 365)),
+            'sex': rng.choice(SEXES),
+            'blood_type': rng.choice(BLOOD_TYPES),
+            'profile_picture_key': fake.image_url(),
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def donation_request_rows(seed, start, count, user_count, now, days):
+    fake, rng = _faker(seed)
+    today = now.date()
+    rows = []
+    for _ in range(count):
+        created_at = _timestamp(rng, now, days)
+        rows.append({
+            'requester': rng.randrange(user_count),
+            'name': fake.name(),
+            'age': rng.randint(16, 70),
+            'sex': rng.choice(SEXES),
+            'blood_type': rng.choice(BLOOD_TYPES),
+            'content': fake.paragraph(nb_sentences=3),
+            'image': 'donation_images/dataset.png',
+            'location': rng.choice(LOCATIONS),
+            # mostly upcoming, some already past due (archive candidates)
+            'donation_due_date': today + timedelta(days=rng.randint(-30, 60)),
+            'donator_registered_id': f"{rng.randint(0, 999999):06d}-{rng.randint(0, 9999):04d}",
+            'created_at': created_at,
+        })
+    return rows
+
+
+def board_post_rows(seed, start, count, user_count, now, days):
+    fake, rng = _faker(seed)
+    donations, requests = [], []
+    for _ in range(count):
+        created_at = _timestamp(rng, now, days)
+        if rng.random() < 0.5:
+            donations.append({
+                'donor': rng.randrange(user_count),
+                'donor_name': fake.name(),
+                'blood_type': rng.choice(BLOOD_TYPES),
+                'age': rng.randint(18, 65),
+                'gender': rng.choice(SEXES),
+                'region': rng.choice(LOCATIONS),
+                'introduction': fake.paragraph(nb_sentences=3),
+                'created_at': created_at,
+            })
+        else:
+            requests.append({
+                'requester': rng.randrange(user_count),
+                'blood_type': rng.choice(BLOOD_TYPES),
+                'region': rng.choice(LOCATIONS),
+                'reason': fake.paragraph(nb_sentences=3),
+                'created_at': created_at,
+            })
+    return donations, requests
+
+
+def chat_rows(seed, start, count, user_count, messages_per_room, now, days):
+    """Rooms between two distinct users, each with its messages in time order (all but the latest read)."""
+    fake, rng = _faker(seed)
+    rooms = []
+    for _ in range(count):
+        first, second = rng.sample(range(user_count), 2)
+        created_at = _timestamp(rng, now, days)
+        sent_at = created_at
+        messages = []
+        for _ in range(rng.randint(1, messages_per_room * 2 - 1)):
+            sent_at = min(sent_at + timedelta(seconds=rng.randint(5, 6 * 60 * 60)), now)
+            messages.append({
+                'sender': rng.choice((first, second)),
+                'content': fake.sentence(),
+                'timestamp': sent_at,
+            })
+        rooms.append({
+            'participants': (first, second),
+            'post_id': str(rng.randint(1, 100000)),
+            'created_at': created_at,
+            'messages': messages,
+        })
+    return rooms
+
+
+def utc_now():
+    return datetime.now(timezone.utc).replace(microsecond=0)
@@ -0,0 +1,270 @@
+import multiprocessing
+import random
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from board.models import DonationPost, RequestPost
+from chat.messaging import refresh_rooms
+from chat.models import ChatParticipant, ChatRoom, Message
+from donations.models import DonationRequest, RejectedMatchRequest, SelectedMatchRequest
+from login import dataset
+
+User = get_user_model()
+
+# models whose auto_now/auto_now_add timestamps are filled from the generated rows instead
+TIMESTAMPED_MODELS = [DonationRequest, DonationPost, RequestPost, ChatRoom]
+
+
+@contextmanager
+def explicit_timestamps():
+    fields = [
+        field for model in TIMESTAMPED_MODELS for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def new_ids(model, after):
+    """Ids inserted after `after`, in insert order (MySQL bulk_create does not return them)."""
+    return list(model.objects.filter(id__gt=after).order_by('id').values_list('id', flat=True))
+
+
+def max_id(model):
+    return model.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates a consistent synthetic dataset for load testing: users, donation requests, '
+        'match history, board posts, chat rooms and messages, using bulk inserts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help='Number of users.')
+        parser.add_argument('--requests', type=int, default=100000, help='Number of donation requests.')
+        parser.add_argument('--history', type=int, default=20, help='Rejected/selected match rows per user.')
+        parser.add_argument('--posts', type=int, default=100000, help='Number of board posts (donation + request).')
+        parser.add_argument('--rooms', type=int, default=10000, help='Number of chat rooms.')
+        parser.add_argument('--messages-per-room', type=int, default=20, help='Average messages per chat room.')
+        parser.add_argument('--days', type=int, default=180, help='Spread timestamps over this many past days.')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per bulk_create and per generated chunk.')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes generating Faker rows (1 generates in this process).')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; same seed and sizes give the same data.')
+        parser.add_argument('--password', default='testpassword123', help='Password set on every generated user.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.batch_size = options['batch_size']
+        self.seed = options['seed']
+        self.now = dataset.utc_now()
+        run_id = uuid.uuid4().hex[:8]
+        self.stdout.write(self.style.SUCCESS(
+            f"Generating dataset (run {run_id}, seed {self.seed}, {options['workers']} worker(s))..."
+        ))
+
+        executor = None
+        if options['workers'] > 1:
+            # spawn: workers only import login.dataset, no Django state is forked
+            executor = ProcessPoolExecutor(max_workers=options['workers'], mp_context=multiprocessing.get_context('spawn'))
+        self.executor = executor
+
+        started = time.perf_counter()
+        try:
+            with explicit_timestamps():
+                user_ids = self.generate_users(run_id)
+                request_ids = self.generate_requests(user_ids)
+                self.generate_history(user_ids, request_ids)
+                self.generate_posts(user_ids)
+                self.generate_chats(user_ids)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.rebuild_derived()
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {time.perf_counter() - started:.1f}s. Generated users have emails ending in "
+            f"@{run_id}.{dataset.EMAIL_DOMAIN}."
+        ))
+
+    def chunks(self, func, arg_tuples):
+        """Run func(*args) per chunk, in this process or the pool, yielding results in order."""
+        if self.executor is None:
+            for args in arg_tuples:
+                yield func(*args)
+            return
+        # at most 2 chunks per worker in flight, so generation cannot run far ahead of the inserts
+        pending = deque()
+        for args in arg_tuples:
+            pending.append(self.executor.submit(func, *args))
+            if len(pending) >= self.options['workers'] * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def chunk_args(self, total, phase, *args, size=None):
+        """(seed, start, count, *args) per chunk; the per-chunk seed keeps the rows independent of the workers."""
+        size = size or self.batch_size
+        for n, start in enumerate(range(0, total, size)):
+            yield (self.seed * 1_000_003 + phase * 100_003 + n, start, min(size, total - start), *args)
+
+    def report(self, label, rows, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"  {label}: {rows} rows in {elapsed:.1f}s ({rows / elapsed if elapsed else rows:.0f} rows/s)")
+
+    def generate_users(self, run_id):
+        started = time.perf_counter()
+        # one PBKDF2 run for the whole dataset instead of one per user
+        password = make_password(self.options['password'])
+        before = max_id(User)
+        args = self.chunk_args(self.options['users'], 0, run_id)
+        for rows in self.chunks(dataset.user_rows, args):
+            User.objects.bulk_create([User(password=password, **row) for row in rows], batch_size=self.batch_size)
+        user_ids = new_ids(User, before)
+        self.report('users', len(user_ids), started)
+        return user_ids
+
+    def generate_requests(self, user_ids):
+        started = time.perf_counter()
+        before = max_id(DonationRequest)
+        args = self.chunk_args(self.options['requests'], 1, len(user_ids), self.now, self.options['days'])
+        for rows in self.chunks(dataset.donation_request_rows, args):
+            objects = []
+            for row in rows:
+                row['requester_id'] = user_ids[row.pop('requester')]
+                objects.append(DonationRequest(updated_at=row['created_at'], **row))
+            DonationRequest.objects.bulk_create(objects, batch_size=self.batch_size)
+        request_ids = new_ids(DonationRequest, before)
+        self.report('donation requests', len(request_ids), started)
+        return request_ids
+
+    def generate_history(self, user_ids, request_ids):
+        started = time.perf_counter()
+        rng = random.Random(self.seed)
+        history = min(self.options['history'], len(request_ids))
+        rejected, selected = [], []
+        rows = 0
+        for user_id in user_ids:
+            for n, request_id in enumerate(rng.sample(request_ids, history)):
+                if n % 10 == 0:
+                    selected.append(SelectedMatchRequest(user_id=user_id, donation_request_id=request_id))
+                else:
+                    rejected.append(RejectedMatchRequest(user_id=user_id, donation_request_id=request_id))
+            if len(rejected) + len(selected) >= self.batch_size:
+                rows += self.flush_history(rejected, selected)
+        rows += self.flush_history(rejected, selected)
+        self.report('match history', rows, started)
+
+    def flush_history(self, rejected, selected):
+        RejectedMatchRequest.objects.bulk_create(rejected, batch_size=self.batch_size)
+        SelectedMatchRequest.objects.bulk_create(selected, batch_size=self.batch_size)
+        rows = len(rejected) + len(selected)
+        rejected.clear()
+        selected.clear()
+        return rows
+
+    def generate_posts(self, user_ids):
+        started = time.perf_counter()
+        rows = 0
+        args = self.chunk_args(self.options['posts'], 2, len(user_ids), self.now, self.options['days'])
+        for donations, requests in self.chunks(dataset.board_post_rows, args):
+            for row in donations:
+                row['donor_id'] = user_ids[row.pop('donor')]
+            for row in requests:
+                row['requester_id'] = user_ids[row.pop('requester')]
+            DonationPost.objects.bulk_create(
+                [DonationPost(updated_at=row['created_at'], **row) for row in donations], batch_size=self.batch_size
+            )
+            RequestPost.objects.bulk_create(
+                [RequestPost(updated_at=row['created_at'], **row) for row in requests], batch_size=self.batch_size
+            )
+            rows += len(donations) + len(requests)
+        self.report('board posts', rows, started)
+
+    def generate_chats(self, user_ids):
+        started = time.perf_counter()
+        if len(user_ids) < 2:
+            return
+        Membership = ChatRoom.participants.through
+        # rooms per chunk so that a chunk's messages stay around batch_size
+        rooms_per_chunk = max(1, self.batch_size // self.options['messages_per_room'])
+        args = self.chunk_args(
+            self.options['rooms'], 3, len(user_ids), self.options['messages_per_room'], self.now, self.options['days'],
+            size=rooms_per_chunk,
+        )
+        room_count = message_count = 0
+        for rooms in self.chunks(dataset.chat_rows, args):
+            before = max_id(ChatRoom)
+            ChatRoom.objects.bulk_create(
+                [ChatRoom(post_id=room['post_id'], created_at=room['created_at']) for room in rooms],
+                batch_size=self.batch_size,
+            )
+            room_ids = new_ids(ChatRoom, before)
+
+            memberships, messages = [], []
+            for room_id, room in zip(room_ids, rooms):
+                for index in room['participants']:
+                    memberships.append(Membership(chatroom_id=room_id, user_id=user_ids[index]))
+                for message in room['messages']:
+                    messages.append(Message(
+                        chatroom_id=room_id,
+                        sender_id=user_ids[message['sender']],
+                        content=message['content'],
+                        timestamp=message['timestamp'],
+                    ))
+            Membership.objects.bulk_create(memberships, batch_size=self.batch_size)
+            before = max_id(Message)
+            Message.objects.bulk_create(messages, batch_size=self.batch_size)
+            message_ids = iter(new_ids(Message, before))
+
+            # both read watermarks sit just before the room's latest message, leaving it unread
+            participants = []
+            for room_id, room in zip(room_ids, rooms):
+                ids = [next(message_ids) for _ in room['messages']]
+                watermark = ids[-2] if len(ids) > 1 else None
+                for index in room['participants']:
+                    participants.append(ChatParticipant(
+                        chatroom_id=room_id, user_id=user_ids[index], last_read_message_id=watermark,
+                    ))
+            ChatParticipant.objects.bulk_create(participants, batch_size=self.batch_size)
+            # last_message / unread_count 비정규화
+            refresh_rooms(room_ids)
+            room_count += len(room_ids)
+            message_count += len(messages)
+        self.report('chat rooms', room_count, started)
+        self.stdout.write(f"  chat messages: {message_count} rows")
+
+    def rebuild_derived(self):
+        # bulk_create skips signals: rebuild what they would have kept up to date
+        from board.cache import get_feed_cache
+        from chat.inbox import get_inbox
+        from donations.matching import get_candidate_index
+
+        index = get_candidate_index()
+        if index is not None:
+            index.rebuild()
+            self.stdout.write(f"  rebuilt {type(index).__name__}")
+        cache = get_feed_cache()
+        if cache is not None:
+            cache.invalidate('donation')
+            cache.invalidate('request')
+            self.stdout.write("  invalidated board feed cache")
+        inbox = get_inbox()
+        if inbox is not None:
+            users = inbox.rebuild()
+            self.stdout.write(f"  rebuilt chat inbox for {users} users")
@@ -54,6 +54,7 @@ class User(AbstractBaseUser):
     sex = models.CharField(max_length=10, blank=True)
     blood_type = models.CharField(max_length=3, blank=True)
     profile_picture_key = models.URLField(max_length=255, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
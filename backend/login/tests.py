@@ -0,0 +1,98 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from board.models import DonationPost, RequestPost
+from chat.models import ChatParticipant, ChatRoom, Message
+from donations.models import DonationRequest, RejectedMatchRequest, SelectedMatchRequest
+from login.models import User
+from login.tickets import InvalidTicket, issue_ticket, verify_ticket
+
+
+@override_settings(CHAT_TICKET_SECRET='test-secret', CHAT_TICKET_TTL=60)
+class ChatTicketTests(TestCase):
+
+    def test_round_trip(self):
+        ticket, exp = issue_ticket({'id': 7, 'nickname': '피짜'}, now=1000)
+        claims = verify_ticket(ticket, now=1000)
+        self.assertEqual((claims['id'], claims['nickname'], claims['exp']), (7, '피짜', exp))
+
+    def test_rejects_expired_and_tampered(self):
+        ticket, exp = issue_ticket({'id': 7}, now=1000)
+        with self.assertRaisesMessage(InvalidTicket, 'expired'):
+            verify_ticket(ticket, now=exp)
+        other, _ = issue_ticket({'id': 8}, now=1000)
+        with self.assertRaisesMessage(InvalidTicket, 'bad signature'):
+            verify_ticket(f"{ticket.split('.')[0]}.{other.split('.')[1]}", now=1000)
+        with self.assertRaisesMessage(InvalidTicket, 'malformed'):
+            verify_ticket('no-dot')
+
+    def test_non_ascii_input_is_invalid(self):
+        for ticket in ('é.x', 'x.é', 'é.é'):
+            with self.assertRaises(InvalidTicket):
+                verify_ticket(ticket)
+
+    def test_verify_endpoint_requires_login(self):
+        client = APIClient()
+        self.assertIn(client.post('/chat_ticket/verify/', {'tickets': ['é.x']}, format='json').status_code, (401, 403))
+
+        client.force_authenticate(User.objects.create(email='a@example.com', nickname='a'))
+        ticket = client.post('/chat_ticket/').json()['ticket']
+        response = client.post('/chat_ticket/verify/', {'tickets': [ticket, 'é.x']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['valid'] for result in response.json()['results']], [True, False])
+
+
+class GenerateDatasetTests(TestCase):
+
+    def test_consistent_dataset_without_bulk_insert_ids(self):
+        # MySQL 의 bulk_create 는 id 를 돌려주지 않음
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            call_command(
+                'generate_dataset', users=6, requests=20, history=3, posts=10, rooms=4, messages_per_room=3,
+                batch_size=7, seed=1, stdout=StringIO(),
+            )
+
+        user_ids = set(User.objects.values_list('id', flat=True))
+        self.assertEqual(len(user_ids), 6)
+        self.assertEqual(DonationRequest.objects.filter(requester_id__in=user_ids).count(), 20)
+        self.assertEqual(RejectedMatchRequest.objects.count() + SelectedMatchRequest.objects.count(), 6 * 3)
+        self.assertEqual(DonationPost.objects.count() + RequestPost.objects.count(), 10)
+
+        rooms = ChatRoom.objects.all()
+        self.assertEqual(len(rooms), 4)
+        for room in rooms:
+            members = set(room.participants.values_list('id', flat=True))
+            self.assertEqual(set(ChatParticipant.objects.filter(chatroom=room).values_list('user_id', flat=True)), members)
+            messages = list(Message.objects.filter(chatroom=room).order_by('id').values_list('id', 'sender_id'))
+            self.assertTrue(messages)
+            self.assertTrue({sender for _, sender in messages} <= members)
+            self.assertEqual(room.last_message_id, messages[-1][0])
+
+
+class UserDetailConditionalTests(TestCase):
+
+    def test_etag_changes_with_the_date(self):
+        # age 는 오늘 날짜로 계산되므로 생일이 지나면 304 가 아니라 새 age 를 받아야 함
+        user = User.objects.create(email='a@example.com', nickname='a', birthdate=date(2000, 6, 15))
+        client = APIClient()
+        client.force_authenticate(user)
+        url = f'/user/{user.id}/'
+
+        def get(today, **headers):
+            with mock.patch('login.views.user_views.date') as view_date, mock.patch('login.models.date') as model_date:
+                view_date.today.return_value = model_date.today.return_value = today
+                return client.get(url, **headers)
+
+        response = get(date(2026, 6, 14))
+        self.assertEqual(response.json()['age'], 25)
+        etag = response['ETag']
+        self.assertEqual(get(date(2026, 6, 14), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = get(date(2026, 6, 15), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.json()['age']), (200, 26))
@@ -0,0 +1,67 @@
+"""
+Short-lived chat connection tickets.
+
+A ticket is "<payload>.<signature>": the payload is base64url (no padding)
+JSON claims and the signature is base64url HMAC-SHA256 of the payload
+string under CHAT_TICKET_SECRET. The chat server holds the same secret and
+checks tickets without calling back into Django (see verifyTicket in
+chat-server/server.js), so both sides must keep this format in sync.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+from django.conf import settings
+
+
+class InvalidTicket(Exception):
+    pass
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _signature(secret, payload):
+    return _b64encode(hmac.new(secret.encode(), payload.encode('ascii'), hashlib.sha256).digest())
+
+
+def tickets_enabled():
+    return bool(settings.CHAT_TICKET_SECRET)
+
+
+def issue_ticket(claims, now=None):
+    """Signed ticket for claims, expiring CHAT_TICKET_TTL seconds from now. Returns (ticket, exp)."""
+    issued_at = int(now if now is not None else time.time())
+    exp = issued_at + settings.CHAT_TICKET_TTL
+    body = json.dumps({**claims, 'iat': issued_at, 'exp': exp}, separators=(',', ':'), ensure_ascii=False)
+    payload = _b64encode(body.encode())
+    return f"{payload}.{_signature(settings.CHAT_TICKET_SECRET, payload)}", exp
+
+
+def verify_ticket(ticket, now=None):
+    """Claims of a valid, unexpired ticket; raises InvalidTicket otherwise. No DB access."""
+    if not isinstance(ticket, str) or ticket.count('.') != 1:
+        raise InvalidTicket('malformed')
+    payload, signature = ticket.split('.')
+    try:
+        # compare bytes: compare_digest rejects non-ASCII str, and a non-ASCII payload cannot be signed
+        valid = hmac.compare_digest(signature.encode(), _signature(settings.CHAT_TICKET_SECRET, payload).encode())
+    except (UnicodeError, TypeError):
+        raise InvalidTicket('malformed')
+    if not valid:
+        raise InvalidTicket('bad signature')
+    try:
+        claims = json.loads(_b64decode(payload))
+        exp = int(claims['exp'])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidTicket('malformed')
+    if exp <= (now if now is not None else time.time()):
+        raise InvalidTicket('expired')
+    return claims
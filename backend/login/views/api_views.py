@@ -1,13 +1,16 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.throttling import UserRateThrottle
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from login.serializers import UserProfileSerializer
+from login.tickets import InvalidTicket, issue_ticket, tickets_enabled, verify_ticket
 
 User = get_user_model()
 
@@ -30,7 +33,16 @@ def get_user_by_session_api(request):
 
     serializer = UserProfileSerializer(user)
 
-    is_profile_complete = bool(
+    response_data = serializer.data.copy()
+
+
+    response_data['is_profile_complete'] = is_profile_complete(user)
+
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+def is_profile_complete(user):
+    return bool(
         getattr(user, 'nickname', None) and
         getattr(user, 'birthdate', None) is not None and
         getattr(user, 'sex', None) and
@@ -38,9 +50,83 @@ def get_user_by_session_api(request):
     )
 
 
-    response_data = serializer.data.copy()
+class ChatTicketSerializer(serializers.Serializer):
+    ticket = serializers.CharField()
+    expires_at = serializers.IntegerField(help_text='Unix time')
+
 
+class ChatTicketVerifyRequestSerializer(serializers.Serializer):
+    tickets = serializers.ListField(child=serializers.CharField(), allow_empty=False, max_length=500)
+
+
+class ChatTicketVerifyThrottle(UserRateThrottle):
+    """Per-user limit on batch verification (each call may compute up to 500 HMACs)."""
+    scope = 'chat_ticket_verify'
+
+    def get_rate(self):
+        return settings.CHAT_TICKET_VERIFY_RATE
+
+
+@swagger_auto_schema(
+    method='post',
+    responses={
+        status.HTTP_200_OK: ChatTicketSerializer,
+        status.HTTP_401_UNAUTHORIZED: 'Unauthorized - User is not authenticated.',
+        status.HTTP_503_SERVICE_UNAVAILABLE: 'CHAT_TICKET_SECRET is not configured.',
+    },
+    operation_description=(
+        "Issues a short-lived signed ticket for the chat server (Socket.IO auth: { ticket }). "
+        "The chat server verifies it without calling back, unlike get_user_by_session."
+    )
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def issue_chat_ticket_api(request):
+    if not tickets_enabled():
+        return Response({'error': 'Chat tickets are disabled.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    user = request.user
+    # same basics the chat server used to read from get_user_by_session
+    ticket, exp = issue_ticket({
+        'id': user.id,
+        'nickname': user.nickname,
+        'profile_picture': user.profile_picture_key,
+        'is_profile_complete': is_profile_complete(user),
+    })
+    return Response({'ticket': ticket, 'expires_at': exp}, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='post',
+    request_body=ChatTicketVerifyRequestSerializer,
+    responses={
+        status.HTTP_200_OK: 'results: [{valid, user} | {valid, error}] in request order',
+        status.HTTP_401_UNAUTHORIZED: 'Unauthorized - User is not authenticated.',
+        status.HTTP_429_TOO_MANY_REQUESTS: 'More than CHAT_TICKET_VERIFY_RATE calls.',
+    },
+    operation_description=(
+        "Verifies many chat tickets in one call (signature and expiry only, no DB access). "
+        "Requires authentication and is rate limited per user."
+    )
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([ChatTicketVerifyThrottle])
+def verify_chat_tickets_api(request):
+    if not tickets_enabled():
+        return Response({'error': 'Chat tickets are disabled.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
-    response_data['is_profile_complete'] = is_profile_complete
+    serializer = ChatTicketVerifyRequestSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
 
-    return Response(response_data, status=status.HTTP_200_OK)
\ No newline at end of file
+    results = []
+    for ticket in serializer.validated_data['tickets']:
+        try:
+            claims = verify_ticket(ticket)
+        except InvalidTicket as e:
+            results.append({'valid': False, 'error': str(e)})
+            continue
+        claims.pop('iat', None)
+        claims.pop('exp', None)
+        results.append({'valid': True, 'user': claims})
+    return Response({'results': results}, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -1,11 +1,14 @@
 # login/views/user_views.py
 
+from datetime import date, datetime, time
+
 from django.shortcuts import get_object_or_404
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from pitza.conditional import conditional_retrieve
 
 User = get_user_model()
 
@@ -22,7 +25,14 @@ class UserSerializer(serializers.ModelSerializer):
 @api_view(['GET'])
 @swagger_auto_schema(responses={200: 'User details retrieved successfully'})
 def user_detail(request, pk):
-    user = get_object_or_404(User, pk=pk)
-    serializer = UserSerializer(user)
+    def render():
+        user = get_object_or_404(User, pk=pk)
+        serializer = UserSerializer(user)
+        return Response(serializer.data, status=200)
 
-    return Response(serializer.data, status=200)
\ No newline at end of file
+    # 변경이 없으면 updated_at만 읽고 304
+    # age 는 birthdate 와 오늘 날짜로 계산되므로 날짜가 바뀌면 새 버전 (User.age 와 같은 date.today() 기준)
+    start_of_today = datetime.combine(date.today(), time.min).astimezone()
+    return conditional_retrieve(
+        request, User.objects.all(), pk, ('updated_at',), render, extra_timestamps=(start_of_today,)
+    )
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+ASGI config for pitza project.
+
+Serves the Channels chat WebSocket (ws/chat/, see chat.consumers) and the
+chat messages/since long-poll, which only waits under ASGI. compose.yaml runs
+it as the web-asgi service:
+
+    uvicorn pitza.asgi:application --host 0.0.0.0 --port 8001 --lifespan on
+
+The rest of the HTTP API stays on the WSGI entry point (pitza.wsgi, the web
+service): Django's ASGIHandler runs sync views one at a time per process
+(sync_to_async(thread_sensitive=True)), so the DRF views are not moved here.
+
+The lifespan shutdown event saves chat messages still batched in
+chat.writer before the process exits (daphne sends no lifespan events).
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pitza.settings')
+
+# initialize Django before importing consumers (they import models)
+django_asgi_app = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack
+from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
+
+from chat.routing import websocket_urlpatterns
+from chat.writer import close_writer
+
+
+async def lifespan(scope, receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await close_writer()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': AllowedHostsOriginValidator(AuthMiddlewareStack(URLRouter(websocket_urlpatterns))),
+    'lifespan': lifespan,
+})
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def resource_validators(pk, *versions):
+    """
+    ETag and Last-Modified for a row from its `updated_at` (and those of any
+    related rows the representation embeds). None values are skipped.
+
+    Versions that are not timestamps (e.g. a counter updated without touching
+    `updated_at`) only go into the ETag. Last-Modified cannot express them, so
+    it is None then and only If-None-Match is honoured.
+    """
+    versions = [version for version in versions if version is not None]
+    stamps = [version for version in versions if isinstance(version, datetime)]
+    etag = quote_etag('-'.join([str(pk)] + [
+        str(int(version.timestamp() * 1_000_000)) if isinstance(version, datetime) else str(version)
+        for version in versions
+    ]))
+    last_modified = max(stamps) if stamps and len(stamps) == len(versions) else None
+    return etag, last_modified
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified(request, etag, last_modified):
+    """304 response when the request's If-None-Match/If-Modified-Since still match, else None."""
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified is not None else None
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def conditional_retrieve(request, queryset, pk, version_fields, render, extra_timestamps=()):
+    """
+    Answer a detail GET from the version columns alone when the client's copy is
+    current; otherwise call `render()` and attach the validators to its response.
+    `extra_timestamps` covers parts of the representation that change without a
+    row update (e.g. values computed from today's date).
+    """
+    versions = queryset.filter(pk=pk).values_list(*version_fields).first()
+    if versions is None:
+        raise Http404
+    etag, last_modified = resource_validators(pk, *versions, *extra_timestamps)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    return set_validators(render(), etag, last_modified)
+
+
+class ConditionalRetrieveMixin:
+    """RetrieveAPIView mixin: 304 for unchanged objects, checked before the object is loaded."""
+    version_fields = ('updated_at',)
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return conditional_retrieve(
+            request, self.get_queryset(), pk, self.version_fields,
+            lambda: super(ConditionalRetrieveMixin, self).retrieve(request, *args, **kwargs),
+        )
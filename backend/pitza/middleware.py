@@ -1,9 +1,22 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+
 class DisableCSRFMiddleware(object):
+    # async-capable so async views (chat messages/since) keep a fully async stack under ASGI
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
         setattr(request, '_dont_enforce_csrf_checks', True)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
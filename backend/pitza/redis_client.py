@@ -0,0 +1,36 @@
+import asyncio
+import weakref
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """Shared Redis connection (lazily created, one pool per process)."""
+    global _client
+    if _client is None:
+        _client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            decode_responses=True,
+        )
+    return _client
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_redis():
+    """asyncio Redis connection for the running event loop (async views and Channels consumers)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = redis.asyncio.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            decode_responses=True,
+        )
+    return client
@@ -189,6 +189,81 @@ MINIO_STORAGE_STATIC_USE_PRESIGNED = False
 MINIO_PUBLIC_URL_BASE = 'http://localhost:9000'
 MINIO_STORAGE_ENDPOINT_IS_PUBLIC = True
 
+# Redis (compose 'redis' 서비스)
+REDIS_HOST = os.environ.get('REDIS_HOST', 'redis')
+REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
+
+# Donation matching
+# candidate index backend, opt-in: 'redis', 'local' (per-process memory, misses other
+# workers' new requests until its TTL runs out), or '' to match from the DB only.
+# Only used together with DONATION_SEEN_SET; ignored without it
+DONATION_MATCH_INDEX = os.environ.get('DONATION_MATCH_INDEX', '')
+# seconds before a 'local' index is rebuilt from the DB (other workers' writes)
+DONATION_MATCH_INDEX_TTL = int(os.environ.get('DONATION_MATCH_INDEX_TTL', 60))
+# unseen indexed candidates (newest first) passed on to the ranking query per match call
+DONATION_MATCH_CANDIDATE_LIMIT = int(os.environ.get('DONATION_MATCH_CANDIDATE_LIMIT', 1000))
+# per-user bitmap of rejected/selected requests: 'redis', or '' to use DB anti-joins only
+DONATION_SEEN_SET = os.environ.get('DONATION_SEEN_SET', '')
+# precomputed ranked candidate queue per donor: 'redis', or '' to rank on every match call
+DONATION_MATCH_QUEUE = os.environ.get('DONATION_MATCH_QUEUE', '')
+
+# donation request images: 'sync' uploads inside the request, 'background' after the response
+DONATION_IMAGE_UPLOAD = os.environ.get('DONATION_IMAGE_UPLOAD', 'sync')
+DONATION_IMAGE_UPLOAD_WORKERS = int(os.environ.get('DONATION_IMAGE_UPLOAD_WORKERS', 4))
+# uploads queued or running per process before new ones are uploaded inline again
+DONATION_IMAGE_UPLOAD_QUEUE = int(os.environ.get('DONATION_IMAGE_UPLOAD_QUEUE', 32))
+# presigned direct-to-MinIO uploads
+DONATION_IMAGE_MAX_UPLOAD_SIZE = int(os.environ.get('DONATION_IMAGE_MAX_UPLOAD_SIZE', 10 * 1024 * 1024))
+PRESIGNED_UPLOAD_EXPIRY = int(os.environ.get('PRESIGNED_UPLOAD_EXPIRY', 600))
+
+# 게시판 피드 페이지 크기 (?page_size= 로 BOARD_FEED_MAX_PAGE_SIZE 까지 조절)
+BOARD_FEED_PAGE_SIZE = int(os.environ.get('BOARD_FEED_PAGE_SIZE', 20))
+BOARD_FEED_MAX_PAGE_SIZE = int(os.environ.get('BOARD_FEED_MAX_PAGE_SIZE', 100))
+# 피드 페이지 응답 캐시: 'redis' (+ 프로세스별 LRU), 빈 값이면 사용 안 함
+BOARD_FEED_CACHE = os.environ.get('BOARD_FEED_CACHE', '')
+BOARD_FEED_CACHE_TTL = int(os.environ.get('BOARD_FEED_CACHE_TTL', 60))
+BOARD_FEED_LOCAL_CACHE_SIZE = int(os.environ.get('BOARD_FEED_LOCAL_CACHE_SIZE', 256))
+# 게시글 이미지 변형(thumb/card/full) 생성: 'process' (프로세스 풀), 'sync' (커밋 직후 요청 안에서), 빈 값이면 사용 안 함
+BOARD_IMAGE_VARIANTS = os.environ.get('BOARD_IMAGE_VARIANTS', '')
+BOARD_IMAGE_VARIANT_WORKERS = int(os.environ.get('BOARD_IMAGE_VARIANT_WORKERS', 2))
+# 프로세스당 대기/실행 중인 변형 작업 수 (넘으면 건너뛰고 generate_image_variants 로 생성)
+BOARD_IMAGE_VARIANT_QUEUE = int(os.environ.get('BOARD_IMAGE_VARIANT_QUEUE', 16))
+# 게시글 조회수/인기글: 'redis' (flush_view_counts 로 N초마다 DB 반영), 빈 값이면 사용 안 함
+BOARD_VIEW_COUNTER = os.environ.get('BOARD_VIEW_COUNTER', '')
+BOARD_VIEW_FLUSH_INTERVAL = int(os.environ.get('BOARD_VIEW_FLUSH_INTERVAL', 30))
+# 인기 점수 반감기 (초)
+BOARD_TRENDING_HALF_LIFE = int(os.environ.get('BOARD_TRENDING_HALF_LIFE', 6 * 60 * 60))
+
+# 채팅방 메시지 페이지 크기 (?limit= 로 CHAT_MESSAGE_MAX_PAGE_SIZE 까지 조절)
+CHAT_MESSAGE_PAGE_SIZE = int(os.environ.get('CHAT_MESSAGE_PAGE_SIZE', 50))
+CHAT_MESSAGE_MAX_PAGE_SIZE = int(os.environ.get('CHAT_MESSAGE_MAX_PAGE_SIZE', 200))
+# 사용자별 채팅방 목록 인덱스: 'redis' (run_inbox_indexer 가 room_{id}_channel 에서 갱신), 빈 값이면 MySQL에서 조회
+CHAT_INBOX = os.environ.get('CHAT_INBOX', '')
+CHAT_INBOX_PAGE_SIZE = int(os.environ.get('CHAT_INBOX_PAGE_SIZE', 20))
+CHAT_INBOX_MAX_PAGE_SIZE = int(os.environ.get('CHAT_INBOX_MAX_PAGE_SIZE', 100))
+# server.js 가 CHAT_PERSIST_MODE=stream 일 때 메시지를 넣는 Redis Stream (run_chat_ingestor 가 저장)
+CHAT_INGEST_STREAM = os.environ.get('CHAT_INGEST_STREAM', 'chat:messages')
+CHAT_INGEST_GROUP = os.environ.get('CHAT_INGEST_GROUP', 'chat-ingestor')
+# 채팅 서버 연결 ticket (HMAC, server.js 와 같은 값): 비어 있으면 발급 안 함 (세션 조회만 사용)
+CHAT_TICKET_SECRET = os.environ.get('CHAT_TICKET_SECRET', '')
+CHAT_TICKET_TTL = int(os.environ.get('CHAT_TICKET_TTL', 60))
+# chat_ticket/verify/ 호출 제한 (로그인 사용자별, DRF throttle 형식)
+CHAT_TICKET_VERIFY_RATE = os.environ.get('CHAT_TICKET_VERIFY_RATE', '30/min')
+# Channels WebSocket 채팅 (pitza.asgi): 방 그룹 전달은 Redis, 메시지 저장은 프로세스별로 묶어서
+ASGI_APPLICATION = 'pitza.asgi.application'
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {'hosts': [(REDIS_HOST, REDIS_PORT)]},
+    },
+}
+CHAT_WRITE_BATCH_SIZE = int(os.environ.get('CHAT_WRITE_BATCH_SIZE', 200))
+CHAT_WRITE_MAX_WAIT_MS = int(os.environ.get('CHAT_WRITE_MAX_WAIT_MS', 100))
+# messages/since long-poll 최대 대기 시간 (초)
+CHAT_LONG_POLL_TIMEOUT = int(os.environ.get('CHAT_LONG_POLL_TIMEOUT', 25))
+# 프로세스당 동시에 기다리는 long-poll 수 (ASGI 에서만 기다림, 넘으면 503)
+CHAT_LONG_POLL_MAX_WAITERS = int(os.environ.get('CHAT_LONG_POLL_MAX_WAITERS', 200))
+
 # Add CORS settings for MinIO
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOWED_ORIGINS = [
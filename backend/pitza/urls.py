@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
@@ -9,7 +10,7 @@ from rest_framework import routers
 from login import views
 from login.views.auth_views import login_view, login_google, google_callback, login_kakao, kakao_callback
 from login.views.user_views import user_detail
-from login.views.api_views import get_user_by_session_api
+from login.views.api_views import get_user_by_session_api, issue_chat_ticket_api, verify_chat_tickets_api
 from donations.views import DonationRequestViewSet
 from login.views.profile_setup_views import UserProfileSetupView, profile_setup_redirect
 
@@ -52,10 +53,14 @@ urlpatterns = [
    
    # API views
    path('get_user_by_session/', get_user_by_session_api, name='get_user_by_session_api'),
+   path('chat_ticket/', issue_chat_ticket_api, name='issue_chat_ticket_api'),
+   path('chat_ticket/verify/', verify_chat_tickets_api, name='verify_chat_tickets_api'),
 
    # userprofile
    path('profile/setup/', UserProfileSetupView.as_view(), name='profile-setup'),
    path('profile/setup/redirect/', profile_setup_redirect, name='profile-setup-redirect-get'),
 ]
 
-urlpatterns += router.urls
\ No newline at end of file
+urlpatterns += router.urls
+# uvicorn (pitza.asgi, web-asgi) does not serve static files like runserver: admin/swagger assets when DEBUG
+urlpatterns += staticfiles_urlpatterns()
@@ -10,8 +10,42 @@ const Minio = require('minio');
 const axios = require('axios');
 const { pathToFileURL } = require('url');
 const { log } = require('console');
+const crypto = require('crypto');
+
+// Django 가 발급한 연결 ticket 검증 (backend/login/tickets.py 와 같은 형식): DB/HTTP 조회 없음
+const CHAT_TICKET_SECRET = process.env.CHAT_TICKET_SECRET || '';
+
+function verifyTicket(ticket) {
+  if (!CHAT_TICKET_SECRET || typeof ticket !== 'string') return null;
+  const parts = ticket.split('.');
+  if (parts.length !== 2) return null;
+  const [payload, signature] = parts;
+  const expected = crypto.createHmac('sha256', CHAT_TICKET_SECRET).update(payload).digest('base64url');
+  const given = Buffer.from(signature);
+  if (given.length !== expected.length || !crypto.timingSafeEqual(given, Buffer.from(expected))) return null;
+  try {
+    const claims = JSON.parse(Buffer.from(payload, 'base64url').toString('utf8'));
+    if (!claims.id || !(claims.exp * 1000 > Date.now())) return null;
+    return claims;
+  } catch (err) {
+    return null;
+  }
+}
 
 async function authenticate(socket, next) {
+  // ticket 이 있으면 서명만 확인하고, 없을 때만 Django 세션 조회
+  const ticket = socket.handshake.auth && socket.handshake.auth.ticket;
+  if (ticket) {
+    const claims = verifyTicket(ticket);
+    if (!claims) {
+      console.log('ticket 검증 실패');
+      return next(new Error('Authentication failed: Invalid ticket'));
+    }
+    socket.data.user = claims;
+    console.log('인증 성공 (ticket) - 사용자 ID:', claims.id);
+    return next();
+  }
+
   const cookieHeader = socket.handshake.headers.cookie;
   // console.log('Received cookies:', cookieHeader);
     try {
@@ -37,21 +71,76 @@ async function authenticate(socket, next) {
     }
 }
 
-// MySQL 연결
-const db = mysql.createConnection({
+// MySQL 연결 (메시지 저장 트랜잭션마다 커넥션을 빌려 씀)
+const db = mysql.createPool({
   host: process.env.DB_HOST,
   port: process.env.DB_PORT,
   user: process.env.DB_USER,
   password: process.env.DB_PASS,
   database: process.env.DB_NAME,
+  connectionLimit: parseInt(process.env.DB_POOL_SIZE || '10', 10),
 });
 
+// 메시지 INSERT 와 채팅방 목록용 비정규화 갱신을 한 트랜잭션으로 (backend/chat/messaging.py 와 같은 규칙)
+async function saveMessage({ room_id, user_id, message, message_type, timestamp, image_url = null }) {
+  const conn = await db.promise().getConnection();
+  try {
+    await conn.beginTransaction();
+    const [result] = await conn.query(
+      `INSERT INTO chat_message (chatroom_id, sender_id, content, message_type, timestamp, image_url)
+       VALUES (?, ?, ?, ?, ?, ?)`,
+      [room_id, user_id, message, message_type, timestamp, image_url]
+    );
+    const messageId = result.insertId;
+    await conn.query(
+      `UPDATE chat_chatroom
+       SET last_message_id = ?, last_message_content = ?, last_message_at = ?
+       WHERE id = ? AND (last_message_id IS NULL OR last_message_id < ?)`,
+      [messageId, message, timestamp, room_id, messageId]
+    );
+    await conn.query(
+      `UPDATE chat_chatparticipant SET unread_count = unread_count + 1
+       WHERE chatroom_id = ? AND user_id <> ?`,
+      [room_id, user_id]
+    );
+    await conn.commit();
+    return messageId;
+  } catch (err) {
+    await conn.rollback();
+    throw err;
+  } finally {
+    conn.release();
+  }
+}
+
 // Redis 클라이언트
 const pubClient = createClient({
   url: `redis://${process.env.REDIS_HOST}:${process.env.REDIS_PORT}`,
 });
 const subClient = pubClient.duplicate();
 
+// 메시지 저장 방식: 'direct' (여기서 saveMessage 트랜잭션), 'stream' (Redis Stream 에 XADD 하고
+// Django 의 run_chat_ingestor 가 묶어서 저장)
+const PERSIST_MODE = process.env.CHAT_PERSIST_MODE || 'direct';
+const INGEST_STREAM = process.env.CHAT_INGEST_STREAM || 'chat:messages';
+// 여기서는 스트림을 자르지 않음: ack 전에 잘리면 메시지가 사라지므로
+// run_chat_ingestor 가 XACK 한 뒤 가장 오래된 pending 항목 앞까지만 XTRIM MINID 로 자른다
+
+async function persistMessage({ room_id, user_id, message, message_type, timestamp, image_url = null }) {
+  if (PERSIST_MODE !== 'stream') {
+    return saveMessage({ room_id, user_id, message, message_type, timestamp, image_url });
+  }
+  // 스트림 항목 id 가 메시지의 중복 제거 키 (chat_message.stream_id)
+  return pubClient.xAdd(INGEST_STREAM, '*', {
+    room_id: String(room_id),
+    user_id: String(user_id),
+    message,
+    message_type,
+    timestamp,
+    image_url: image_url || '',
+  });
+}
+
 // MinIO 클라이언트
 const minioClient = new Minio.Client({
   endPoint: process.env.MINIO_HOST,
@@ -202,27 +291,18 @@ Promise.all([
         message_type: 'text'
       });
 
-      const query = `
-        INSERT INTO chat_message (chatroom_id, sender_id, content, message_type, timestamp, is_read)
-        VALUES (?, ?, ?, ?, ?, ?)
-      `;
-
-      const values = [
-        room_id, 
-        user_id, 
-        finalPayload.message, 
-        finalPayload.message_type, 
-        finalPayload.timestamp, 
-        finalPayload.is_read
-      ];
-
-      db.query(query, values, (err, result) => {
-        if (err) {
-          console.error('MySQL 텍스트 메시지 저장 오류:', err.message);
-        } else {
-          console.log('MySQL에 텍스트 메시지 저장 성공:', result.insertId);
-        }
-      });
+      try {
+        const messageId = await persistMessage({
+          room_id,
+          user_id,
+          message: finalPayload.message,
+          message_type: finalPayload.message_type,
+          timestamp: finalPayload.timestamp,
+        });
+        console.log(`텍스트 메시지 저장 성공 (${PERSIST_MODE}):`, messageId);
+      } catch (err) {
+        console.error('MySQL 텍스트 메시지 저장 오류:', err.message);
+      }
     });
 
     socket.on('image', async (payload) => {
@@ -254,26 +334,15 @@ Promise.all([
           image_url: finalImageUrl,
         });
 
-        const query = `
-          INSERT INTO chat_message (chatroom_id, sender_id, content, message_type, timestamp, is_read, image_url)
-          VALUES (?, ?, ?, ?, ?, ?, ?)
-        `;
-        const values = [
-          room_id, 
-          user_id, 
-          finalPayload.message, 
-          finalPayload.message_type, 
-          finalPayload.timestamp, 
-          finalPayload.is_read, 
-          finalPayload.image_url];
-
-        db.query(query, values, (err, result) => {
-          if (err) {
-            throw new Error(`MySQL 이미지 메시지 저장 오류: ${err.message}`);
-          } else {
-            console.log('MySQL에 이미지 메시지 저장 성공:', result.insertId);            
-          }
+        const messageId = await persistMessage({
+          room_id,
+          user_id,
+          message: finalPayload.message,
+          message_type: finalPayload.message_type,
+          timestamp: finalPayload.timestamp,
+          image_url: finalPayload.image_url,
         });
+        console.log(`이미지 메시지 저장 성공 (${PERSIST_MODE}):`, messageId);
 
       } catch (err) {
         console.error('이미지 메시지 처리 중 오류:', err.message);